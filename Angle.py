@@ -1,4 +1,7 @@
+import csv
+import argparse
 import numpy as np
+from Geometry_Reader import read_frames
 
 def get_coordinates():
     """
@@ -57,9 +60,98 @@ def calculate_angle_between_planes(coords):
     angle_degrees = np.degrees(angle)  # Convert to degrees
     return adjust_angle(angle_degrees)
 
-# Input coordinates
-coordinates = get_coordinates()
+def parse_atom_group(spec):
+    """
+    Converts a 1-based atom selection such as "1-6" or "1,3,5,7" into 0-based indices.
+    Raises ValueError for atoms numbered below 1 and if it selects fewer than 3
+    distinct atoms, which do not define a plane.
+    """
+    indices = []
+    for part in spec.split(","):
+        start, _, end = part.partition("-")
+        if int(start) < 1:
+            raise ValueError(f"Atom group '{spec}' refers to atom {int(start)}; atoms are numbered from 1")
+        indices.extend(range(int(start) - 1, int(end or start)))
+    if len(set(indices)) < 3:
+        raise ValueError(f"Atom group '{spec}' selects {len(set(indices))} atoms; a plane needs at least 3")
+    return np.array(indices)
+
+def best_fit_plane_normals(frames, group):
+    """
+    Returns the unit normals, shape (n_frames, 3), of the least-squares plane
+    through the atoms in 'group' of every frame. All frames are fitted in one
+    batched SVD: the normal is the direction of least variance of the centred atoms.
+    """
+    points = frames[:, group, :]
+    centred = points - points.mean(axis=1, keepdims=True)
+    _, _, vh = np.linalg.svd(centred, full_matrices=False)
+    return vh[:, -1, :]
+
+def batch_angles_between_planes(frames, group1, group2):
+    """
+    Returns the angle in degrees (0-90, as adjust_angle) between the best-fit
+    planes of two atom groups for every frame of an (n_frames, n_atoms, 3) array.
+    """
+    normal1 = best_fit_plane_normals(frames, group1)
+    normal2 = best_fit_plane_normals(frames, group2)
+    # The sign of an SVD normal is arbitrary, so |cos| gives the acute angle directly.
+    dot_product = np.abs(np.einsum("ij,ij->i", normal1, normal2))
+    return np.degrees(np.arccos(np.clip(dot_product, 0.0, 1.0)))
+
+def save_angles(labels, angles, output_file):
+    with open(output_file, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["Frame", "Angle"])
+        writer.writerows(zip(labels, angles.tolist()))
+    print(f"Saved to {output_file}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Angle between the planes of two atom groups (e.g. two benzene rings).")
+    parser.add_argument("paths", nargs="*",
+                        help="Directories of .com files, .com, .log or .xyz files (paste one geometry if omitted)")
+    parser.add_argument("--ring1", default="1-6", help="1-based atoms of the first plane (default 1-6)")
+    parser.add_argument("--ring2", default="7-12", help="1-based atoms of the second plane (default 7-12)")
+    parser.add_argument("--output", help="CSV file for the per-frame angles")
+    args = parser.parse_args()
+
+    if not args.paths:
+        # Input coordinates
+        coordinates = get_coordinates()
+
+        # Compute the angle between the two benzene rings
+        angle = calculate_angle_between_planes(coordinates)
+        print(f"The angle between the two benzene rings is: {angle:.2f} degrees")
+        return
+
+    try:
+        group1, group2 = parse_atom_group(args.ring1), parse_atom_group(args.ring2)
+        labels, frames = [], []
+        for path in args.paths:
+            path_labels, path_frames = read_frames(path)
+            labels.extend(path_labels)
+            frames.extend(path_frames)
+    except ValueError as e:
+        print(e)
+        return
+    if not frames:
+        print("No geometries found.")
+        return
+    if len({frame.shape for frame in frames}) > 1:
+        print("All geometries must have the same number of atoms.")
+        return
+    n_atoms = len(frames[0])
+    for spec, group in ((args.ring1, group1), (args.ring2, group2)):
+        if group.max() >= n_atoms:
+            print(f"Atom group '{spec}' refers to atom {group.max() + 1}, but the geometries have {n_atoms} atoms.")
+            return
+
+    angles = batch_angles_between_planes(np.array(frames), group1, group2)
+    if args.output:
+        save_angles(labels, angles, args.output)
+    else:
+        for label, angle in zip(labels, angles):
+            print(f"{label}: {angle:.2f} degrees")
+    print(f"{len(angles)} frames: min {angles.min():.2f}, max {angles.max():.2f}, mean {angles.mean():.2f} degrees")
 
-# Compute the angle between the two benzene rings
-angle = calculate_angle_between_planes(coordinates)
-print(f"The angle between the two benzene rings is: {angle:.2f} degrees")
+if __name__ == "__main__":
+    main()
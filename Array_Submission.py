@@ -0,0 +1,85 @@
+import os
+import shlex
+import subprocess
+from Stage_Timer import stage
+
+ARRAY_SCRIPT_NAME = "Array_Submission.sh"
+ARRAY_MANIFEST_NAME = "array_manifest.tsv"
+
+
+def write_array_manifest(manifest_path, entries):
+    """
+    Writes one line per sub-job: working directory, script and the
+    comma-separated VAR=value list to export (may be empty).
+    Line i (1-based) is run by the sub-job with PBS_ARRAY_INDEX=i.
+    """
+    with open(manifest_path, 'w') as f:
+        for working_dir, script, variables in entries:
+            f.write(f"{os.path.abspath(working_dir)}\t{script}\t{variables}\n")
+
+
+def pbs_resource_lines(script_path):
+    """Returns the '#PBS -l ...' resource directives of an existing job script."""
+    try:
+        with open(script_path, 'r') as f:
+            return [line.rstrip("\n") for line in f if line.startswith("#PBS -l")]
+    except FileNotFoundError:
+        return []
+
+
+def write_array_script(script_path, manifest_path, n_jobs, job_name, resource_lines):
+    """
+    Writes a single '#PBS -J 1-N' script. Each sub-job reads its manifest line
+    by $PBS_ARRAY_INDEX, exports the listed variables and runs the per-geometry
+    script in its working directory, so that script stays the single template.
+    """
+    with open(script_path, 'w') as sh_file:
+        sh_file.write("#!/bin/bash\n")
+        for line in resource_lines:
+            sh_file.write(f"{line}\n")
+        sh_file.write(f"#PBS -N {job_name}\n")
+        sh_file.write(f"#PBS -J 1-{n_jobs}\n\n")
+        sh_file.write(f"MANIFEST={shlex.quote(os.path.abspath(manifest_path))}\n")
+        sh_file.write("IFS=$'\\t' read -r WORKDIR SCRIPT VARS <<< \"$(sed -n \"${PBS_ARRAY_INDEX}p\" \"$MANIFEST\")\"\n")
+        sh_file.write("if [ -n \"$VARS\" ]; then export ${VARS//,/ }; fi\n")
+        sh_file.write("cd \"$WORKDIR\"\n")
+        sh_file.write("bash \"$SCRIPT\"\n")
+    os.chmod(script_path, 0o755)
+
+
+def subjob_id(array_job_id, index):
+    """Returns the PBS id of sub-job 'index' of an array, e.g. 123[].server -> 123[4].server."""
+    return array_job_id.replace("[]", f"[{index}]", 1)
+
+
+def submit_array(entries, working_dir, job_name, resource_script, qsub="qsub"):
+    """
+    Submits every (working_dir, script, variables) entry as one PBS job array.
+    A single entry is submitted as a plain job instead, because some PBS
+    versions reject a one-element '-J 1-1' array; its id has no "[]", so
+    subjob_id returns it unchanged.
+    Returns the job id, or None if submission failed.
+    """
+    if len(entries) == 1:
+        entry_dir, script, variables = entries[0]
+        command = shlex.split(qsub) + (["-v", variables] if variables else []) + [script]
+        submission_dir = os.path.abspath(entry_dir)
+        kind, description = "Job", f"for {script} in {submission_dir}"
+    else:
+        working_dir = os.path.abspath(working_dir)
+        manifest_path = os.path.join(working_dir, ARRAY_MANIFEST_NAME)
+        script_path = os.path.join(working_dir, ARRAY_SCRIPT_NAME)
+        write_array_manifest(manifest_path, entries)
+        write_array_script(script_path, manifest_path, len(entries), job_name, pbs_resource_lines(resource_script))
+        command = shlex.split(qsub) + [script_path]
+        submission_dir = working_dir
+        kind, description = "Array job", f"with {len(entries)} sub-jobs ({manifest_path})"
+    try:
+        with stage("qsub"):
+            result = subprocess.run(command, check=True, cwd=submission_dir, capture_output=True, text=True)
+    except (subprocess.CalledProcessError, FileNotFoundError) as e:
+        print(f"Job submission failed: {e}")
+        return None
+    job_id = result.stdout.strip()
+    print(f"{kind} {job_id} submitted {description}")
+    return job_id
@@ -0,0 +1,263 @@
+"""
+Benchmarks the log-parsing and input-generation stages on synthetic data.
+
+Each stage runs in its own freshly spawned process, so its peak RSS is its own,
+and is timed as the best of --repeat runs. Results (seconds, throughput in
+logs/s, MB/s or geometries/s, and peak RSS) are written as JSON; --compare
+flags stages that got slower than a previous result file.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import resource
+import tempfile
+import multiprocessing
+import numpy as np
+import Synthetic_Logs
+from Gaussian_Log_Parser import parse_fcht_log
+from Log_Cache import open_log_cache
+from Extract_Intensity_Borrowing import process_directories
+from Normal_Coordinates_Data import process_shift_directory
+from Normal_Mode_Parser import parse_normal_modes
+from Displacement_Engine import displace_atoms_batch, format_output_batch
+from Intensity_Borrowing_Automation import replace_coordinate_block
+from Geometry_Reader import split_com_template
+from Grid_Scan import write_grid_scan
+
+MB = 1 << 20
+
+
+def read_template(workdir):
+    with open(os.path.join(workdir, "template.com"), 'r') as f:
+        return f.readlines()
+
+
+def template_geometry(workdir):
+    """Returns (symbols, coords) of the synthetic .com template."""
+    _, coordinate_lines, _ = split_com_template(read_template(workdir))
+    symbols = [line.split()[0] for line in coordinate_lines]
+    coords = np.array([[float(value) for value in line.split()[1:4]] for line in coordinate_lines])
+    return symbols, coords
+
+
+def first_mode_vectors(workdir, n_modes=1):
+    with open(os.path.join(workdir, "freq.log"), 'r') as f:
+        return parse_normal_modes(f)["displacements"][:n_modes]
+
+
+# Each stage returns the amount of work done, e.g. {"logs": 40, "MB": 80.0}.
+def stage_parse_mmap(workdir, config):
+    parse_fcht_log(os.path.join(workdir, "big.log"), "mmap")
+    return {"logs": 1, "MB": os.path.getsize(os.path.join(workdir, "big.log")) / MB}
+
+
+def stage_parse_tail(workdir, config):
+    parse_fcht_log(os.path.join(workdir, "big.log"), "tail")
+    return {"logs": 1, "MB": os.path.getsize(os.path.join(workdir, "big.log")) / MB}
+
+
+def stage_parse_stream(workdir, config):
+    parse_fcht_log(os.path.join(workdir, "big.log"), "stream")
+    return {"logs": 1, "MB": os.path.getsize(os.path.join(workdir, "big.log")) / MB}
+
+
+def stage_extract_directories(workdir, config):
+    results = process_directories("Unshifted", 11, os.path.join(workdir, "extract"), jobs=config["jobs"])
+    return {"logs": 2 * len(results), "MB": config["extract_bytes"] / MB}
+
+
+def stage_extract_directories_cached(workdir, config):
+    cache = open_log_cache(os.path.join(workdir, "bench_cache.sqlite"))
+    results = process_directories("Unshifted", 11, os.path.join(workdir, "extract"), cache)
+    cache.close()
+    return {"logs": 2 * len(results)}
+
+
+def stage_shift_asymmetry(workdir, config):
+    process_shift_directory(11, os.path.join(workdir, "shift"))
+    return {"logs": config["shift_logs"], "MB": config["shift_bytes"] / MB}
+
+
+def stage_normal_modes(workdir, config):
+    with open(os.path.join(workdir, "freq.log"), 'r') as f:
+        parse_normal_modes(f)
+    return {"logs": 1, "MB": os.path.getsize(os.path.join(workdir, "freq.log")) / MB}
+
+
+def stage_displacement(workdir, config):
+    symbols, coords = template_geometry(workdir)
+    magnitudes = np.linspace(-0.5, 0.5, config["geometries"])
+    displaced = displace_atoms_batch(coords, first_mode_vectors(workdir)[0], magnitudes)
+    format_output_batch(displaced, symbols)
+    return {"geometries": len(magnitudes)}
+
+
+def stage_com_update(workdir, config):
+    lines = read_template(workdir)
+    symbols, coords = template_geometry(workdir)
+    magnitudes = np.linspace(-0.5, 0.5, config["geometries"])
+    displaced = displace_atoms_batch(coords, first_mode_vectors(workdir)[0], magnitudes)
+    output_dir = os.path.join(workdir, "com_update")
+    os.makedirs(output_dir, exist_ok=True)
+    for i, new_coords_lines in enumerate(format_output_batch(displaced, symbols)):
+        with open(os.path.join(output_dir, f"geometry_{i}.com"), 'w') as f:
+            f.writelines(replace_coordinate_block(lines, new_coords_lines))
+    return {"geometries": len(magnitudes)}
+
+
+def stage_grid_scan(workdir, config):
+    side = max(2, int(round(config["geometries"] ** 0.5)))
+    grid = np.linspace(-0.5, 0.5, side)
+    output_dir = os.path.join(workdir, "grid_scan")
+    write_grid_scan(os.path.join(workdir, "template.com"), output_dir, [7, 8], first_mode_vectors(workdir, 2),
+                    [grid, grid])
+    return {"geometries": side * side}
+
+
+STAGES = {
+    "parse_fcht_mmap": stage_parse_mmap,
+    "parse_fcht_tail": stage_parse_tail,
+    "parse_fcht_stream": stage_parse_stream,
+    "extract_directories": stage_extract_directories,
+    "extract_directories_cached": stage_extract_directories_cached,
+    "shift_asymmetry": stage_shift_asymmetry,
+    "normal_modes": stage_normal_modes,
+    "displacement": stage_displacement,
+    "com_update": stage_com_update,
+    "grid_scan": stage_grid_scan,
+}
+
+# Stages run once untimed first, so they are measured in their steady state.
+WARM_UP_STAGES = {"extract_directories_cached"}
+
+
+def build_fixtures(workdir, config):
+    """Generates every synthetic input once; sizes are recorded in config."""
+    start = time.perf_counter()
+    Synthetic_Logs.write_fcht_log(os.path.join(workdir, "big.log"), config["modes"], config["preamble_mb"])
+    config["extract_logs"], config["extract_bytes"] = Synthetic_Logs.build_extraction_tree(
+        os.path.join(workdir, "extract"), width=config["width"], n_modes=config["modes"],
+        preamble_mb=config["sweep_preamble_mb"])
+    config["shift_logs"], config["shift_bytes"] = Synthetic_Logs.build_shift_tree(
+        os.path.join(workdir, "shift"), width=config["width"], n_modes=config["modes"],
+        preamble_mb=config["sweep_preamble_mb"])
+    Synthetic_Logs.write_freq_log(os.path.join(workdir, "freq.log"), config["atoms"])
+    Synthetic_Logs.write_com_template(os.path.join(workdir, "template.com"), config["atoms"])
+    print(f"Synthetic inputs written in {time.perf_counter() - start:.1f} s ({workdir})")
+
+
+def run_stage(name, workdir, config, connection):
+    """Child process: times a stage config["repeat"] times and reports the best run and peak RSS."""
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')  # Keep the stages' progress prints out of the report.
+    try:
+        if name in WARM_UP_STAGES:
+            STAGES[name](workdir, config)
+        times = []
+        for _ in range(config["repeat"]):
+            start = time.perf_counter()
+            work = STAGES[name](workdir, config)
+            times.append(time.perf_counter() - start)
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # ru_maxrss is in KiB on Linux
+    connection.send({"seconds": min(times), "work": work, "peak_rss_mb": peak_rss_mb})
+    connection.close()
+
+
+def measure(name, workdir, config):
+    context = multiprocessing.get_context("spawn")
+    parent_connection, child_connection = context.Pipe(duplex=False)
+    process = context.Process(target=run_stage, args=(name, workdir, config, child_connection))
+    process.start()
+    child_connection.close()
+    try:
+        result = parent_connection.recv()
+    except EOFError:
+        result = None
+    process.join()
+    if result is None:
+        print(f"{name}: failed (exit code {process.exitcode})")
+        return None
+    seconds = result["seconds"]
+    result["throughput"] = {f"{unit}/s": amount / seconds for unit, amount in result.pop("work").items()}
+    return result
+
+
+def compare(results, baseline_file, threshold):
+    """Prints each stage's time relative to a previous run; returns the stages slower than threshold."""
+    with open(baseline_file, 'r') as f:
+        baseline = json.load(f)["stages"]
+    regressions = []
+    print(f"\nCompared with {baseline_file}:")
+    for name, result in results.items():
+        if name not in baseline or result is None or baseline[name] is None:
+            continue
+        ratio = result["seconds"] / baseline[name]["seconds"]
+        flag = "  <-- slower" if ratio > threshold else ""
+        print(f"  {name:<28} x{ratio:5.2f}{flag}")
+        if ratio > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parsing and generation stages on synthetic Gaussian data.")
+    parser.add_argument("--atoms", type=int, default=12, help="Atoms in the synthetic molecule")
+    parser.add_argument("--modes", type=int, default=30, help="Modes in each FCHT log")
+    parser.add_argument("--preamble-mb", type=float, default=64.0, help="Size of the big FCHT log's preamble")
+    parser.add_argument("--sweep-preamble-mb", type=float, default=1.0, help="Preamble of each log in the sweep trees")
+    parser.add_argument("--width", type=int, default=40, help="Magnitudes per sweep tree")
+    parser.add_argument("--geometries", type=int, default=2000, help="Geometries per generation stage")
+    parser.add_argument("--jobs", type=int, default=1, help="Worker processes for extract_directories")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage; the best is reported")
+    parser.add_argument("--stages", nargs="+", choices=list(STAGES), default=list(STAGES), help="Stages to run")
+    parser.add_argument("--workdir", help="Directory for the synthetic inputs (a temporary one if omitted)")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON results file")
+    parser.add_argument("--compare", help="Previous results file to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2, help="Slowdown ratio reported as a regression")
+    args = parser.parse_args()
+
+    config = {key: getattr(args, key) for key in
+              ("atoms", "modes", "preamble_mb", "sweep_preamble_mb", "width", "geometries", "jobs", "repeat")}
+    workdir = args.workdir or tempfile.mkdtemp(prefix="fcht_benchmark_")
+    os.makedirs(workdir, exist_ok=True)
+    try:
+        build_fixtures(workdir, config)
+        results = {}
+        for name in args.stages:
+            results[name] = measure(name, workdir, config)
+            if results[name] is not None:
+                rates = ", ".join(f"{rate:,.1f} {unit}" for unit, rate in results[name]["throughput"].items())
+                print(f"{name:<28} {results[name]['seconds']:8.3f} s  {rates}  "
+                      f"peak RSS {results[name]['peak_rss_mb']:.0f} MB")
+    finally:
+        if args.workdir is None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "environment": {"python": platform.python_version(), "numpy": np.__version__,
+                        "platform": platform.platform(), "cpus": os.cpu_count()},
+        "config": config,
+        "stages": results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {args.output}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            print(f"Regressions: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
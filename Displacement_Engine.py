@@ -0,0 +1,48 @@
+import numpy as np
+from Stage_Timer import stage
+
+
+def atomic_symbols(atomic_data: list):
+    """
+    Returns the element symbol of every coordinate line, skipping the same
+    short lines that extract_coordinates skips.
+    """
+    return [line.split()[0] for line in atomic_data if len(line.split()) >= 4]
+
+
+def displace_atoms_batch(atom_coords: np.ndarray, freq_displacements: np.ndarray, magnitudes):
+    """
+    Displaces the coordinates by every magnitude in one broadcast.
+
+    Args:
+        atom_coords (np.ndarray): Original atomic coordinates, shape (n_atoms, 3).
+        freq_displacements (np.ndarray): Mode displacement vectors, shape (n_atoms, 3).
+        magnitudes: Sequence of n_mag displacement magnitudes.
+
+    Returns:
+        np.ndarray: Displaced coordinates, shape (n_mag, n_atoms, 3).
+    """
+    with stage("displace"):
+        magnitudes = np.asarray(magnitudes, dtype=float)
+        return atom_coords[np.newaxis] + magnitudes[:, np.newaxis, np.newaxis] * freq_displacements[np.newaxis]
+
+
+def coordinate_template(symbols: list):
+    """
+    Builds a %-format template for one geometry, matching format_output's
+    "{symbol:<2}  {x:>10.6f}  {y:>10.6f}  {z:>10.6f}" line layout.
+    """
+    return "\n".join(f"{symbol:<2}  %10.6f  %10.6f  %10.6f" for symbol in symbols)
+
+
+def format_output_batch(displaced_coords: np.ndarray, symbols: list):
+    """
+    Formats a (n_mag, n_atoms, 3) stack of geometries, one template
+    substitution per geometry instead of one f-string per atom.
+
+    Returns:
+        list: One list of formatted coordinate lines per geometry.
+    """
+    with stage("format_coordinates"):
+        template = coordinate_template(symbols)
+        return [(template % tuple(coords.ravel().tolist())).split("\n") for coords in displaced_coords]
@@ -1,92 +1,211 @@
 import os
 import re
 import csv
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from Gaussian_Log_Parser import all_mode_arrays, record_n_modes
+from Result_Writer import StreamingCsvWriter
+from Result_Store import DEFAULT_STORE_NAME, append_sweep, table_from_rows, table_from_arrays
+from Log_Cache import DEFAULT_CACHE_NAME, open_log_cache, cached_parse_fcht_log, evict_missing
+from Stage_Timer import stage, add_profile_argument, enable_from_args
 
-def extract_value_from_section(log_file, section_header, mode, pattern):
+CSV_HEADER = ["Magnitude", "Huang-Rhys", "Shift", "ABS", "EMI"]
+ABS_LOG_NAME = "PW6B95D3_N_FCHT_ABS.log"
+EMI_LOG_NAME = "PW6B95D3_N_FCHT_EMI.log"
+
+_worker_cache = None
+_worker_use_hash = False
+_worker_method = "mmap"
+
+def find_shift_directories(X, base_dir, Y=None):
     """
-    Extracts a numerical value from a specified section in a Gaussian log file.
+    Recursively finds {X}_Shift_{Y}_<mag> directories (any Y if Y is None).
+    Returns a list of (mode, magnitude, path) sorted by mode, then magnitude.
     """
-    value = None
-    try:
-        with open(log_file, 'r') as file:
-            lines = file.readlines()
-        
-        inside_section = False
-        for line in lines:
-            if section_header in line:
-                inside_section = True
-                continue
-            
-            if inside_section:
-                match = re.search(pattern.format(mode), line)
-                if match:
-                    value = float(match.group(1).replace('D', 'E'))  # Convert scientific notation
-                    break
-    except FileNotFoundError:
-        print(f"Log file not found: {log_file}")
-    except Exception as e:
-        print(f"An error occurred while processing {log_file}: {e}")
-    return value
-
-def extract_transition_modes_and_dipstr(log_file,Y):
-    """Extracts the dipole strength from a Gaussian log file."""
-    dipole_strength = None
-    try:
-        with open(log_file, 'r') as file:
-            lines = file.readlines()
+    mode_pattern = str(Y) if Y is not None else r'(\d+)'
+    pattern = re.compile(fr'{X}_Shift_{mode_pattern}_(-?\d+\.\d+)')  # Allow negative values
+    directories = []
+    with stage("walk_directories"):
+        for root, _, files in os.walk(base_dir):
+            match = pattern.match(os.path.basename(root))
+            if match:
+                mode = Y if Y is not None else int(match.group(1))
+                directories.append((mode, float(match.group(match.lastindex)), root))
+    return sorted(directories)
+
+def parse_shift_directory(root, cache=None, use_hash=False, method="mmap"):
+    """Parses the ABS and EMI logs of one shift directory, one read per log."""
+    abs_log = os.path.join(root, ABS_LOG_NAME)
+    emi_log = os.path.join(root, EMI_LOG_NAME)
+    abs_record = cached_parse_fcht_log(abs_log, cache, use_hash, method) if os.path.exists(abs_log) else None
+    emi_record = cached_parse_fcht_log(emi_log, cache, use_hash, method) if os.path.exists(emi_log) else None
+    return abs_record, emi_record
+
+def _init_worker(cache_file, use_hash, method):
+    global _worker_cache, _worker_use_hash, _worker_method
+    _worker_cache = open_log_cache(cache_file, timeout=60) if cache_file else None
+    _worker_use_hash = use_hash
+    _worker_method = method
+
+def _parse_shift_directory_in_worker(root):
+    return parse_shift_directory(root, _worker_cache, _worker_use_hash, _worker_method)
+
+def parse_shift_directories(directories, cache=None, use_hash=False, jobs=1, method="mmap", cache_file=None):
+    """
+    Yields (abs_record, emi_record) for each directory, in input order.
+
+    With jobs > 1 the logs are parsed in a process pool. At most 4 * jobs
+    directories are in flight, so memory stays bounded while results are
+    merged back in the original (sorted) order. Each worker opens its own
+    connection to cache_file, the path 'cache' was opened from; without it
+    the workers parse uncached.
+    """
+    if jobs <= 1:
+        for _, _, root in directories:
+            yield parse_shift_directory(root, cache, use_hash, method)
+        return
+
+    window = 4 * jobs
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(cache_file, use_hash, method)) as pool:
+        pending = deque()
+        for _, _, root in directories:
+            pending.append(pool.submit(_parse_shift_directory_in_worker, root))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def iter_directory_rows(directories, Y, cache=None, use_hash=False, jobs=1, method="mmap", cache_file=None):
+    """Yields (directory, (magnitude, HR, shift, ABS, EMI)) for mode Y, in directory order."""
+    for (_, magnitude_of_shift, root), (abs_record, emi_record) in zip(directories, parse_shift_directories(directories, cache, use_hash, jobs, method, cache_file)):
+        dipstr_abs = abs_record["dipstr"].get(Y) if abs_record else None
+        dipstr_emi = emi_record["dipstr"].get(Y) if emi_record else None
+        huang_rhys = abs_record["huang_rhys"].get(Y) if abs_record else None
+        shift_value = abs_record["shift"].get(Y) if abs_record else None
         
-        for i in range(len(lines) - 1):  # Iterate with index
-            if f"|0> -> |{Y}^1>" in lines[i]:  # Directly search for transition
-                dipstr_match = re.search(r"DipStr = ([0-9.E+-]+)", lines[i + 1])
-                if dipstr_match:
-                    dipole_strength = float(dipstr_match.group(1))
-                    break
-    except FileNotFoundError:
-        print(f"Log file not found: {log_file}")
-    except Exception as e:
-        print(f"An error occurred while processing {log_file}: {e}")
-    return dipole_strength
-
-def process_directories(X, Y, base_dir):
+        yield root, (magnitude_of_shift, huang_rhys, shift_value, dipstr_abs, dipstr_emi)
+
+def process_directories(X, Y, base_dir, cache=None, use_hash=False, jobs=1, method="mmap", cache_file=None):
     """Recursively find relevant subdirectories and extract data."""
-    results = []
-    
-    for root, _, files in os.walk(base_dir):
-        dir_name = os.path.basename(root)
-        match = re.match(fr'{X}_Shift_{Y}_(-?\d+\.\d+)', dir_name)  # Allow negative values
-        
-        if match:
-            magnitude_of_shift = float(match.group(1))
-            abs_log = os.path.join(root, "PW6B95D3_N_FCHT_ABS.log")
-            emi_log = os.path.join(root, "PW6B95D3_N_FCHT_EMI.log")
-            
-            
-            dipstr_abs = extract_transition_modes_and_dipstr(abs_log,Y) if os.path.exists(abs_log) else None
-            dipstr_emi = extract_transition_modes_and_dipstr(emi_log,Y) if os.path.exists(emi_log) else None
-            
-            huang_rhys = extract_value_from_section(abs_log, "Huang-Rhys Factors", Y, r"Mode num\.\s+{}\s+- Factor:\s+([0-9.D+-]+)") if os.path.exists(abs_log) else None
-            shift_value = extract_value_from_section(abs_log, "Shift Vector", Y, r"\s+{}\s+([0-9.D+-]+)") if os.path.exists(abs_log) else None
-            
-            results.append((magnitude_of_shift, huang_rhys, shift_value, dipstr_abs, dipstr_emi))
+    directories = find_shift_directories(X, base_dir, Y)
+    results = [row for _, row in iter_directory_rows(directories, Y, cache, use_hash, jobs, method, cache_file)]
     
     return sorted(results)  # Sort by magnitude of shift
 
+def stream_directories(X, Y, base_dir, output_file, cache=None, use_hash=False, jobs=1, method="mmap", batch_size=100,
+                       cache_file=None):
+    """
+    Like process_directories + save_to_csv, but each row goes to a crash-safe
+    '<output_file>.partial' as soon as its directory is parsed. A rerun after a
+    crash resumes from the partial file, and the final sort is a bounded-memory merge.
+    """
+    with StreamingCsvWriter(output_file, CSV_HEADER, batch_size) as writer:
+        directories = [entry for entry in find_shift_directories(X, base_dir, Y) if entry[2] not in writer.done_keys]
+        for root, row in iter_directory_rows(directories, Y, cache, use_hash, jobs, method, cache_file):
+            writer.write(root, row)
+        writer.finalize(sort_key=lambda row: float(row[0]))  # Sort by magnitude of shift
+    print(f"Data successfully saved to {output_file}")
+
+def process_directories_all_modes(X, base_dir, cache=None, use_hash=False, jobs=1, method="mmap", cache_file=None):
+    """
+    Extracts every mode from every {X}_Shift_{Y}_<mag> directory, one parse per log.
+    Returns (shifted_modes, magnitudes, arrays) where each array in 'arrays' has
+    shape (n_directories, n_modes) and is indexed by mode - 1.
+    """
+    directories = find_shift_directories(X, base_dir)
+    records = list(parse_shift_directories(directories, cache, use_hash, jobs, method, cache_file))
+    n_modes = max((record_n_modes(record) for pair in records for record in pair if record), default=0)
+    
+    arrays = {key: np.full((len(records), n_modes), np.nan) for key in ("huang_rhys", "shift", "dipstr_abs", "dipstr_emi")}
+    for row, (abs_record, emi_record) in enumerate(records):
+        for key, values in all_mode_arrays(abs_record, emi_record, n_modes).items():
+            arrays[key][row] = values
+    
+    shifted_modes = np.array([entry[0] for entry in directories], dtype=int)
+    magnitudes = np.array([entry[1] for entry in directories])
+    return shifted_modes, magnitudes, arrays
+
+def save_wide_csv(shifted_modes, magnitudes, arrays, output_file):
+    """Saves an all-modes sweep as one wide CSV: one row per directory, one column per mode and quantity."""
+    n_modes = arrays["huang_rhys"].shape[1]
+    columns = [("huang_rhys", "HR"), ("shift", "Shift"), ("dipstr_abs", "ABS"), ("dipstr_emi", "EMI")]
+    header = ["Shifted Mode", "Magnitude"]
+    for _, label in columns:
+        header.extend(f"{label}_{mode}" for mode in range(1, n_modes + 1))
+    
+    with open(output_file, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        for row in range(len(magnitudes)):
+            values = [shifted_modes[row], magnitudes[row]]
+            for key, _ in columns:
+                values.extend("" if np.isnan(v) else v for v in arrays[key][row].tolist())
+            writer.writerow(values)
+    print(f"Data successfully saved to {output_file}")
+
 def save_to_csv(results, output_file):
     """Saves extracted data to a CSV file."""
     with open(output_file, 'w', newline='') as f:
         writer = csv.writer(f)
-        writer.writerow(["Magnitude", "Huang-Rhys", "Shift", "ABS", "EMI"])
+        writer.writerow(CSV_HEADER)
         writer.writerows(results)
     print(f"Data successfully saved to {output_file}")
 
+def read_csv_rows(csv_file):
+    """Reads back the data rows of a results CSV."""
+    with open(csv_file, 'r', newline='') as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        return [row for row in reader if row]
+
 def main():
+    parser = argparse.ArgumentParser(description="Extract HR factors, shifts and dipole strengths from FCHT sweeps.")
+    parser.add_argument("--mode", type=int, help="Mode number that is being shifted along (prompted if omitted)")
+    parser.add_argument("--all-modes", action="store_true", help="Extract every mode and write one wide CSV for the sweep")
+    parser.add_argument("--jobs", type=int, default=1, help="Number of worker processes used to parse logs")
+    parser.add_argument("--read-mode", choices=["mmap", "tail", "stream"], default="mmap",
+                        help="How logs are read: memory-mapped, tail-first (for network filesystems) or line by line")
+    parser.add_argument("--stream", action="store_true",
+                        help="Write rows to a crash-safe .partial file as they are parsed and resume from it after a crash")
+    parser.add_argument("--store", nargs="?", const=DEFAULT_STORE_NAME,
+                        help=f"Also write the results to a columnar NumPy store (default {DEFAULT_STORE_NAME})")
+    parser.add_argument("--no-cache", action="store_true", help=f"Re-parse every log instead of using {DEFAULT_CACHE_NAME}")
+    parser.add_argument("--hash", action="store_true", help="Also key the parsed-log cache on a SHA-256 of each log")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    enable_from_args(args)
+    
     X = "Unshifted"
-    Y = int(input("Enter Y (Mode number that is being shifted along): "))
     base_dir = os.getcwd()
-    output_file = f"{X}_{Y}_dipole_strengths.csv"
+    cache_file = None if args.no_cache else os.path.join(base_dir, DEFAULT_CACHE_NAME)
+    cache = open_log_cache(cache_file) if cache_file else None
+    
+    if args.all_modes:
+        output_file = f"{X}_all_modes.csv"
+        shifted_modes, magnitudes, arrays = process_directories_all_modes(X, base_dir, cache, args.hash, args.jobs, args.read_mode,
+                                                                              cache_file)
+        save_wide_csv(shifted_modes, magnitudes, arrays, output_file)
+        if args.store:
+            append_sweep(args.store, f"{X}_all_modes", table_from_arrays(shifted_modes, magnitudes, arrays))
+    else:
+        Y = args.mode if args.mode is not None else int(input("Enter Y (Mode number that is being shifted along): "))
+        output_file = f"{X}_{Y}_dipole_strengths.csv"
+        
+        if args.stream:
+            stream_directories(X, Y, base_dir, output_file, cache, args.hash, args.jobs, args.read_mode,
+                               cache_file=cache_file)
+            results = read_csv_rows(output_file) if args.store else None
+        else:
+            results = process_directories(X, Y, base_dir, cache, args.hash, args.jobs, args.read_mode, cache_file)
+            save_to_csv(results, output_file)
+        if args.store:
+            append_sweep(args.store, f"{X}_{Y}", table_from_rows(results, Y))
     
-    results = process_directories(X, Y, base_dir)
-    save_to_csv(results, output_file)
+    if cache is not None:
+        evict_missing(cache)
+        cache.close()
 
 if __name__ == "__main__":
     main()
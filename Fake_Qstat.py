@@ -0,0 +1,62 @@
+"""
+Stand-in for PBS 'qstat -x', answering from the Fake_Qsub.py submission log.
+
+A job is reported as queued (Q) for $FAKE_QSTAT_QUEUED seconds after its
+submission, then running (R) until $FAKE_QSTAT_RUNTIME seconds, then finished
+(F). Sub-job ids such as 1003[2].fake are answered from their array's entry.
+Use it wherever a script accepts --qstat, e.g. --qstat "python Fake_Qstat.py".
+"""
+import os
+import re
+import sys
+import json
+import time
+import tempfile
+
+
+def load_submissions(log_path):
+    """Returns {job_id: submission entry} from the fake qsub log."""
+    submissions = {}
+    if os.path.exists(log_path):
+        with open(log_path, 'r') as f:
+            for line in f:
+                entry = json.loads(line)
+                submissions[entry["job_id"]] = entry
+    return submissions
+
+
+def job_state(entry, now, queued, runtime):
+    """Returns the PBS state letter of a fake job at time 'now'."""
+    age = now - entry.get("time", 0)
+    if age < queued:
+        return "Q"
+    if age < runtime:
+        return "R"
+    return "F"
+
+
+def main():
+    log_path = os.environ.get("FAKE_QSUB_LOG", os.path.join(tempfile.gettempdir(), "fake_qsub_log.jsonl"))
+    queued = float(os.environ.get("FAKE_QSTAT_QUEUED", "0"))
+    runtime = float(os.environ.get("FAKE_QSTAT_RUNTIME", "0"))
+    submissions = load_submissions(log_path)
+    now = time.time()
+
+    job_ids = [arg for arg in sys.argv[1:] if not arg.startswith("-")]
+    print("Job id            Name             User              Time Use S Queue")
+    print("----------------  ---------------- ----------------  -------- - -----")
+    unknown = False
+    for job_id in job_ids:
+        # Sub-jobs share the submission entry of their array.
+        entry = submissions.get(re.sub(r"\[\d+\]", "[]", job_id))
+        if entry is None:
+            print(f"qstat: Unknown Job Id {job_id}", file=sys.stderr)
+            unknown = True
+            continue
+        name = (entry.get("name") or os.path.basename(entry["script"]))[:16]
+        print(f"{job_id:<17} {name:<16} {'fake':<16}  00:00:00 {job_state(entry, now, queued, runtime)} workq")
+    return 153 if unknown else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
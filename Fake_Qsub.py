@@ -0,0 +1,87 @@
+"""
+Stand-in for PBS qsub, for trying submission code without a cluster.
+
+Use it wherever a script accepts --qsub, e.g. --qsub "python Fake_Qsub.py".
+Every submission is appended as a JSON line to $FAKE_QSUB_LOG (default
+fake_qsub_log.jsonl in the system temp directory) and a fake job id is printed.
+With FAKE_QSUB_RUN=1 the script is also run locally with bash, once per
+array index for '-J' jobs, with PBS_ARRAY_INDEX, PBS_O_WORKDIR and TMPDIR set.
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+import argparse
+import subprocess
+
+
+def parse_array_range(spec):
+    """Expands a PBS '-J start-end[:step]' range into a list of indices."""
+    spec, _, step = spec.partition(":")
+    start, end = spec.split("-")
+    return list(range(int(start), int(end) + 1, int(step or 1)))
+
+
+def next_job_id(log_path):
+    """Returns 1000 + the number of submissions already logged."""
+    if not os.path.exists(log_path):
+        return 1000
+    with open(log_path, 'r') as f:
+        return 1000 + sum(1 for _ in f)
+
+
+def run_locally(script, variables, array_indices):
+    """Runs a submitted script with bash, once per array index."""
+    env = dict(os.environ, PBS_O_WORKDIR=os.getcwd())
+    for assignment in filter(None, variables.split(",")):
+        name, _, value = assignment.partition("=")
+        env[name] = value
+    for index in array_indices or [None]:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            env["TMPDIR"] = tmpdir
+            if index is not None:
+                env["PBS_ARRAY_INDEX"] = str(index)
+            subprocess.run(["bash", script], env=env, check=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake qsub that logs submissions instead of queueing them.")
+    parser.add_argument("-v", dest="variables", default="", help="Comma-separated VAR=value list")
+    parser.add_argument("-J", dest="array_range", help="Job array range, e.g. 1-100")
+    parser.add_argument("-W", dest="attributes", action="append", default=[], help="Job attributes, e.g. depend=afterok:1000")
+    parser.add_argument("-N", dest="name", help="Job name")
+    parser.add_argument("script", help="Job script")
+    args = parser.parse_args()
+
+    log_path = os.environ.get("FAKE_QSUB_LOG", os.path.join(tempfile.gettempdir(), "fake_qsub_log.jsonl"))
+    array_indices = parse_array_range(args.array_range) if args.array_range else None
+    if array_indices is None:
+        # Like PBS, honour a '#PBS -J' directive inside the script.
+        with open(args.script, 'r') as f:
+            for line in f:
+                if line.startswith("#PBS -J"):
+                    array_indices = parse_array_range(line.split()[2])
+
+    job_number = next_job_id(log_path)
+    job_id = f"{job_number}[].fake" if array_indices else f"{job_number}.fake"
+    entry = {
+        "job_id": job_id,
+        "script": os.path.abspath(args.script),
+        "cwd": os.getcwd(),
+        "variables": args.variables,
+        "array_indices": array_indices,
+        "attributes": args.attributes,
+        "name": args.name,
+        "time": time.time(),
+    }
+    with open(log_path, 'a') as f:
+        f.write(json.dumps(entry) + "\n")
+
+    if os.environ.get("FAKE_QSUB_RUN") == "1":
+        run_locally(args.script, args.variables, array_indices)
+    print(job_id)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
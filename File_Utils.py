@@ -0,0 +1,37 @@
+"""Writes and links the input files that sweep scripts stage into their job directories."""
+import os
+import shutil
+
+
+def write_if_changed(path: str, content: str):
+    """
+    Writes content to path unless the file already holds exactly that content.
+    Returns True if the file was (re)written.
+    """
+    if os.path.isfile(path) and not os.path.islink(path):
+        with open(path, 'r') as f:
+            if f.read() == content:
+                return False
+    if os.path.islink(path):
+        os.remove(path)
+    with open(path, 'w') as f:
+        f.write(content)
+    return True
+
+
+def link_shared_file(src: str, dst: str):
+    """
+    Shares a read-only input with a sweep directory: hardlink if possible,
+    otherwise symlink, otherwise a plain copy. Existing links to src are kept.
+    """
+    if os.path.lexists(dst):
+        if os.path.exists(dst) and os.path.samefile(src, dst):
+            return
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        try:
+            os.symlink(os.path.abspath(src), dst)
+        except OSError:
+            shutil.copy2(src, dst)
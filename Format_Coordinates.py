@@ -1,22 +1,9 @@
-def format_irregular_coordinates():
-    """
-    Processes irregular coordinate data entered by the user, extracts relevant components,
-    and formats them into the proper coordinate format for Gaussian input files.
-    
-    Returns:
-        str: Properly formatted coordinate string.
-    """
-    print("Enter the irregular coordinate data (type 'END' on a new line to finish):")
-    irregular_data = []
-    while True:
-        line = input()
-        if line.strip().upper() == "END":
-            break
-        irregular_data.append(line)
+import argparse
+import numpy as np
+from Geometry_Reader import ORIENTATION_HEADER, INPUT_ORIENTATION_HEADER, iter_log_orientations, read_converged_orientation
 
-    # Define a mapping of atomic numbers to atomic symbols
-    
-    atomic_symbols = {
+# Define a mapping of atomic numbers to atomic symbols
+ATOMIC_SYMBOL_MAP = {
     1: "H",   2: "He",
     3: "Li",  4: "Be",  5: "B",   6: "C",   7: "N",   8: "O",   9: "F",  10: "Ne",
     11: "Na", 12: "Mg", 13: "Al", 14: "Si", 15: "P",  16: "S",  17: "Cl", 18: "Ar",
@@ -34,25 +21,112 @@ def format_irregular_coordinates():
     106: "Sg", 107: "Bh", 108: "Hs", 109: "Mt", 110: "Ds", 111: "Rg", 112: "Cn",
     113: "Nh", 114: "Fl", 115: "Mc", 116: "Lv", 117: "Ts", 118: "Og"}
 
-    formatted_coordinates = []
+# Lookup array: ATOMIC_SYMBOLS[Z] is the symbol of element Z, index 0 is "X" for unknown atoms.
+ATOMIC_SYMBOLS = np.array(["X"] + [ATOMIC_SYMBOL_MAP[z] for z in range(1, len(ATOMIC_SYMBOL_MAP) + 1)])
+
+
+def symbols_for(atomic_numbers):
+    """Maps an array of atomic numbers to symbols in one lookup ("X" for unknown atoms)."""
+    atomic_numbers = np.asarray(atomic_numbers, dtype=int)
+    known = (atomic_numbers > 0) & (atomic_numbers < len(ATOMIC_SYMBOLS))
+    return ATOMIC_SYMBOLS[np.where(known, atomic_numbers, 0)]
+
+
+def format_coordinate_block(atomic_numbers, coords):
+    """Formats atoms as Gaussian-style coordinate lines, ready to paste into a .com file."""
+    return "\n".join(f"{symbol:<2} {x:>10.6f} {y:>10.6f} {z:>10.6f}"
+                     for symbol, (x, y, z) in zip(symbols_for(atomic_numbers).tolist(), coords.tolist()))
+
+
+def format_irregular_coordinates():
+    """
+    Processes irregular coordinate data entered by the user, extracts relevant components,
+    and formats them into the proper coordinate format for Gaussian input files.
+    
+    Returns:
+        str: Properly formatted coordinate string.
+    """
+    print("Enter the irregular coordinate data (type 'END' on a new line to finish):")
+    irregular_data = []
+    while True:
+        line = input()
+        if line.strip().upper() == "END":
+            break
+        irregular_data.append(line)
+
+    atomic_numbers = []
+    coords = []
     
     for line in irregular_data:
         parts = line.split()
         if len(parts) >= 6:
             # Extract atomic number and coordinates
-            atomic_number = int(parts[1])  # Second column is the atomic number
-            x, y, z = parts[3], parts[4], parts[5]  # Last three columns are the coordinates
-            
-            # Map atomic number to atomic symbol
-            atomic_symbol = atomic_symbols.get(atomic_number, "X")  # Use "X" for unknown atoms
-            
-            # Format into Gaussian-style coordinates
-            formatted_line = f"{atomic_symbol:<2} {float(x):>10.6f} {float(y):>10.6f} {float(z):>10.6f}"
-            formatted_coordinates.append(formatted_line)
-
-    return "\n".join(formatted_coordinates)
-
-# Example usage
-formatted_output = format_irregular_coordinates()
-print("\nFormatted Coordinates:")
-print(formatted_output)
+            atomic_numbers.append(int(parts[1]))  # Second column is the atomic number
+            coords.append([float(parts[3]), float(parts[4]), float(parts[5])])  # Last three columns are the coordinates
+
+    # Format into Gaussian-style coordinates
+    return format_coordinate_block(np.array(atomic_numbers, dtype=int), np.array(coords).reshape(-1, 3))
+
+
+def write_trajectory(log_file, output_file, header=ORIENTATION_HEADER):
+    """
+    Streams every orientation block of a log into a multi-frame XYZ file, one
+    block at a time, so logs with thousands of optimization steps use bounded
+    memory. Returns the number of frames written.
+    """
+    n_frames = 0
+    with open(output_file, 'w') as f:
+        for atomic_numbers, coords in iter_log_orientations(log_file, header):
+            n_frames += 1
+            f.write(f"{len(atomic_numbers)}\nStep {n_frames}\n")
+            f.write(format_coordinate_block(atomic_numbers, coords) + "\n")
+    return n_frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract Gaussian-style coordinates from an optimization log.")
+    parser.add_argument("log", nargs="?", help="Gaussian log to read (paste an orientation block if omitted)")
+    parser.add_argument("--all", action="store_true",
+                        help="Write every orientation block as a multi-frame XYZ file instead of the converged geometry")
+    parser.add_argument("--last", action="store_true",
+                        help="Use the last orientation block even if the optimization did not converge")
+    parser.add_argument("--input-orientation", action="store_true",
+                        help='Read "Input orientation" blocks (for nosymm jobs) instead of "Standard orientation"')
+    parser.add_argument("--output", help="File for the coordinate block (printed if omitted)")
+    args = parser.parse_args()
+
+    if args.log is None:
+        # Example usage
+        formatted_output = format_irregular_coordinates()
+        print("\nFormatted Coordinates:")
+        print(formatted_output)
+        return
+
+    header = INPUT_ORIENTATION_HEADER if args.input_orientation else ORIENTATION_HEADER
+    if args.all:
+        output_file = args.output or args.log.rsplit(".", 1)[0] + "_trajectory.xyz"
+        n_frames = write_trajectory(args.log, output_file, header)
+        print(f"Wrote {n_frames} geometries to {output_file}")
+        return
+
+    if args.last:
+        orientation = None
+        for orientation in iter_log_orientations(args.log, header):
+            pass
+    else:
+        orientation = read_converged_orientation(args.log, header)
+    if orientation is None:
+        print(f"No {'' if args.last else 'converged '}geometry found in {args.log}")
+        return
+
+    block = format_coordinate_block(*orientation)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(block + "\n")
+        print(f"Coordinates saved to {args.output}")
+    else:
+        print(block)
+
+
+if __name__ == "__main__":
+    main()
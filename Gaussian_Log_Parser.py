@@ -0,0 +1,415 @@
+import os
+import re
+import mmap
+import numpy as np
+from Stage_Timer import stage
+
+HR_HEADER = "Huang-Rhys Factors"
+SHIFT_HEADER = "Shift Vector"
+
+HR_PATTERN = re.compile(r"Mode num\.\s+(\d+)\s+- Factor:\s+([0-9.D+-]+)")
+SHIFT_PATTERN = re.compile(r"^\s+(\d+)\s+([0-9.D+-]+)")
+TRANSITION_PATTERN = re.compile(r"\|0> -> \|(\d+)\^1>")
+DIPSTR_PATTERN = re.compile(r"DipStr = ([0-9.E+-]+)")
+SCF_ENERGY_PATTERN = re.compile(r"SCF Done:\s+E\(\S+\)\s+=\s+(-?\d+\.\d+)")
+TD_ENERGY_PATTERN = re.compile(r"E\(TD-HF/TD-DFT\)\s+=\s+(-?\d+\.\d+)")
+
+
+def to_float(text):
+    """Converts a Gaussian number (which may use D exponents) to float."""
+    return float(text.replace('D', 'E'))
+
+
+def new_fcht_record():
+    """
+    Returns an empty FCHT record: one {mode: value} dict per extracted quantity.
+    """
+    return {"huang_rhys": {}, "shift": {}, "dipstr": {}}
+
+
+def parse_fcht_lines(lines):
+    """
+    Fills an FCHT record from an iterable of log lines in a single pass.
+
+    Collects every Huang-Rhys factor, every Shift Vector entry and the DipStr
+    of every |0> -> |n^1> fundamental. The first value seen for a mode wins,
+    as with the original per-mode searches.
+    """
+    record = new_fcht_record()
+    huang_rhys = record["huang_rhys"]
+    shift = record["shift"]
+    dipstr = record["dipstr"]
+
+    section = None
+    pending_mode = None
+    for line in lines:
+        if pending_mode is not None:
+            # The DipStr of a transition is printed on the line after it.
+            match = DIPSTR_PATTERN.search(line)
+            if match:
+                dipstr.setdefault(pending_mode, float(match.group(1)))
+            pending_mode = None
+
+        if HR_HEADER in line:
+            section = huang_rhys
+            continue
+        if SHIFT_HEADER in line:
+            section = shift
+            continue
+
+        if "|0> -> |" in line:
+            match = TRANSITION_PATTERN.search(line)
+            if match:
+                pending_mode = int(match.group(1))
+            continue
+
+        if section is huang_rhys:
+            match = HR_PATTERN.search(line)
+            if match:
+                huang_rhys.setdefault(int(match.group(1)), to_float(match.group(2)))
+            elif huang_rhys and line.strip() and "Mode num." not in line:
+                section = None
+        elif section is shift:
+            match = SHIFT_PATTERN.search(line)
+            if match:
+                shift.setdefault(int(match.group(1)), to_float(match.group(2)))
+            elif shift and line.strip():
+                section = None
+    return record
+
+
+HR_HEADER_BYTES = HR_HEADER.encode()
+SHIFT_HEADER_BYTES = SHIFT_HEADER.encode()
+TRANSITION_MARKER = b"|0> -> |"
+DIPSTR_MARKER = b"DipStr = "
+FACTOR_NUMBER_BYTES = frozenset(b"0123456789.D+-")
+DIPSTR_NUMBER_BYTES = frozenset(b"0123456789.E+-")
+
+
+def leading_number(text, allowed=FACTOR_NUMBER_BYTES):
+    """Returns the leading run of 'allowed' number characters of a bytes string."""
+    end = 0
+    while end < len(text) and text[end] in allowed:
+        end += 1
+    return text[:end]
+
+
+def line_bounds(buffer, pos):
+    """Returns (start, end) of the line containing pos, excluding the newline."""
+    start = buffer.rfind(b"\n", 0, pos) + 1
+    end = buffer.find(b"\n", pos)
+    return start, (len(buffer) if end == -1 else end)
+
+
+def parse_hr_line(parts):
+    """Returns (mode, factor) for a "Mode num. N - Factor: F" line split into parts, else None."""
+    if len(parts) >= 6 and parts[0] == b"Mode" and parts[1] == b"num." and parts[2].isdigit() \
+            and parts[3] == b"-" and parts[4] == b"Factor:":
+        number = leading_number(parts[5])
+        if number:
+            return int(parts[2]), to_float(number.decode())
+    return None
+
+
+def parse_shift_line(line, parts):
+    """Returns (mode, shift) for an indented "N  S" Shift Vector line, else None."""
+    if len(parts) >= 2 and line[:1].isspace() and parts[0].isdigit():
+        number = leading_number(parts[1])
+        if number:
+            return int(parts[0]), to_float(number.decode())
+    return None
+
+
+def scan_section(buffer, header, other_header, parse_line, values):
+    """
+    Jumps to every occurrence of 'header' with bytes.find and parses only the
+    bounded block of entries that follows it. A block ends at the first
+    non-blank line that is not an entry (once entries have started) or at the
+    next section header.
+    """
+    pos = buffer.find(header)
+    while pos != -1:
+        _, pos = line_bounds(buffer, pos)
+        found_entry = False
+        while pos < len(buffer):
+            start = pos + 1
+            end = buffer.find(b"\n", start)
+            if end == -1:
+                end = len(buffer)
+            line = buffer[start:end]
+            pos = end
+            if header in line or other_header in line:
+                break
+            entry = parse_line(line, line.split())
+            if entry:
+                values.setdefault(*entry)
+                found_entry = True
+            elif found_entry and line.strip() and b"Mode num." not in line:
+                break
+        pos = buffer.find(header, pos)
+
+
+def scan_transitions(buffer, dipstr):
+    """Jumps between |0> -> |n^1> markers and reads the DipStr on the following line."""
+    pos = buffer.find(TRANSITION_MARKER)
+    while pos != -1:
+        label_start = pos + len(TRANSITION_MARKER)
+        label = buffer[label_start:label_start + 16]
+        close = label.find(b"^1>")
+        _, end = line_bounds(buffer, pos)
+        if close > 0 and label[:close].isdigit():
+            next_start = end + 1
+            next_end = buffer.find(b"\n", next_start)
+            next_line = buffer[next_start:len(buffer) if next_end == -1 else next_end]
+            marker = next_line.find(DIPSTR_MARKER)
+            if marker != -1:
+                number = leading_number(next_line[marker + len(DIPSTR_MARKER):], DIPSTR_NUMBER_BYTES)
+                if number:
+                    dipstr.setdefault(int(label[:close]), float(number))
+        pos = buffer.find(TRANSITION_MARKER, end)
+
+
+def parse_fcht_buffer(buffer):
+    """
+    Fills an FCHT record from a bytes-like buffer (e.g. an mmap) without
+    decoding anything outside the Huang-Rhys, Shift Vector and transition lines.
+    """
+    record = new_fcht_record()
+    scan_section(buffer, HR_HEADER_BYTES, SHIFT_HEADER_BYTES, lambda line, parts: parse_hr_line(parts), record["huang_rhys"])
+    scan_section(buffer, SHIFT_HEADER_BYTES, HR_HEADER_BYTES, parse_shift_line, record["shift"])
+    scan_transitions(buffer, record["dipstr"])
+    return record
+
+
+def parse_fcht_mmap(log_file):
+    """Memory-maps a log and parses its FCHT record with parse_fcht_buffer."""
+    with stage("parse_log", path=log_file), open(log_file, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return new_fcht_record()
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            return parse_fcht_buffer(buffer)
+
+
+def read_fcht_tail(log_file, block_size=4 << 20, max_tail=64 << 20):
+    """
+    Reads a log backwards in blocks until both the Huang-Rhys and Shift Vector
+    headers have been seen. Returns the tail (which also holds the transition
+    lines printed after them), or None if the headers are not within the last
+    'max_tail' bytes.
+    """
+    headers = [HR_HEADER_BYTES, SHIFT_HEADER_BYTES]
+    overlap = max(len(header) for header in headers) - 1
+    with open(log_file, 'rb') as file:
+        pos = file.seek(0, os.SEEK_END)
+        blocks = []
+        tail_size = 0
+        while headers and pos > 0 and tail_size < max_tail:
+            step = min(block_size, pos)
+            pos -= step
+            tail_size += step
+            file.seek(pos)
+            block = file.read(step)
+            # Include the start of the previous block so a header split across the boundary is found.
+            window = block + (blocks[0][:overlap] if blocks else b"")
+            headers = [header for header in headers if header not in window]
+            blocks.insert(0, block)
+    return b"".join(blocks) if not headers else None
+
+
+def parse_fcht_tail(log_file):
+    """
+    Parses the FCHT sections from the end of the log, falling back to a
+    forward memory-mapped scan when they are not in the tail window.
+    """
+    with stage("read_log") as timer:
+        tail = read_fcht_tail(log_file)
+        timer.add_bytes(len(tail) if tail is not None else 0)
+    if tail is None:
+        return parse_fcht_mmap(log_file)
+    with stage("parse_log"):
+        return parse_fcht_buffer(tail)
+
+
+def parse_fcht_log(log_file, method="mmap"):
+    """
+    Reads a Gaussian FCHT log once and returns its FCHT record.
+    method="mmap" memory-maps the log and jumps straight to the sections;
+    method="tail" reads backwards from the end of the log first (see
+    parse_fcht_tail); method="stream" reads it line by line.
+    Returns None if the log cannot be read.
+    """
+    try:
+        if method == "mmap":
+            return parse_fcht_mmap(log_file)
+        if method == "tail":
+            return parse_fcht_tail(log_file)
+        with stage("parse_log", path=log_file), open(log_file, 'r') as file:
+            return parse_fcht_lines(file)
+    except FileNotFoundError:
+        print(f"Log file not found: {log_file}")
+    except Exception as e:
+        print(f"An error occurred while processing {log_file}: {e}")
+    return None
+
+
+def record_n_modes(record):
+    """Returns the highest mode number present in an FCHT record (0 if empty)."""
+    return max((max(values, default=0) for values in record.values()), default=0)
+
+
+def record_to_arrays(record, n_modes=None):
+    """
+    Converts an FCHT record into dense NumPy arrays indexed by mode - 1.
+    Modes missing from the log are NaN. If n_modes is not given it is taken
+    from the highest mode number in the record.
+    """
+    if n_modes is None:
+        n_modes = record_n_modes(record)
+    arrays = {}
+    for key, values in record.items():
+        array = np.full(n_modes, np.nan)
+        for mode, value in values.items():
+            if 1 <= mode <= n_modes:
+                array[mode - 1] = value
+        arrays[key] = array
+    return arrays
+
+
+def all_mode_arrays(abs_record, emi_record=None, n_modes=None):
+    """
+    Returns the HR factor, shift and ABS/EMI DipStr of every mode of a parsed
+    ABS/EMI record pair as a dict of NumPy arrays ("huang_rhys", "shift",
+    "dipstr_abs", "dipstr_emi") indexed by mode - 1. A missing record gives NaN
+    arrays. If n_modes is not given it is taken from the highest mode present.
+    """
+    if n_modes is None:
+        n_modes = max((record_n_modes(record) for record in (abs_record, emi_record) if record), default=0)
+    abs_arrays = record_to_arrays(abs_record, n_modes) if abs_record else {}
+    emi_arrays = record_to_arrays(emi_record, n_modes) if emi_record else {}
+    missing = np.full(n_modes, np.nan)
+    return {
+        "huang_rhys": abs_arrays.get("huang_rhys", missing),
+        "shift": abs_arrays.get("shift", missing),
+        "dipstr_abs": abs_arrays.get("dipstr", missing),
+        "dipstr_emi": emi_arrays.get("dipstr", missing),
+    }
+
+
+def parse_final_energy(log_file, excited=False):
+    """
+    Returns the last total energy (Hartree) printed in a Gaussian log: the SCF
+    energy, or with excited=True the TD-DFT total energy of the root followed.
+    Returns None if the log cannot be read or holds no such energy.
+    """
+    pattern = TD_ENERGY_PATTERN if excited else SCF_ENERGY_PATTERN
+    marker = "E(TD-HF/TD-DFT)" if excited else "SCF Done:"
+    energy = None
+    try:
+        with open(log_file, 'r') as file:
+            for line in file:
+                if marker in line:
+                    match = pattern.search(line)
+                    if match:
+                        energy = float(match.group(1))
+    except FileNotFoundError:
+        print(f"Log file not found: {log_file}")
+    return energy
+
+
+SPECTRUM_HEADER_BYTES = b"Final Spectrum"
+
+
+def parse_spectrum_table(text, column=1):
+    """
+    Reads the "Energy  Intensity ..." rows of a Final Spectrum section.
+    Rows start after the column header and end at the first non-numeric line.
+    Returns (energies, intensities) as NumPy arrays, empty if there are no rows.
+    """
+    energies, intensities = [], []
+    for line in text.splitlines():
+        parts = line.split()
+        if len(parts) <= column:
+            if energies:
+                break
+            continue
+        try:
+            energy, intensity = float(parts[0]), to_float(parts[column])
+        except ValueError:
+            if energies:
+                break
+            continue
+        energies.append(energy)
+        intensities.append(intensity)
+    return np.array(energies), np.array(intensities)
+
+
+def parse_spectrum(log_file, column=1):
+    """
+    Returns (energies in cm^-1, intensities) of the last convolved "Final
+    Spectrum" table in an FCHT log (column=1 is the T=0K intensity), or None if
+    the log cannot be read or holds no spectrum. Only the end of the log, from
+    the last table header on, is decoded.
+    """
+    try:
+        with stage("parse_spectrum", path=log_file), open(log_file, 'rb') as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return None
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                start = buffer.rfind(SPECTRUM_HEADER_BYTES)
+                if start == -1:
+                    return None
+                text = buffer[start:].decode(errors="replace")
+    except FileNotFoundError:
+        print(f"Log file not found: {log_file}")
+        return None
+    energies, intensities = parse_spectrum_table(text, column)
+    return (energies, intensities) if len(energies) else None
+
+
+ENERGY_MARKER = b"Energy ="
+INTENSITY_MARKER = b"Intensity ="
+
+
+def number_after(line, marker):
+    """Returns the number following 'marker' in a bytes line, or None."""
+    pos = line.find(marker)
+    if pos == -1:
+        return None
+    parts = line[pos + len(marker):].split(None, 1)
+    try:
+        return to_float(parts[0].rstrip(b")").decode()) if parts else None
+    except ValueError:
+        return None
+
+
+def parse_sticks(log_file):
+    """
+    Returns the stick spectrum of an FCHT log: (energies in cm^-1, DipStr,
+    intensities) NumPy arrays with one entry per "|0> -> |...>" transition line
+    (fundamentals, overtones, combinations and the 0-0 band), or None if the
+    log cannot be read or lists no transitions.
+    """
+    energies, dipstr, intensities = [], [], []
+    try:
+        with stage("parse_sticks", path=log_file), open(log_file, 'rb') as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return None
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                pos = buffer.find(TRANSITION_MARKER)
+                while pos != -1:
+                    start, end = line_bounds(buffer, pos)
+                    next_end = buffer.find(b"\n", end + 1)
+                    next_line = buffer[end + 1:len(buffer) if next_end == -1 else next_end]
+                    values = (number_after(buffer[start:end], ENERGY_MARKER), number_after(next_line, DIPSTR_MARKER),
+                              number_after(next_line, INTENSITY_MARKER))
+                    if None not in values:
+                        energies.append(values[0])
+                        dipstr.append(values[1])
+                        intensities.append(values[2])
+                    pos = buffer.find(TRANSITION_MARKER, end)
+    except FileNotFoundError:
+        print(f"Log file not found: {log_file}")
+        return None
+    if not energies:
+        return None
+    return np.array(energies), np.array(dipstr), np.array(intensities)
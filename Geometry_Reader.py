@@ -0,0 +1,145 @@
+import os
+import numpy as np
+
+ORIENTATION_HEADER = "Standard orientation:"
+INPUT_ORIENTATION_HEADER = "Input orientation:"
+
+
+def split_com_template(lines):
+    """
+    Splits a Gaussian input into (head, coordinate lines, tail) around the
+    coordinate block that follows the charge/multiplicity line, the same block
+    update_com_file replaces.
+    """
+    charge_line_index = None
+    for idx, line in enumerate(lines):
+        parts = line.strip().split()
+        if len(parts) == 2:
+            try:
+                float(parts[0])
+                float(parts[1])
+                charge_line_index = idx
+                break
+            except ValueError:
+                continue
+    if charge_line_index is None:
+        raise ValueError("Could not find charge/multiplicity line in .com file.")
+
+    coord_end_index = charge_line_index + 1
+    while coord_end_index < len(lines) and lines[coord_end_index].strip():
+        coord_end_index += 1
+
+    head = "".join(lines[:charge_line_index + 1])
+    coordinate_lines = [line.rstrip("\n") for line in lines[charge_line_index + 1:coord_end_index]]
+    tail = "".join(lines[coord_end_index:])
+    return head, coordinate_lines, tail
+
+
+def stack_frames(frames, labels, source):
+    """
+    Stacks per-frame (n_atoms, 3) coordinates into one (n_frames, n_atoms, 3)
+    array. Raises ValueError naming the first frame whose atom count differs.
+    """
+    if not frames:
+        return np.empty((0, 0, 3))
+    for frame, label in zip(frames, labels):
+        if len(frame) != len(frames[0]):
+            raise ValueError(f"{source}: {label} has {len(frame)} atoms but {labels[0]} has {len(frames[0])}")
+    return np.array(frames)
+
+
+def read_com_geometry(com_file):
+    """Returns the (n_atoms, 3) coordinates of a Gaussian input file's coordinate block."""
+    with open(com_file, 'r') as f:
+        _, coordinate_lines, _ = split_com_template(f.readlines())
+    return np.array([[float(value) for value in line.split()[-3:]] for line in coordinate_lines])
+
+
+def read_orientation_block(f):
+    """
+    Reads the rows of an orientation block from an open log positioned just
+    after its header line. Returns (atomic_numbers, coords).
+    """
+    # Skip the dashed rule, the two column header lines and the second rule.
+    for _ in range(4):
+        next(f, None)
+    numbers, coords = [], []
+    for row in f:
+        parts = row.split()
+        if len(parts) != 6 or not parts[0].isdigit():
+            break
+        numbers.append(int(parts[1]))
+        coords.append([float(parts[3]), float(parts[4]), float(parts[5])])
+    return np.array(numbers, dtype=int), np.array(coords)
+
+
+def iter_log_orientations(log_file, header=ORIENTATION_HEADER):
+    """
+    Streams a Gaussian log and yields (atomic_numbers, coords) for every
+    orientation block with the given header, e.g. one per optimization step.
+    Only the block being read is held in memory.
+    """
+    with open(log_file, 'r') as f:
+        for line in f:
+            if header in line:
+                yield read_orientation_block(f)
+
+
+def read_converged_orientation(log_file, header=ORIENTATION_HEADER):
+    """
+    Streams a Gaussian log and returns (atomic_numbers, coords) of the last
+    geometry an optimization converged to: the last orientation block before
+    the last "Stationary point found". Returns None if no optimization in the
+    log converged. Only two blocks are held in memory at a time.
+    """
+    last = converged = None
+    with open(log_file, 'r') as f:
+        for line in f:
+            if header in line:
+                last = read_orientation_block(f)
+            elif "Stationary point found" in line:
+                converged = last
+    return converged
+
+
+def read_log_frames(log_file):
+    """
+    Returns every orientation of a log as an (n_frames, n_atoms, 3) array,
+    using "Standard orientation" blocks, or "Input orientation" blocks for
+    nosymm jobs that print no standard orientation.
+    """
+    frames = [coords for _, coords in iter_log_orientations(log_file)]
+    if not frames:
+        frames = [coords for _, coords in iter_log_orientations(log_file, INPUT_ORIENTATION_HEADER)]
+    return stack_frames(frames, [f"orientation {i + 1}" for i in range(len(frames))], log_file)
+
+
+def read_xyz_frames(xyz_file):
+    """Returns every frame of an (multi-frame) XYZ file as an (n_frames, n_atoms, 3) array."""
+    frames = []
+    with open(xyz_file, 'r') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            n_atoms = int(line)
+            next(f)  # Comment line
+            frames.append([[float(value) for value in next(f).split()[1:4]] for _ in range(n_atoms)])
+    return stack_frames(frames, [f"frame {i + 1}" for i in range(len(frames))], xyz_file)
+
+
+def read_frames(path):
+    """
+    Reads the geometries in a path as ([labels], (n_frames, n_atoms, 3) array).
+    A directory gives one frame per .com file in it (e.g. a Shift_* sweep), a
+    .log one frame per orientation block and an .xyz one frame per XYZ frame.
+    Raises ValueError if the frames of a path differ in their number of atoms.
+    """
+    if os.path.isdir(path):
+        com_files = sorted(fname for fname in os.listdir(path) if fname.endswith(".com"))
+        frames = [read_com_geometry(os.path.join(path, fname)) for fname in com_files]
+        return com_files, stack_frames(frames, com_files, path)
+    if path.endswith(".com"):
+        return [os.path.basename(path)], read_com_geometry(path)[np.newaxis]
+    frames = read_xyz_frames(path) if path.endswith(".xyz") else read_log_frames(path)
+    name = os.path.basename(path)
+    return [f"{name}:{i + 1}" for i in range(len(frames))], frames
@@ -0,0 +1,126 @@
+import os
+import csv
+import argparse
+import numpy as np
+from Displacement_Engine import coordinate_template
+from Normal_Mode_Parser import load_normal_modes, select_mode
+from Array_Submission import submit_array
+from Geometry_Reader import split_com_template
+from Stage_Timer import stage, add_profile_argument, enable_from_args
+
+
+def parse_magnitude_grid(spec):
+    """
+    Parses a magnitude grid: "start:stop:num" (inclusive linspace) or a
+    comma-separated list such as "-0.1,0.05,0.1".
+    """
+    if ":" in spec:
+        start, stop, num = spec.split(":")
+        return np.linspace(float(start), float(stop), int(num))
+    return np.array([float(value) for value in spec.split(",")])
+
+
+def grid_points(magnitude_grids):
+    """
+    Returns every combination of the per-mode magnitude grids as an
+    (n_points, n_scan_modes) array; the last mode varies fastest.
+    """
+    mesh = np.meshgrid(*magnitude_grids, indexing="ij")
+    return np.stack([axis.ravel() for axis in mesh], axis=1)
+
+
+def grid_displacements(atom_coords, mode_vectors, points):
+    """
+    Computes all displaced geometries of a grid in one pass.
+
+    Args:
+        atom_coords (np.ndarray): Reference coordinates, shape (n_atoms, 3).
+        mode_vectors (np.ndarray): Scanned mode vectors, shape (n_scan_modes, n_atoms, 3).
+        points (np.ndarray): Grid points, shape (n_points, n_scan_modes).
+
+    Returns:
+        np.ndarray: Displaced coordinates, shape (n_points, n_atoms, 3).
+    """
+    return atom_coords[np.newaxis] + np.tensordot(points, mode_vectors, axes=1)
+
+
+def magnitude_label(magnitude):
+    """Formats a magnitude the way the single-mode scripts name their files."""
+    return f"{magnitude:.8f}".rstrip("0").rstrip(".")
+
+
+def point_label(modes, point):
+    """Returns e.g. "11_0.05" for one mode or "11_0.05_16_-0.1" for a 2D grid point."""
+    return "_".join(f"{mode}_{magnitude_label(magnitude)}" for mode, magnitude in zip(modes, point))
+
+
+def write_grid_scan(template_path, output_dir, modes, mode_vectors, magnitude_grids, prefix="Benzene_Shift"):
+    """
+    Writes one .com per grid point from the template and a manifest.csv that
+    maps each file back to its grid indices and magnitudes.
+
+    Returns the path of the manifest.
+    """
+    with open(template_path, 'r') as f:
+        head, coordinate_lines, tail = split_com_template(f.readlines())
+    symbols = [line.split()[0] for line in coordinate_lines]
+    atom_coords = np.array([[float(value) for value in line.split()[1:4]] for line in coordinate_lines])
+
+    points = grid_points(magnitude_grids)
+    indices = grid_points([np.arange(len(grid)) for grid in magnitude_grids]).astype(int)
+    with stage("displace"):
+        geometries = grid_displacements(atom_coords, mode_vectors, points)
+
+    os.makedirs(output_dir, exist_ok=True)
+    # Link0 lines such as "%mem=" must survive the %-substitution.
+    template = head.replace("%", "%%") + coordinate_template(symbols) + "\n" + tail.replace("%", "%%")
+    manifest_path = os.path.join(output_dir, "manifest.csv")
+    with open(manifest_path, 'w', newline='') as manifest:
+        writer = csv.writer(manifest)
+        writer.writerow(["Point", "File"] + [f"Index_{mode}" for mode in modes] + [f"Magnitude_{mode}" for mode in modes])
+        for point_index, (point, index, coords) in enumerate(zip(points, indices, geometries)):
+            filename = f"{prefix}_{point_label(modes, point)}.com"
+            with stage("write_inputs"), open(os.path.join(output_dir, filename), 'w') as f:
+                f.write(template % tuple(coords.ravel().tolist()))
+            writer.writerow([point_index, filename, *index.tolist(), *point.tolist()])
+    return manifest_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write displaced .com files over a grid of normal-mode magnitudes.")
+    parser.add_argument("--freq-log", required=True, help="Gaussian freq log holding the normal modes")
+    parser.add_argument("--modes", type=int, nargs="+", required=True, help="Mode numbers to scan, e.g. 11 16")
+    parser.add_argument("--magnitudes", action="append", required=True,
+                        help="Grid per mode, in --modes order: start:stop:num or a comma list "
+                             "(use --magnitudes=-0.1:0.1:21 for negative starts)")
+    parser.add_argument("--template", default=os.path.join("Unshifted", "Benzene_Final.com"), help="Template .com file")
+    parser.add_argument("--output-dir", help="Output directory (default Shift_<mode>[x<mode>...])")
+    parser.add_argument("--array", action="store_true",
+                        help="Submit the grid as one PBS job array running Generic_Submission.sh with MODE/LABEL per point")
+    parser.add_argument("--qsub", default="qsub", help='qsub command, e.g. "python Fake_Qsub.py" for local testing')
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    enable_from_args(args)
+
+    if len(args.magnitudes) != len(args.modes):
+        parser.error("Give one --magnitudes grid per scanned mode.")
+
+    modes = load_normal_modes(args.freq_log)
+    mode_vectors = np.stack([select_mode(modes, mode) for mode in args.modes])
+    magnitude_grids = [parse_magnitude_grid(spec) for spec in args.magnitudes]
+    output_dir = args.output_dir or f"Shift_{'x'.join(str(mode) for mode in args.modes)}"
+
+    manifest_path = write_grid_scan(args.template, output_dir, args.modes, mode_vectors, magnitude_grids)
+    n_points = int(np.prod([len(grid) for grid in magnitude_grids]))
+    print(f"Written {n_points} inputs to {output_dir} (manifest: {manifest_path})")
+
+    if args.array:
+        base_dir = os.getcwd()
+        mode_label = "x".join(str(mode) for mode in args.modes)
+        entries = [(base_dir, "Generic_Submission.sh", f"MODE={mode_label},LABEL={point_label(args.modes, point)}")
+                   for point in grid_points(magnitude_grids)]
+        submit_array(entries, output_dir, f"Shift_{mode_label}", os.path.join(base_dir, "Generic_Submission.sh"), args.qsub)
+
+
+if __name__ == "__main__":
+    main()
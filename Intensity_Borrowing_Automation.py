@@ -1,7 +1,17 @@
 import os
+import shlex
+import argparse
 import shutil
 import subprocess
 import numpy as np
+from Displacement_Engine import atomic_symbols, displace_atoms_batch, format_output_batch
+from Normal_Mode_Parser import load_normal_modes, select_mode
+from Array_Submission import submit_array, subjob_id
+from Sweep_Journal import (JOURNAL_NAME, load_journal, append_journal, input_hash, sweep_plan, record_completions,
+                           summarize_plan, retire_log)
+from File_Utils import write_if_changed, link_shared_file
+from Geometry_Reader import split_com_template
+from Stage_Timer import stage, add_profile_argument, enable_from_args
 
 def extract_mode(data: list, mode: int):
     """
@@ -72,6 +82,14 @@ def update_sh_files(directory: str, new_dirname: str):
             with open(fpath, 'w') as f:
                 f.write(new_content)
 
+def replace_coordinate_block(lines: list, new_coords_lines: list):
+    """
+    Returns the lines of a Gaussian input file with the coordinate block after the
+    charge/multiplicity line (e.g., "0 1") replaced by new_coords_lines.
+    """
+    head, _, tail = split_com_template(lines)
+    return head.splitlines(keepends=True) + [line + "\n" for line in new_coords_lines] + tail.splitlines(keepends=True)
+
 def update_com_file(com_filepath: str, new_coords_lines: list):
     """
     Updates the coordinate section in a Gaussian input file.
@@ -81,40 +99,50 @@ def update_com_file(com_filepath: str, new_coords_lines: list):
     with open(com_filepath, 'r') as f:
         lines = f.readlines()
 
-    # Find the charge/multiplicity line (assumed to be a line with exactly two numbers)
-    charge_line_index = None
-    for idx, line in enumerate(lines):
-        parts = line.strip().split()
-        if len(parts) == 2:
-            try:
-                float(parts[0])
-                float(parts[1])
-                charge_line_index = idx
-                break
-            except ValueError:
-                continue
-    if charge_line_index is None:
-        raise ValueError("Could not find charge/multiplicity line in .com file.")
-
-    new_file_lines = lines[:charge_line_index+1]
-
-    # Skip over the old coordinate lines (assumed to continue until a blank line)
-    coord_end_index = charge_line_index+1
-    while coord_end_index < len(lines) and lines[coord_end_index].strip():
-        coord_end_index += 1
-
-    new_file_lines.extend([line + "\n" for line in new_coords_lines])
-    
-    if coord_end_index < len(lines) and lines[coord_end_index].strip() == "":
-        new_file_lines.append("\n")
-        new_file_lines.extend(lines[coord_end_index+1:])
-    else:
-        new_file_lines.extend(lines[coord_end_index:])
+    new_file_lines = replace_coordinate_block(lines, new_coords_lines)
 
     with open(com_filepath, 'w') as f:
         f.writelines(new_file_lines)
 
-def main():
+def stage_sweep_directory(src_dir: str, new_dirname: str, com_filename: str, new_coords_lines: list):
+    """
+    Stages a shift directory without copying the template directory.
+
+    Only the generated files are written: every .sh (with "Unshifted" replaced by
+    new_dirname) and com_filename (with the new coordinates), each skipped if its
+    content is unchanged. Every other input, such as large .chk files, is linked
+    from src_dir. Files named after com_filename's job (e.g. its .chk and .log) are
+    left out, because the job writes them back and a link would overwrite the template.
+    A log left by a previous attempt is moved aside (see retire_log), since the
+    directory is only staged for points that are (re)submitted.
+    Returns True if any generated file was written.
+    """
+    os.makedirs(new_dirname, exist_ok=True)
+    job_stem = os.path.splitext(com_filename)[0]
+    retire_log(os.path.join(new_dirname, job_stem + ".log"))
+    changed = False
+    for fname in os.listdir(src_dir):
+        src = os.path.join(src_dir, fname)
+        dst = os.path.join(new_dirname, fname)
+        if fname.endswith(".sh"):
+            with open(src, 'r') as f:
+                changed |= write_if_changed(dst, f.read().replace("Unshifted", new_dirname))
+        elif fname == com_filename:
+            with open(src, 'r') as f:
+                changed |= write_if_changed(dst, "".join(replace_coordinate_block(f.readlines(), new_coords_lines)))
+        elif os.path.splitext(fname)[0] == job_stem:
+            continue
+        elif os.path.isfile(src):
+            link_shared_file(src, dst)
+        elif not os.path.lexists(dst):
+            os.symlink(os.path.abspath(src), dst)
+    return changed
+
+def read_pasted_mode():
+    """
+    Reads a pasted 3-mode frequency block and the mode to use from it.
+    Returns (frequency_data, user_mode_input, mode_index).
+    """
     # --------------------------
     # Read frequency data.
     # --------------------------
@@ -154,6 +182,37 @@ def main():
             break
         except ValueError:
             print("Invalid input. Please enter an integer value.")
+    return frequency_data, user_mode_input, mode_index
+
+def main():
+    parser = argparse.ArgumentParser(description="Displace along a normal mode and submit one job per magnitude.")
+    parser.add_argument("--freq-log", help="Gaussian freq log to read all normal modes from instead of pasting a 3-mode block")
+    parser.add_argument("--array", action="store_true", help="Submit all magnitudes as one PBS job array")
+    parser.add_argument("--resubmit-pending", action="store_true",
+                        help="Also resubmit points that were submitted but have no termination line in their log")
+    parser.add_argument("--stage", choices=["copy", "link"], default="copy",
+                        help="copy: fresh copy of Unshifted per magnitude; link: write only the generated .com/.sh and link the rest")
+    parser.add_argument("--qsub", default="qsub", help='qsub command, e.g. "python Fake_Qsub.py" for local testing')
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    enable_from_args(args)
+
+    if args.freq_log:
+        # --------------------------
+        # Read every normal mode from the log (cached as .npz next to it).
+        # --------------------------
+        modes = load_normal_modes(args.freq_log)
+        while True:
+            try:
+                user_mode_input = int(input("Enter the mode to extract (e.g. 11): "))
+                freq_displacements = select_mode(modes, user_mode_input)
+                print(f"Mode {user_mode_input}: {modes['frequencies'][user_mode_input - 1]:.4f} cm^-1")
+                break
+            except ValueError as e:
+                print(f"Invalid input: {e}")
+    else:
+        frequency_data, user_mode_input, mode_index = read_pasted_mode()
+        freq_displacements = extract_mode(frequency_data, mode_index)
 
     # --------------------------
     # Read atomic coordinates.
@@ -184,45 +243,98 @@ def main():
     # --------------------------
     # Compute displacements.
     # --------------------------
-    freq_displacements = extract_mode(frequency_data, mode_index)
     atom_coords = extract_coordinates(atomic_data)
 
-    for mag in magnitudes:
-        displaced_coords = displace_atoms(atom_coords, freq_displacements, mag)
-        formatted_output = format_output(displaced_coords, atomic_data)
-        
+    # Displace and format every magnitude in one batch.
+    displaced_batch = displace_atoms_batch(atom_coords, freq_displacements, magnitudes)
+    formatted_batch = format_output_batch(displaced_batch, atomic_symbols(atomic_data))
+
+    src_dir = "Unshifted"
+    com_filename = "PW6B95D3_N_ES_Opt.com"
+    sh_filename = "PW6B95D3_N_ES_Opt.sh"
+    if not os.path.isdir(src_dir):
+        print(f"Source directory '{src_dir}' does not exist. Exiting.")
+        return
+
+    # The journal records each point's input hash, job id and state, so a rerun
+    # only regenerates and submits points that are new, changed or failed.
+    journal_path = JOURNAL_NAME
+    journal = load_journal(journal_path)
+    template_path = os.path.join(src_dir, com_filename)
+    template_text = ""
+    if os.path.isfile(template_path):
+        with open(template_path, 'r') as f:
+            template_text = f.read()
+    points = []
+    for mag, formatted_output in zip(magnitudes, formatted_batch):
         # Create new directory name, e.g. "Unshifted_Shift_11_0.05"
         new_dirname = f"Unshifted_Shift_{user_mode_input}_{mag:.8f}".rstrip("0").rstrip(".")
+        log_path = os.path.join(new_dirname, os.path.splitext(com_filename)[0] + ".log")
+        points.append((new_dirname, input_hash(template_text, "\n".join(formatted_output)), log_path))
+    plan = sweep_plan(journal, points, args.resubmit_pending)
+    record_completions(journal_path, journal, plan, points)
+    summarize_plan(plan)
+
+    array_entries = []
+    array_points = []
+    for (new_dirname, point_hash, log_path), mag, formatted_output in zip(points, magnitudes, formatted_batch):
+        if plan[new_dirname] != "submit":
+            print(f"\nSkipping magnitude {mag}: {new_dirname} is {plan[new_dirname]}")
+            continue
         print(f"\nProcessing for magnitude {mag} in directory {new_dirname}")
 
-        src_dir = "Unshifted"
-        if not os.path.isdir(src_dir):
-            print(f"Source directory '{src_dir}' does not exist. Exiting.")
-            return
-        if os.path.exists(new_dirname):
-            print(f"Directory {new_dirname} already exists. It will be overwritten.")
-            shutil.rmtree(new_dirname)
-        shutil.copytree(src_dir, new_dirname)
-        
-        update_sh_files(new_dirname, new_dirname)
-        
-        com_filepath = os.path.join(new_dirname, "PW6B95D3_N_ES_Opt.com")
-        if not os.path.isfile(com_filepath):
-            print(f"{com_filepath} not found. Skipping coordinate update.")
+        if args.stage == "link":
+            if not os.path.isfile(os.path.join(src_dir, com_filename)):
+                print(f"{os.path.join(src_dir, com_filename)} not found. Exiting.")
+                return
+            with stage("write_inputs"):
+                staged = stage_sweep_directory(src_dir, new_dirname, com_filename, formatted_output)
+            if not staged:
+                print(f"{new_dirname} is already up to date.")
         else:
-            update_com_file(com_filepath, formatted_output)
+            if os.path.exists(new_dirname):
+                print(f"Directory {new_dirname} already exists. It will be overwritten.")
+                shutil.rmtree(new_dirname)
+            with stage("copy_template"):
+                shutil.copytree(src_dir, new_dirname)
+            
+            update_sh_files(new_dirname, new_dirname)
+            
+            com_filepath = os.path.join(new_dirname, com_filename)
+            if not os.path.isfile(com_filepath):
+                print(f"{com_filepath} not found. Skipping coordinate update.")
+            else:
+                with stage("write_inputs"):
+                    update_com_file(com_filepath, formatted_output)
         
         # Submit the job using the script filename relative to new_dirname.
-        sh_filename = "PW6B95D3_N_ES_Opt.sh"
         sh_filepath = os.path.join(new_dirname, sh_filename)
-        if os.path.isfile(sh_filepath):
+        if os.path.isfile(sh_filepath) and args.array:
+            array_entries.append((new_dirname, sh_filename, ""))
+            array_points.append((new_dirname, point_hash, log_path))
+        elif os.path.isfile(sh_filepath):
             try:
-                subprocess.run(["qsub", sh_filename], check=True, cwd=new_dirname)
-                print(f"Job submitted for {new_dirname}")
-            except subprocess.CalledProcessError as e:
+                with stage("qsub"):
+                    result = subprocess.run(shlex.split(args.qsub) + [sh_filename], check=True, cwd=new_dirname,
+                                            capture_output=True, text=True)
+                job_id = result.stdout.strip()
+                print(f"Job {job_id} submitted for {new_dirname}")
+                append_journal(journal_path, new_dirname, state="submitted", input_hash=point_hash, job_id=job_id,
+                               log=os.path.abspath(log_path))
+            except (subprocess.CalledProcessError, FileNotFoundError) as e:
                 print(f"Job submission failed for {new_dirname}: {e}")
         else:
             print(f"{sh_filepath} not found. Skipping job submission.")
 
+    if array_entries:
+        # One scheduler round-trip for the whole sweep instead of one per magnitude.
+        first_dir, first_script, _ = array_entries[0]
+        array_job_id = submit_array(array_entries, os.getcwd(), f"Unshifted_Shift_{user_mode_input}",
+                                    os.path.join(first_dir, first_script), args.qsub)
+        if array_job_id:
+            for index, (new_dirname, point_hash, log_path) in enumerate(array_points, start=1):
+                append_journal(journal_path, new_dirname, state="submitted", input_hash=point_hash,
+                               job_id=subjob_id(array_job_id, index), log=os.path.abspath(log_path))
+
 if __name__ == "__main__":
     main()
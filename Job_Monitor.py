@@ -0,0 +1,212 @@
+import os
+import re
+import csv
+import shlex
+import asyncio
+import argparse
+from Gaussian_Log_Parser import parse_fcht_log
+from Extract_Intensity_Borrowing import ABS_LOG_NAME, EMI_LOG_NAME, parse_shift_directory
+from Sweep_Journal import load_journal, append_journal, submission_termination
+
+LABEL_PATTERN = re.compile(r"(\d+)_(-?\d+(?:\.\d+)?)$")
+SUMMARY_HEADER = ["Label", "Mode", "Magnitude", "State", "Job", "Huang-Rhys", "Shift", "DipStr", "DipStr EMI"]
+QSTAT_BATCH_SIZE = 1000
+# Log journaled for points staged by Intensity_Borrowing_Automation, whose FCHT
+# ABS/EMI logs are written next to it after the optimisation.
+STAGED_LOG_NAME = "PW6B95D3_N_ES_Opt.log"
+AWAITING_FCHT = "awaiting_fcht"
+
+
+def short_job_id(job_id):
+    """Returns the part of a PBS job id before the server name (qstat may truncate the rest)."""
+    return job_id.split(".", 1)[0]
+
+
+def parse_qstat_output(text):
+    """Returns {short job id: state letter} from qstat's default table output."""
+    states = {}
+    for line in text.splitlines():
+        parts = line.split()
+        if len(parts) >= 6 and not line.startswith(("Job id", "-")):
+            states[short_job_id(parts[0]).rstrip("*")] = parts[4]
+    return states
+
+
+async def query_scheduler(job_ids, qstat):
+    """
+    Asks the scheduler for the state of every job id, in as few qstat calls as
+    possible. Jobs qstat no longer reports have left the system and are "F".
+    Returns {} if qstat cannot be run at all.
+    """
+    async def query_batch(batch):
+        try:
+            process = await asyncio.create_subprocess_exec(*shlex.split(qstat), *batch,
+                                                           stdout=asyncio.subprocess.PIPE,
+                                                           stderr=asyncio.subprocess.PIPE)
+        except OSError as e:
+            print(f"qstat failed: {e}")
+            return None
+        stdout, _ = await process.communicate()
+        return parse_qstat_output(stdout.decode())
+
+    batches = [job_ids[i:i + QSTAT_BATCH_SIZE] for i in range(0, len(job_ids), QSTAT_BATCH_SIZE)]
+    results = await asyncio.gather(*(query_batch(batch) for batch in batches))
+    if any(result is None for result in results):
+        return {}
+    states = {}
+    for result in results:
+        states.update(result)
+    return {job_id: states.get(short_job_id(job_id), "F") for job_id in job_ids}
+
+
+def point_logs(entry):
+    """Returns the logs that decide a point's termination: its own, then the FCHT logs of a staged point."""
+    log_file = entry.get("log", "")
+    if os.path.basename(log_file) != STAGED_LOG_NAME:
+        return [log_file]
+    point_dir = os.path.dirname(log_file)
+    return [log_file, os.path.join(point_dir, ABS_LOG_NAME), os.path.join(point_dir, EMI_LOG_NAME)]
+
+
+def point_termination(entry):
+    """
+    Returns "completed" or "failed" once a point has finished, AWAITING_FCHT
+    for a staged point whose optimisation completed but whose FCHT logs have
+    not both terminated yet, and None while its own log has not terminated.
+    Logs last written before the point's submission are ignored.
+    """
+    log_file, *fcht_logs = point_logs(entry)
+    termination = submission_termination(entry, log_file)
+    if termination != "completed" or not fcht_logs:
+        return termination
+    fcht = [submission_termination(entry, fcht_log) for fcht_log in fcht_logs]
+    if "failed" in fcht:
+        return "failed"
+    return "completed" if all(value == "completed" for value in fcht) else AWAITING_FCHT
+
+
+async def poll_scheduler(active, events, interval, qstat):
+    """
+    Polls qstat once per interval for all active jobs and reports finished
+    ones. A staged point whose job finished after its optimisation is left to
+    watch_logs until its FCHT logs terminate.
+    """
+    while active:
+        job_ids = [entry["job_id"] for entry in active.values() if entry.get("job_id")]
+        states = await query_scheduler(job_ids, qstat) if job_ids else {}
+        for label, entry in list(active.items()):
+            if states.get(entry.get("job_id")) == "F":
+                # A job that left the queue without terminating its own log has failed.
+                termination = point_termination(entry) or "failed"
+                if termination != AWAITING_FCHT:
+                    await events.put((label, termination))
+        await asyncio.sleep(interval)
+
+
+async def watch_logs(active, events, interval):
+    """
+    Watches the logs of active points and reports them as soon as they
+    terminate. This is a polling watcher: a point is only re-read when the
+    size or mtime of one of its logs (see point_logs) has changed since the
+    last pass.
+    """
+    seen = {}
+    while active:
+        for label, entry in list(active.items()):
+            signature = []
+            for log_file in point_logs(entry):
+                try:
+                    stat = os.stat(log_file)
+                    signature.append((stat.st_size, stat.st_mtime_ns))
+                except OSError:
+                    signature.append(None)
+            if seen.get(label) == signature:
+                continue
+            seen[label] = signature
+            termination = point_termination(entry)
+            if termination in ("completed", "failed"):
+                await events.put((label, termination))
+        await asyncio.sleep(interval)
+
+
+def harvest_records(entry, method="mmap"):
+    """
+    Returns the (ABS, EMI) FCHT records of a finished point: those of the FCHT
+    logs next to a staged point's optimisation log, or else of the point's own
+    log, which is then the FCHT log (EMI is None).
+    """
+    log_file = entry["log"]
+    if os.path.basename(log_file) == STAGED_LOG_NAME:
+        return parse_shift_directory(os.path.dirname(log_file), method=method)
+    return parse_fcht_log(log_file, method), None
+
+
+def append_summary_row(summary_path, label, state, job_id, records):
+    """Appends one harvested point to the summary CSV, writing the header first if needed."""
+    match = LABEL_PATTERN.search(label)
+    mode, magnitude = (int(match.group(1)), float(match.group(2))) if match else (None, None)
+    abs_record, emi_record = records
+    values = [None, None, None, None]
+    if abs_record is not None and mode is not None:
+        values[:3] = [abs_record["huang_rhys"].get(mode), abs_record["shift"].get(mode), abs_record["dipstr"].get(mode)]
+    if emi_record is not None and mode is not None:
+        values[3] = emi_record["dipstr"].get(mode)
+    new_file = not os.path.exists(summary_path)
+    with open(summary_path, 'a', newline='') as f:
+        writer = csv.writer(f)
+        if new_file:
+            writer.writerow(SUMMARY_HEADER)
+        writer.writerow([label, mode, magnitude, state, job_id, *values])
+
+
+async def harvest(active, events, journal_path, summary_path, method):
+    """
+    Parses each finished point's log as soon as it is reported (in a worker
+    thread), journals its final state and streams a row into the summary.
+    """
+    while active:
+        label, termination = await events.get()
+        entry = active.pop(label, None)
+        if entry is None:
+            continue  # Already harvested after a report from the other watcher.
+        records = (None, None)
+        if termination == "completed":
+            records = await asyncio.to_thread(harvest_records, entry, method)
+        append_journal(journal_path, label, state=termination, input_hash=entry.get("input_hash"),
+                       job_id=entry.get("job_id"), log=entry.get("log"))
+        append_summary_row(summary_path, label, termination, entry.get("job_id"), records)
+        print(f"{label}: {termination} ({len(active)} still running)")
+
+
+async def monitor(journal_path, summary_path, interval=30.0, qstat="qstat -x", method="mmap"):
+    """Monitors every submitted point of a sweep journal until all have finished."""
+    journal = load_journal(journal_path)
+    active = {label: entry for label, entry in journal.items()
+              if entry.get("state") == "submitted" and entry.get("log")}
+    if not active:
+        print("No submitted points to monitor.")
+        return
+    print(f"Monitoring {len(active)} jobs from {journal_path}")
+    events = asyncio.Queue()
+    await asyncio.gather(
+        poll_scheduler(active, events, interval, qstat),
+        watch_logs(active, events, min(interval, 5.0)),
+        harvest(active, events, journal_path, summary_path, method),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monitor a sweep's jobs and harvest each log as soon as it finishes.")
+    parser.add_argument("--journal", required=True, help="Sweep journal written by the automation scripts")
+    parser.add_argument("--summary", help="Summary CSV to append to (default monitor_summary.csv next to the journal)")
+    parser.add_argument("--interval", type=float, default=30.0, help="Seconds between qstat polls")
+    parser.add_argument("--qstat", default="qstat -x", help='qstat command, e.g. "python Fake_Qstat.py" for local testing')
+    parser.add_argument("--read-mode", choices=["mmap", "tail", "stream"], default="mmap", help="How logs are read")
+    args = parser.parse_args()
+
+    summary_path = args.summary or os.path.join(os.path.dirname(os.path.abspath(args.journal)), "monitor_summary.csv")
+    asyncio.run(monitor(args.journal, summary_path, args.interval, args.qstat, args.read_mode))
+
+
+if __name__ == "__main__":
+    main()
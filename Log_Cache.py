@@ -0,0 +1,113 @@
+import os
+import json
+import hashlib
+import sqlite3
+from Gaussian_Log_Parser import parse_fcht_log
+from Stage_Timer import stage
+
+DEFAULT_CACHE_NAME = ".fcht_log_cache.sqlite"
+
+
+def open_log_cache(cache_file, timeout=5.0):
+    """
+    Opens (creating if needed) the SQLite cache of parsed FCHT records.
+    'timeout' is how long a writer waits on a lock held by another process.
+    """
+    cache = sqlite3.connect(cache_file, timeout=timeout)
+    cache.execute("PRAGMA synchronous = NORMAL")
+    cache.execute(
+        "CREATE TABLE IF NOT EXISTS parsed_logs ("
+        "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, sha256 TEXT, record TEXT)"
+    )
+    return cache
+
+
+def file_sha256(log_file, block_size=1 << 20):
+    """Returns the SHA-256 hex digest of a file, read in blocks."""
+    digest = hashlib.sha256()
+    with open(log_file, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def log_file_key(log_file, use_hash=False):
+    """
+    Returns the cache key (path, size, mtime_ns, sha256) of a log file.
+    sha256 is None unless use_hash is set.
+    """
+    path = os.path.abspath(log_file)
+    stat = os.stat(path)
+    digest = file_sha256(path) if use_hash else None
+    return path, stat.st_size, stat.st_mtime_ns, digest
+
+
+def encode_record(record):
+    return json.dumps({key: list(values.items()) for key, values in record.items()})
+
+
+def decode_record(text):
+    return {key: {int(mode): value for mode, value in items} for key, items in json.loads(text).items()}
+
+
+def lookup_record(cache, key):
+    """
+    Returns the cached record for a key, or None if it is missing or stale.
+    A log whose mtime changed but whose size and content hash still match is
+    reused and its mtime refreshed.
+    """
+    path, size, mtime_ns, digest = key
+    row = cache.execute(
+        "SELECT size, mtime_ns, sha256, record FROM parsed_logs WHERE path = ?", (path,)
+    ).fetchone()
+    if row is None or row[0] != size:
+        return None
+    if digest is not None and row[2] != digest:
+        return None
+    if row[1] != mtime_ns:
+        if digest is None:
+            return None
+        with cache:
+            cache.execute("UPDATE parsed_logs SET mtime_ns = ? WHERE path = ?", (mtime_ns, path))
+    return decode_record(row[3])
+
+
+def store_record(cache, key, record):
+    """Stores a parsed record under its key, replacing any older entry for the path."""
+    with cache:
+        cache.execute(
+            "INSERT OR REPLACE INTO parsed_logs (path, size, mtime_ns, sha256, record) VALUES (?, ?, ?, ?, ?)",
+            (*key, encode_record(record)),
+        )
+
+
+def evict_missing(cache):
+    """Deletes entries whose log files no longer exist. Returns the number evicted."""
+    paths = [row[0] for row in cache.execute("SELECT path FROM parsed_logs")]
+    vanished = [(path,) for path in paths if not os.path.exists(path)]
+    with cache:
+        cache.executemany("DELETE FROM parsed_logs WHERE path = ?", vanished)
+    return len(vanished)
+
+
+def cached_parse_fcht_log(log_file, cache=None, use_hash=False, method="mmap"):
+    """
+    Same as parse_fcht_log, but served from the cache when the log is unchanged.
+    Only new or modified logs are parsed; with cache=None this simply parses.
+    """
+    if cache is None:
+        return parse_fcht_log(log_file, method)
+    with stage("cache_lookup", path=log_file if use_hash else None):
+        try:
+            key = log_file_key(log_file, use_hash)
+        except FileNotFoundError:
+            print(f"Log file not found: {log_file}")
+            return None
+        record = lookup_record(cache, key)
+
+    if record is None:
+        record = parse_fcht_log(log_file, method)
+        if record is not None:
+            with stage("cache_store"):
+                store_record(cache, key, record)
+    return record
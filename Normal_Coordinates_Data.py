@@ -1,27 +1,13 @@
 import os
 import re
 import csv
-
-def extract_value_from_section(log_file, section_header, mode, pattern):
-    value = None
-    try:
-        with open(log_file, 'r') as file:
-            lines = file.readlines()
-        inside_section = False
-        for line in lines:
-            if section_header in line:
-                inside_section = True
-                continue
-            if inside_section:
-                match = re.search(pattern.format(mode), line)
-                if match:
-                    value = float(match.group(1).replace('D', 'E'))
-                    break
-    except FileNotFoundError:
-        print(f"Log file not found: {log_file}")
-    except Exception as e:
-        print(f"Error in {log_file}: {e}")
-    return value
+import argparse
+import numpy as np
+from Gaussian_Log_Parser import record_n_modes, record_to_arrays
+from Result_Writer import StreamingCsvWriter
+from Result_Store import DEFAULT_STORE_NAME, append_sweep, table_from_rows
+from Log_Cache import DEFAULT_CACHE_NAME, open_log_cache, cached_parse_fcht_log, evict_missing
+from Stage_Timer import stage, add_profile_argument, enable_from_args
 
 def compute_asymmetry(val_pos, val_neg):
     denominator = abs(val_pos) + abs(val_neg)
@@ -29,15 +15,20 @@ def compute_asymmetry(val_pos, val_neg):
         return 0.0
     return (abs(val_pos) - abs(val_neg)) / denominator
 
-def process_shift_directory(mode, base_dir):
-    shift_dir = os.path.join(base_dir, f"Shift_{mode}")
-    if not os.path.isdir(shift_dir):
-        print(f"Directory not found: {shift_dir}")
-        return []
-
-    data = {}
-    for fname in os.listdir(shift_dir):
-        if not fname.endswith(".log"):
+def compute_asymmetry_array(val_pos, val_neg):
+    """compute_asymmetry over whole arrays; pairs with a zero denominator give 0."""
+    val_pos = np.abs(val_pos)
+    val_neg = np.abs(val_neg)
+    denominator = val_pos + val_neg
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(denominator == 0, 0.0, (val_pos - val_neg) / denominator)
+
+def iter_shift_records(mode, shift_dir, skip=(), cache=None, use_hash=False, method="mmap"):
+    """Yields (fname, mag, record) for every parsable Benzene_Shift_{mode}_<mag>.log not in skip."""
+    with stage("walk_directories"):
+        fnames = os.listdir(shift_dir)
+    for fname in fnames:
+        if not fname.endswith(".log") or fname in skip:
             continue
 
         match = re.match(rf"Benzene_Shift_{mode}_(-?\d+\.\d+)\.log", fname)
@@ -46,34 +37,159 @@ def process_shift_directory(mode, base_dir):
 
         mag = float(match.group(1))
         log_path = os.path.join(shift_dir, fname)
-        hr = extract_value_from_section(log_path, "Huang-Rhys Factors", mode, r"Mode num\.\s+{}\s+- Factor:\s+([0-9.D+-]+)")
-        shift = extract_value_from_section(log_path, "Shift Vector", mode, r"\s+{}\s+([0-9.D+-]+)")
+        record = cached_parse_fcht_log(log_path, cache, use_hash, method)
+        if record is not None:
+            yield fname, mag, record
+
+def iter_shift_logs(mode, shift_dir, skip=(), cache=None, use_hash=False, method="mmap", records=None):
+    """
+    Yields (fname, mag, hr, shift) for every parsable Benzene_Shift_{mode}_<mag>.log not in skip.
+    If records is a list, every parsed (fname, mag, record) is also appended to it.
+    """
+    for fname, mag, record in iter_shift_records(mode, shift_dir, skip, cache, use_hash, method):
+        if records is not None:
+            records.append((fname, mag, record))
+        hr = record["huang_rhys"].get(mode)
+        shift = record["shift"].get(mode)
         if hr is not None and shift is not None:
-            data[mag] = (hr, shift)
+            yield fname, mag, hr, shift
+
+def pair_indices(magnitudes, tolerance=1e-4):
+    """
+    Matches each +mag of a sorted magnitude array with its -mag partner.
+
+    The partner is found with one searchsorted over the sorted array and
+    accepted if it lies within 'tolerance', so magnitudes whose filenames were
+    rounded differently still pair. The tolerance is capped below half the
+    smallest spacing between magnitudes, so neighbouring points never match.
+    A zero magnitude pairs with itself. Returns (pos_idx, neg_idx).
+    """
+    magnitudes = np.asarray(magnitudes, dtype=float)
+    if len(magnitudes) == 0:
+        return np.array([], dtype=int), np.array([], dtype=int)
+    gaps = np.diff(magnitudes)
+    gaps = gaps[gaps > 0]
+    if len(gaps):
+        tolerance = min(tolerance, 0.49 * gaps.min())
+
+    pos_idx = np.flatnonzero(magnitudes >= 0)
+    targets = -magnitudes[pos_idx]
+    neg_idx = np.searchsorted(magnitudes, targets - tolerance)
+    found = neg_idx < len(magnitudes)
+    found[found] = np.abs(magnitudes[neg_idx[found]] - targets[found]) <= tolerance
+    pos_idx, neg_idx = pos_idx[found], neg_idx[found]
+    # Duplicate magnitudes within the tolerance: keep the first pair for each partner.
+    _, first = np.unique(neg_idx, return_index=True)
+    first.sort()
+    return pos_idx[first], neg_idx[first]
+
+def pair_asymmetry_arrays(magnitudes, hr, shift, tolerance=1e-4):
+    """
+    Computes the HR and shift asymmetry of every +/- pair for every mode at once.
+    magnitudes has shape (n_points,) and hr/shift (n_points, n_modes), or
+    (n_points,) for a single mode. Returns (pair magnitudes, hr_asym, shift_asym)
+    with one row per pair, sorted by magnitude.
+    """
+    with stage("pair_asymmetry"):
+        magnitudes = np.asarray(magnitudes, dtype=float)
+        order = np.argsort(magnitudes, kind="stable")
+        magnitudes = magnitudes[order]
+        hr = np.asarray(hr, dtype=float)[order]
+        shift = np.asarray(shift, dtype=float)[order]
+
+        pos_idx, neg_idx = pair_indices(magnitudes, tolerance)
+        hr_asym = compute_asymmetry_array(hr[pos_idx], hr[neg_idx])
+        shift_asym = compute_asymmetry_array(shift[pos_idx], shift[neg_idx])
+        return np.abs(magnitudes[pos_idx]), hr_asym, shift_asym
+
+def pair_asymmetry(data, tolerance=1e-4):
+    """Pairs +mag/-mag entries of {mag: (hr, shift)} and computes their asymmetries."""
+    if not data:
+        return []
+    magnitudes = np.fromiter(data.keys(), dtype=float, count=len(data))
+    values = np.array(list(data.values()), dtype=float)
+    pair_mags, hr_asym, shift_asym = pair_asymmetry_arrays(magnitudes, values[:, 0], values[:, 1], tolerance)
 
     results = []
-    checked = set()
-    for mag in sorted(data.keys()):
-        if mag < 0 or mag in checked:
-            continue
-
-        pos_mag = mag
-        neg_mag = -mag
-
-        if pos_mag in data and neg_mag in data:
-            hr_pos, shift_pos = data[pos_mag]
-            hr_neg, shift_neg = data[neg_mag]
+    for mag, hr_value, shift_value in zip(pair_mags.tolist(), hr_asym.tolist(), shift_asym.tolist()):
+        symmetry = "Symmetric" if (hr_value == 0 and shift_value == 0) else "Asymmetric"
+        results.append((mag, hr_value, shift_value, symmetry))
+    return results
+
+def collect_shift_data(mode, base_dir, cache=None, use_hash=False, method="mmap", records=None):
+    """
+    Returns {mag: (hr, shift)} for the logs in Shift_{mode}, or {} if the directory
+    is missing. The parsed records are appended to 'records' (see iter_shift_logs).
+    """
+    shift_dir = os.path.join(base_dir, f"Shift_{mode}")
+    if not os.path.isdir(shift_dir):
+        print(f"Directory not found: {shift_dir}")
+        return {}
 
-            hr_asym = compute_asymmetry(hr_pos, hr_neg)
-            shift_asym = compute_asymmetry(shift_pos, shift_neg)
+    data = {}
+    for _, mag, hr, shift in iter_shift_logs(mode, shift_dir, (), cache, use_hash, method, records):
+        data[mag] = (hr, shift)
+    return data
+
+def process_shift_directory(mode, base_dir, cache=None, use_hash=False, method="mmap"):
+    return pair_asymmetry(collect_shift_data(mode, base_dir, cache, use_hash, method))
+
+def shift_arrays(records):
+    """
+    Converts parsed (fname, mag, record) logs into (magnitudes, hr, shift) with
+    hr/shift of shape (n_logs, n_modes), indexed by mode - 1 (NaN where a log
+    lacks a mode).
+    """
+    n_modes = max((record_n_modes(record) for _, _, record in records), default=0)
+    hr = np.full((len(records), n_modes), np.nan)
+    shift = np.full((len(records), n_modes), np.nan)
+    for row, (_, _, record) in enumerate(records):
+        arrays = record_to_arrays(record, n_modes)
+        hr[row] = arrays["huang_rhys"]
+        shift[row] = arrays["shift"]
+    magnitudes = np.array([mag for _, mag, _ in records])
+    return magnitudes, hr, shift
+
+def save_all_modes_csv(pair_mags, hr_asym, shift_asym, output_file):
+    """Saves all-modes asymmetries in long format: one row per +/- pair and mode."""
+    n_pairs, n_modes = hr_asym.shape
+    with open(output_file, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["Magnitude", "Mode", "HR Asymmetry", "Shift Asymmetry"])
+        for row in range(n_pairs):
+            for mode in range(n_modes):
+                hr_value = hr_asym[row, mode]
+                shift_value = shift_asym[row, mode]
+                writer.writerow([pair_mags[row], mode + 1,
+                                 "" if np.isnan(hr_value) else hr_value,
+                                 "" if np.isnan(shift_value) else shift_value])
+    print(f"Saved to {output_file}")
 
-            symmetry = "Symmetric" if (hr_asym == 0 and shift_asym == 0) else "Asymmetric"
-            results.append((abs(pos_mag), hr_asym, shift_asym, symmetry))
+def stream_shift_data(mode, base_dir, parsed_file, cache=None, use_hash=False, method="mmap", records=None):
+    """
+    Like collect_shift_data, but each parsed log's values are appended to a
+    crash-safe '<parsed_file>.partial' as soon as they are read, and a rerun
+    resumes from it. The per-log table is finalized to parsed_file (sorted by
+    magnitude) and read back. Only the logs parsed in this run, not those
+    resumed from the partial file, are appended to 'records'.
+    """
+    shift_dir = os.path.join(base_dir, f"Shift_{mode}")
+    if not os.path.isdir(shift_dir):
+        print(f"Directory not found: {shift_dir}")
+        return {}
 
-            checked.add(pos_mag)
-            checked.add(neg_mag)
+    with StreamingCsvWriter(parsed_file, ["Magnitude", "Huang-Rhys", "Shift"]) as writer:
+        for fname, mag, hr, shift in iter_shift_logs(mode, shift_dir, writer.done_keys, cache, use_hash, method, records):
+            writer.write(fname, (mag, hr, shift))
+        writer.finalize(sort_key=lambda row: float(row[0]))
 
-    return sorted(results, key=lambda x: x[0])
+    data = {}
+    with open(parsed_file, 'r', newline='') as f:
+        reader = csv.reader(f)
+        next(reader)
+        for mag, hr, shift in reader:
+            data[float(mag)] = (float(hr), float(shift))
+    return data
 
 def save_to_csv(results, output_file):
     with open(output_file, 'w', newline='') as f:
@@ -83,11 +199,50 @@ def save_to_csv(results, output_file):
     print(f"Saved to {output_file}")
 
 def main():
-    mode = int(input("Enter mode number (X): "))
+    parser = argparse.ArgumentParser(description="Compute HR/shift asymmetry of +/- displaced geometries.")
+    parser.add_argument("--mode", type=int, help="Mode number (prompted if omitted)")
+    parser.add_argument("--all-modes", action="store_true",
+                        help="Also compute the asymmetry of every mode and write Shift_<mode>_asymmetry_all_modes.csv")
+    parser.add_argument("--tolerance", type=float, default=1e-4,
+                        help="Largest difference between |+mag| and |-mag| that still counts as a pair")
+    parser.add_argument("--read-mode", choices=["mmap", "tail", "stream"], default="mmap",
+                        help="How logs are read: memory-mapped, tail-first (for network filesystems) or line by line")
+    parser.add_argument("--stream", action="store_true",
+                        help="Write each log's values to a crash-safe .partial file as it is parsed and resume from it after a crash")
+    parser.add_argument("--store", nargs="?", const=DEFAULT_STORE_NAME,
+                        help=f"Also write each log's HR factor and shift to a columnar NumPy store (default {DEFAULT_STORE_NAME})")
+    parser.add_argument("--no-cache", action="store_true", help=f"Re-parse every log instead of using {DEFAULT_CACHE_NAME}")
+    parser.add_argument("--hash", action="store_true", help="Also key the parsed-log cache on a SHA-256 of each log")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    enable_from_args(args)
+
+    mode = args.mode if args.mode is not None else int(input("Enter mode number (X): "))
     base_dir = os.getcwd()
+    cache = None if args.no_cache else open_log_cache(os.path.join(base_dir, DEFAULT_CACHE_NAME))
     output_file = f"Shift_{mode}_asymmetry_results.csv"
-    results = process_shift_directory(mode, base_dir)
-    save_to_csv(results, output_file)
+    # The all-modes table reuses the records parsed for the single-mode one.
+    records = [] if args.all_modes else None
+    if args.stream:
+        parsed_file = f"Shift_{mode}_parsed_logs.csv"
+        data = stream_shift_data(mode, base_dir, parsed_file, cache, args.hash, args.read_mode, records)
+    else:
+        data = collect_shift_data(mode, base_dir, cache, args.hash, args.read_mode, records)
+    save_to_csv(pair_asymmetry(data, args.tolerance), output_file)
+    shift_dir = os.path.join(base_dir, f"Shift_{mode}")
+    if args.all_modes and os.path.isdir(shift_dir):
+        if args.stream:
+            # Logs resumed from the partial file were not parsed in this run.
+            parsed = {fname for fname, _, _ in records}
+            records.extend(iter_shift_records(mode, shift_dir, parsed, cache, args.hash, args.read_mode))
+        save_all_modes_csv(*pair_asymmetry_arrays(*shift_arrays(records), tolerance=args.tolerance),
+                           f"Shift_{mode}_asymmetry_all_modes.csv")
+    if args.store:
+        rows = [(mag, hr, shift) for mag, (hr, shift) in sorted(data.items())]
+        append_sweep(args.store, f"Shift_{mode}", table_from_rows(rows, mode, columns=("magnitude", "huang_rhys", "shift")))
+    if cache is not None:
+        evict_missing(cache)
+        cache.close()
 
 if __name__ == "__main__":
     main()
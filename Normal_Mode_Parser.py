@@ -0,0 +1,102 @@
+import os
+import numpy as np
+from Stage_Timer import stage
+
+
+def parse_normal_modes(lines):
+    """
+    Parses the frequency section of a Gaussian freq log (standard 3-mode
+    "Atom  AN  X Y Z" blocks) in a single pass.
+
+    If the log holds several frequency calculations, the last one is kept.
+
+    Returns:
+        dict: "frequencies", "reduced_masses", "force_constants" with shape
+        (n_modes,), "atomic_numbers" with shape (n_atoms,) and "displacements"
+        with shape (n_modes, n_atoms, 3), where mode k is at index k - 1.
+    """
+    frequencies, reduced_masses, force_constants = [], [], []
+    blocks = []
+    atomic_numbers = []
+    mode_numbers = []
+    in_block = False
+
+    for line in lines:
+        stripped = line.strip()
+        if in_block:
+            parts = stripped.split()
+            if len(parts) >= 5 and parts[0].isdigit() and parts[1].isdigit():
+                block_numbers.append(int(parts[1]))
+                block_rows.append([float(value) for value in parts[2:]])
+                continue
+            in_block = False
+            if not blocks:
+                atomic_numbers = block_numbers
+            blocks.append(np.array(block_rows).reshape(len(block_rows), -1, 3))
+
+        if stripped.startswith("Frequencies --"):
+            values = [float(value) for value in stripped.split("--", 1)[1].split()]
+            if mode_numbers and mode_numbers[0] == 1 and frequencies:
+                # Mode numbering restarted: a later frequency calculation replaces the earlier one.
+                frequencies, reduced_masses, force_constants, blocks = [], [], [], []
+            frequencies.extend(values)
+        elif stripped.startswith("Red. masses --"):
+            reduced_masses.extend(float(value) for value in stripped.split("--", 1)[1].split())
+        elif stripped.startswith("Frc consts  --"):
+            force_constants.extend(float(value) for value in stripped.split("--", 1)[1].split())
+        elif stripped.startswith("Atom  AN"):
+            in_block = True
+            block_numbers, block_rows = [], []
+        elif stripped and all(token.isdigit() for token in stripped.split()):
+            mode_numbers = [int(token) for token in stripped.split()]
+
+    if in_block:
+        if not blocks:
+            atomic_numbers = block_numbers
+        blocks.append(np.array(block_rows).reshape(len(block_rows), -1, 3))
+
+    if not blocks:
+        raise ValueError("No normal-mode displacement blocks found.")
+
+    # Each block is (n_atoms, modes_in_block, 3); stack the modes along the first axis.
+    displacements = np.concatenate([block.transpose(1, 0, 2) for block in blocks])
+    return {
+        "frequencies": np.array(frequencies),
+        "reduced_masses": np.array(reduced_masses),
+        "force_constants": np.array(force_constants),
+        "atomic_numbers": np.array(atomic_numbers, dtype=int),
+        "displacements": displacements,
+    }
+
+
+def normal_modes_cache_path(log_file):
+    """Returns the path of the .npz cache stored next to a freq log."""
+    return os.path.splitext(log_file)[0] + "_normal_modes.npz"
+
+
+def load_normal_modes(log_file):
+    """
+    Returns the normal-mode arrays of a Gaussian freq log.
+
+    The arrays are cached as .npy members of a .npz next to the log and reused
+    while the cache is newer than the log, so later runs skip parsing.
+    """
+    cache_path = normal_modes_cache_path(log_file)
+    if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(log_file):
+        with np.load(cache_path) as cached:
+            return {key: cached[key] for key in cached.files}
+
+    with stage("parse_freq_log", path=log_file), open(log_file, 'r') as f:
+        modes = parse_normal_modes(f)
+    try:
+        np.savez(cache_path, **modes)
+    except OSError as e:
+        print(f"Could not write normal-mode cache {cache_path}: {e}")
+    return modes
+
+
+def select_mode(modes, mode_number):
+    """Returns the (n_atoms, 3) displacement vectors of mode 'mode_number' (1-based)."""
+    if not 1 <= mode_number <= len(modes["displacements"]):
+        raise ValueError(f"Mode {mode_number} is out of range (1-{len(modes['displacements'])}).")
+    return modes["displacements"][mode_number - 1]
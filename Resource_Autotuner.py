@@ -0,0 +1,293 @@
+import os
+import re
+import math
+import sqlite3
+import argparse
+import numpy as np
+from Sweep_Journal import log_termination
+
+DEFAULT_HISTORY_NAME = "resource_history.sqlite"
+WALLTIME_SAFETY = 1.5
+MEMORY_SAFETY = 1.2
+WALLTIME_STEP = 15 * 60  # Walltime requests are rounded up to whole quarter hours.
+DEFAULT_SCALING_EXPONENT = 3.0  # Used while a state has runs of only one size.
+MIN_METHOD_RUNS = 3  # Below this, a (state, method) is fitted on the state's runs of every method.
+
+MEM_PATTERN = re.compile(r"%mem=(\d+)\s*([KMGT][BW])?", re.IGNORECASE)
+NPROC_PATTERN = re.compile(r"%nprocshared=(\d+)", re.IGNORECASE)
+NATOMS_PATTERN = re.compile(r"NAtoms=\s*(\d+)")
+NBASIS_PATTERN = re.compile(r"^\s*(\d+) basis functions,")
+METHOD_PATTERN = re.compile(r"([\w()+*-]+/[\w()+*-]+)")
+TIME_PATTERN = re.compile(r"(Job cpu time|Elapsed time):\s+(\d+) days\s+(\d+) hours\s+(\d+) minutes\s+([\d.]+) seconds")
+WALLTIME_PATTERN = re.compile(r"#PBS -l walltime=(\d+):(\d+):(\d+)")
+
+# Gigabytes per unit of a %mem request. A Gaussian word is 8 bytes, and a
+# request without a unit is in words.
+MEM_UNITS = {"": 8.0 / 1024 ** 3,
+             "KB": 1.0 / 1024 ** 2, "MB": 1.0 / 1024, "GB": 1.0, "TB": 1024.0,
+             "KW": 8.0 / 1024 ** 2, "MW": 8.0 / 1024, "GW": 8.0, "TW": 8.0 * 1024}
+
+
+def open_history(history_file, timeout=5.0):
+    """Opens (creating if needed) the SQLite history of past Gaussian runs."""
+    history = sqlite3.connect(history_file, timeout=timeout)
+    history.execute(
+        "CREATE TABLE IF NOT EXISTS runs ("
+        "path TEXT PRIMARY KEY, mtime_ns INTEGER, state TEXT, method TEXT, termination TEXT, "
+        "n_atoms INTEGER, n_basis INTEGER, cpus INTEGER, memory_gb REAL, "
+        "cpu_s REAL, elapsed_s REAL, requested_walltime_s REAL)"
+    )
+    return history
+
+
+def state_from_log_name(log_file):
+    """Returns the state of a {molecule}_{state}.log name, e.g. "ES_Opt" or "ABS"."""
+    parts = os.path.splitext(os.path.basename(log_file))[0].split("_")
+    if parts[-1] in ("ABS", "EMI") or len(parts) < 3:
+        return parts[-1]
+    return "_".join(parts[-2:])
+
+
+def route_method(route_line):
+    """Returns the method/basis named on a route line, e.g. "B3LYP/DEF2TZVP", or else the stripped line."""
+    match = METHOD_PATTERN.search(route_line)
+    return match.group(1).upper() if match else route_line.strip()
+
+
+def requested_walltime(log_file):
+    """Returns the walltime (s) requested by the job script next to a log, or None."""
+    sh_file = os.path.splitext(log_file)[0] + ".sh"
+    try:
+        with open(sh_file, 'r') as f:
+            for line in f:
+                match = WALLTIME_PATTERN.match(line)
+                if match:
+                    hours, minutes, seconds = (int(value) for value in match.groups())
+                    return hours * 3600 + minutes * 60 + seconds
+    except FileNotFoundError:
+        pass
+    return None
+
+
+def parse_run_usage(log_file):
+    """
+    Reads the resource use of one Gaussian run in a single pass: the largest
+    %mem and %NProcShared request, atom and basis-function counts, the method of
+    the first route line and the cpu and elapsed time summed over all links.
+    """
+    usage = {"method": None, "n_atoms": None, "n_basis": None, "cpus": 1, "memory_gb": None,
+             "cpu_s": 0.0, "elapsed_s": 0.0}
+    with open(log_file, 'r') as f:
+        for line in f:
+            if "%" in line:
+                match = MEM_PATTERN.search(line)
+                if match:
+                    memory_gb = int(match.group(1)) * MEM_UNITS[(match.group(2) or "").upper()]
+                    usage["memory_gb"] = max(usage["memory_gb"] or 0.0, memory_gb)
+                match = NPROC_PATTERN.search(line)
+                if match:
+                    usage["cpus"] = max(usage["cpus"], int(match.group(1)))
+            elif usage["method"] is None and line.startswith(" #"):
+                usage["method"] = route_method(line)
+            elif usage["n_atoms"] is None and "NAtoms=" in line:
+                usage["n_atoms"] = int(NATOMS_PATTERN.search(line).group(1))
+            elif "basis functions," in line:
+                match = NBASIS_PATTERN.match(line)
+                if match:
+                    usage["n_basis"] = max(usage["n_basis"] or 0, int(match.group(1)))
+            elif "time:" in line:
+                match = TIME_PATTERN.search(line)
+                if match:
+                    days, hours, minutes, seconds = match.groups()[1:]
+                    total = int(days) * 86400 + int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+                    usage["cpu_s" if match.group(1) == "Job cpu time" else "elapsed_s"] += total
+    return usage
+
+
+def record_runs(history, log_files):
+    """Adds new or changed logs to the history. Returns the number of logs (re)read."""
+    added = 0
+    for log_file in log_files:
+        path = os.path.abspath(log_file)
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            continue
+        row = history.execute("SELECT mtime_ns FROM runs WHERE path = ?", (path,)).fetchone()
+        if row is not None and row[0] == mtime_ns:
+            continue
+        usage = parse_run_usage(path)
+        with history:
+            history.execute(
+                "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (path, mtime_ns, state_from_log_name(path), usage["method"], log_termination(path),
+                 usage["n_atoms"], usage["n_basis"], usage["cpus"], usage["memory_gb"],
+                 usage["cpu_s"], usage["elapsed_s"], requested_walltime(path)),
+            )
+        added += 1
+    return added
+
+
+def find_logs(paths):
+    """Expands directories (recursively) into their .log files."""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for fname in sorted(files):
+                    if fname.endswith(".log"):
+                        yield os.path.join(root, fname)
+        else:
+            yield path
+
+
+def completed_runs(history, state, method=None):
+    """
+    Returns the completed runs of a state (and method, if given) with usable
+    sizes and times, as column arrays.
+    """
+    method_filter = "AND method = ? " if method is not None else ""
+    rows = history.execute(
+        "SELECT path, n_atoms, cpus, memory_gb, cpu_s, elapsed_s FROM runs "
+        "WHERE state = ? AND termination = 'completed' AND n_atoms > 0 AND cpu_s > 0 AND elapsed_s > 0 "
+        + method_filter + "ORDER BY n_atoms, path",
+        (state,) if method is None else (state, method),
+    ).fetchall()
+    if not rows:
+        return None
+    paths, n_atoms, cpus, memory_gb, cpu_s, elapsed_s = zip(*rows)
+    return {"paths": list(paths), "n_atoms": np.array(n_atoms, dtype=float), "cpus": np.array(cpus, dtype=float),
+            "memory_gb": np.array([np.nan if m is None else m for m in memory_gb]),
+            "cpu_s": np.array(cpu_s), "elapsed_s": np.array(elapsed_s)}
+
+
+def model_runs(history, state, method=None):
+    """
+    Returns the runs a cost model of (state, method) is fitted on: the completed
+    runs of that method, or those of the state with any method while the method
+    has fewer than MIN_METHOD_RUNS. None if the state has no completed run.
+    """
+    if method is not None:
+        runs = completed_runs(history, state, method)
+        if runs is not None and len(runs["paths"]) >= MIN_METHOD_RUNS:
+            return runs
+    return completed_runs(history, state)
+
+
+def fit_cost_model(runs):
+    """
+    Fits cpu_s = a * n_atoms^p to a state's runs by least squares in log-log
+    space (p = DEFAULT_SCALING_EXPONENT while all runs have the same size), and
+    the parallel efficiency cpu_s / (elapsed_s * cpus) as the median over runs.
+
+    Runs are sized by n_atoms only: within one method, whose recorded name
+    includes the basis set, n_basis grows in proportion to n_atoms for molecules
+    of similar composition, so it is not fitted separately.
+    """
+    log_n = np.log(runs["n_atoms"])
+    log_cpu = np.log(runs["cpu_s"])
+    if np.ptp(log_n) > 0:
+        exponent, log_a = np.polyfit(log_n, log_cpu, 1)
+    else:
+        exponent = DEFAULT_SCALING_EXPONENT
+        log_a = np.mean(log_cpu - exponent * log_n)
+    efficiency = np.median(np.clip(runs["cpu_s"] / (runs["elapsed_s"] * runs["cpus"]), 0.05, 1.0))
+    return {"log_a": float(log_a), "exponent": float(exponent), "efficiency": float(efficiency)}
+
+
+def predict_elapsed(model, n_atoms, cpus):
+    """Predicted elapsed seconds of a run with n_atoms on 'cpus' cores."""
+    cpu_s = np.exp(model["log_a"] + model["exponent"] * np.log(n_atoms))
+    return cpu_s / (cpus * model["efficiency"])
+
+
+def format_walltime(seconds):
+    seconds = max(WALLTIME_STEP, math.ceil(seconds / WALLTIME_STEP) * WALLTIME_STEP)
+    return f"{seconds // 3600:02}:{seconds % 3600 // 60:02}:00"
+
+
+def suggest_resources(history, state, n_atoms, cpus=None, method=None):
+    """
+    Suggests {"walltime", "cores", "memory_gb"} for a new run of 'state' (with
+    'method', see model_runs) with n_atoms atoms, or None if the history has no
+    completed run of that state.
+
+    Cores default to the median of past runs. Walltime is the model's elapsed
+    time with a WALLTIME_SAFETY margin. Logs only record the %mem requested,
+    so memory is the smallest request that completed, scaled by (n_atoms/n)^2
+    and a MEMORY_SAFETY margin.
+    """
+    runs = model_runs(history, state, method)
+    if runs is None:
+        return None
+    model = fit_cost_model(runs)
+    cpus = cpus or int(np.median(runs["cpus"]))
+    walltime = format_walltime(predict_elapsed(model, n_atoms, cpus) * WALLTIME_SAFETY)
+
+    scaled_memory = runs["memory_gb"] * (n_atoms / runs["n_atoms"]) ** 2
+    scaled_memory = scaled_memory[~np.isnan(scaled_memory)]
+    memory_gb = max(1, math.ceil(scaled_memory.min() * MEMORY_SAFETY)) if len(scaled_memory) else None
+    return {"walltime": walltime, "cores": cpus, "memory_gb": memory_gb}
+
+
+def report(history):
+    """
+    Prints, per state and method, the fitted model and how the model's elapsed
+    time and the walltime requested in each run's .sh compare with the actual
+    elapsed time.
+    """
+    groups = history.execute("SELECT DISTINCT state, method FROM runs ORDER BY state, method").fetchall()
+    for state, method in groups:
+        counts = dict(history.execute("SELECT termination, COUNT(*) FROM runs WHERE state = ? AND method IS ? "
+                                      "GROUP BY termination", (state, method)).fetchall())
+        runs = completed_runs(history, state, method)
+        print(f"\n{state} {method}: {counts.get('completed', 0)} completed, {counts.get('failed', 0)} failed, "
+              f"{counts.get(None, 0)} unfinished")
+        if runs is None:
+            continue
+        fitted_runs = model_runs(history, state, method)
+        model = fit_cost_model(fitted_runs)
+        fitted_on = "" if method is None or len(runs["paths"]) >= MIN_METHOD_RUNS else " (fitted on every method)"
+        print(f"  cpu time ~ n_atoms^{model['exponent']:.2f}, parallel efficiency {model['efficiency']:.0%}{fitted_on}")
+        print(f"  {'Log':<40} {'Atoms':>5} {'Cores':>5} {'Actual':>10} {'Predicted':>10} {'Requested':>10}")
+        predicted = predict_elapsed(model, runs["n_atoms"], runs["cpus"])
+        for i, path in enumerate(runs["paths"]):
+            requested = history.execute("SELECT requested_walltime_s FROM runs WHERE path = ?", (path,)).fetchone()[0]
+            print(f"  {os.path.basename(path):<40} {int(runs['n_atoms'][i]):>5} {int(runs['cpus'][i]):>5} "
+                  f"{runs['elapsed_s'][i] / 3600:>9.2f}h {predicted[i] / 3600:>9.2f}h "
+                  f"{'' if requested is None else f'{requested / 3600:.2f}h':>10}")
+        error = np.abs(np.log(predicted / runs["elapsed_s"]))
+        print(f"  median prediction error: x{np.exp(np.median(error)):.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Learn walltime/cores/memory needs from past Gaussian runs.")
+    parser.add_argument("--history", default=DEFAULT_HISTORY_NAME, help="SQLite history database")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    scan_parser = subparsers.add_parser("scan", help="Add finished logs (files or directories) to the history")
+    scan_parser.add_argument("paths", nargs="+")
+    suggest_parser = subparsers.add_parser("suggest", help="Suggest resources for a new run")
+    suggest_parser.add_argument("--state", required=True, help="e.g. GS_Opt, ES_Opt, ABS")
+    suggest_parser.add_argument("--atoms", type=int, required=True, help="Number of atoms in the molecule")
+    suggest_parser.add_argument("--cores", type=int, help="Cores to plan for (default: median of past runs)")
+    suggest_parser.add_argument("--method", help="Method/basis of the run, e.g. B3LYP/DEF2TZVP (default: any)")
+    subparsers.add_parser("report", help="Compare predicted and actual use of past runs")
+    args = parser.parse_args()
+
+    history = open_history(args.history)
+    if args.command == "scan":
+        added = record_runs(history, find_logs(args.paths))
+        total = history.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+        print(f"{added} logs read, {total} runs in {args.history}")
+    elif args.command == "suggest":
+        suggestion = suggest_resources(history, args.state, args.atoms, args.cores, args.method)
+        if suggestion is None:
+            print(f"No completed {args.state} runs in {args.history}")
+        else:
+            print(f"walltime={suggestion['walltime']} ncpus={suggestion['cores']} mem={suggestion['memory_gb']}gb")
+    else:
+        report(history)
+    history.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import os
+import numpy as np
+
+DEFAULT_STORE_NAME = "sweep_results.npystore"
+
+# One row per (geometry, mode): the geometry was displaced along shifted_mode by
+# magnitude, and the other columns are the values read for 'mode' from its logs.
+RESULT_DTYPE = np.dtype([
+    ("shifted_mode", "i4"),
+    ("mode", "i4"),
+    ("magnitude", "f8"),
+    ("huang_rhys", "f8"),
+    ("shift", "f8"),
+    ("dipstr_abs", "f8"),
+    ("dipstr_emi", "f8"),
+])
+
+
+def empty_table(n_rows):
+    """Returns a result table of n_rows with every value column set to NaN."""
+    table = np.zeros(n_rows, dtype=RESULT_DTYPE)
+    for name in RESULT_DTYPE.names[2:]:
+        table[name] = np.nan
+    return table
+
+
+def to_value(value):
+    """Converts a parsed or CSV value to float, with None and "" as NaN."""
+    return np.nan if value is None or value == "" else float(value)
+
+
+def table_from_rows(rows, shifted_mode, mode=None, columns=("magnitude", "huang_rhys", "shift", "dipstr_abs", "dipstr_emi")):
+    """
+    Builds a result table from rows of values in the order of 'columns'
+    (by default the per-mode CSV rows: magnitude, HR, shift, ABS, EMI).
+    'mode' defaults to shifted_mode.
+    """
+    rows = [[to_value(value) for value in row] for row in rows]
+    table = empty_table(len(rows))
+    table["shifted_mode"] = shifted_mode
+    table["mode"] = shifted_mode if mode is None else mode
+    if rows:
+        values = np.array(rows, dtype=float)
+        for i, name in enumerate(columns):
+            table[name] = values[:, i]
+    return table
+
+
+def table_from_arrays(shifted_modes, magnitudes, arrays):
+    """
+    Builds a result table from an all-modes sweep (see
+    process_directories_all_modes): one row per directory and mode.
+    """
+    n_directories, n_modes = arrays["huang_rhys"].shape
+    table = empty_table(n_directories * n_modes)
+    table["shifted_mode"] = np.repeat(shifted_modes, n_modes)
+    table["mode"] = np.tile(np.arange(1, n_modes + 1), n_directories)
+    table["magnitude"] = np.repeat(magnitudes, n_modes)
+    for name in ("huang_rhys", "shift", "dipstr_abs", "dipstr_emi"):
+        table[name] = arrays[name].ravel()
+    return table
+
+
+def sweep_path(store_dir, sweep):
+    return os.path.join(store_dir, f"{sweep}.npy")
+
+
+def append_sweep(store_dir, sweep, table):
+    """
+    Adds one sweep to a store, a directory with one structured .npy file per
+    sweep. Writing the same sweep again replaces it, so reruns do not
+    duplicate rows. The file is written to a temporary name and renamed, so
+    readers never see a half-written sweep.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    path = sweep_path(store_dir, sweep)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        np.save(f, np.asarray(table, dtype=RESULT_DTYPE))
+    os.replace(tmp_path, path)
+    print(f"Stored {len(table)} rows as sweep '{sweep}' in {store_dir}")
+
+
+def list_sweeps(store_dir):
+    """Returns the sorted names of the sweeps in a store."""
+    if not os.path.isdir(store_dir):
+        return []
+    return sorted(fname[:-4] for fname in os.listdir(store_dir) if fname.endswith(".npy"))
+
+
+def load_sweeps(store_dir, sweeps=None):
+    """
+    Returns {sweep: table} for the given sweeps (all by default). Tables are
+    memory-mapped read-only, so opening a store costs the same however many
+    rows it holds; only the columns and rows actually used are read from disk.
+    """
+    names = list_sweeps(store_dir) if sweeps is None else sweeps
+    return {name: np.load(sweep_path(store_dir, name), mmap_mode='r') for name in names}
+
+
+def load_table(store_dir, sweeps=None):
+    """Returns the given sweeps (all by default) as one in-memory result table."""
+    tables = list(load_sweeps(store_dir, sweeps).values())
+    return np.concatenate(tables) if tables else empty_table(0)
@@ -0,0 +1,115 @@
+import os
+import csv
+import heapq
+import tempfile
+
+PARTIAL_SUFFIX = ".partial"
+
+
+def repair_partial(partial_file):
+    """Truncates a torn last line (left by a crash mid-write) from a partial file."""
+    with open(partial_file, 'rb+') as f:
+        size = f.seek(0, os.SEEK_END)
+        if size == 0:
+            return
+        f.seek(max(0, size - (1 << 16)))
+        tail = f.read()
+        if tail.endswith(b"\n"):
+            return
+        last_newline = tail.rfind(b"\n")
+        f.truncate(size - len(tail) + last_newline + 1 if last_newline != -1 else 0)
+
+
+class StreamingCsvWriter:
+    """
+    Append-only, crash-safe result sink.
+
+    Rows are appended to '<output_file>.partial' with a leading Key column and
+    flushed to disk every 'batch_size' rows, so the partial file is a usable CSV
+    while the run is going. Reopening after a crash resumes: keys already in the
+    partial file are listed in done_keys so the caller can skip them. finalize()
+    sorts the rows with a bounded-memory merge into output_file and drops the
+    Key column, giving the same CSV as collecting and sorting in memory.
+    """
+
+    def __init__(self, output_file, header, batch_size=100):
+        self.output_file = output_file
+        self.partial_file = output_file + PARTIAL_SUFFIX
+        self.header = list(header)
+        self.batch_size = batch_size
+        self.buffer = []
+        self.done_keys = set()
+
+        if os.path.exists(self.partial_file):
+            repair_partial(self.partial_file)
+            with open(self.partial_file, 'r', newline='') as f:
+                reader = csv.reader(f)
+                next(reader, None)
+                self.done_keys = {row[0] for row in reader if row}
+            if self.done_keys:
+                print(f"Resuming {self.partial_file}: {len(self.done_keys)} rows already written")
+        self.file = open(self.partial_file, 'a', newline='')
+        self.writer = csv.writer(self.file)
+        if self.file.tell() == 0:
+            self.writer.writerow(["Key"] + self.header)
+            self.file.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, key, row):
+        """Buffers one row; every batch_size rows the buffer is flushed to disk."""
+        self.buffer.append([key, *row])
+        self.done_keys.add(key)
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Writes buffered rows and forces them to disk."""
+        if self.buffer:
+            self.writer.writerows(self.buffer)
+            self.buffer = []
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+    def finalize(self, sort_key, chunk_rows=100000):
+        """
+        Sorts the partial rows into output_file and removes the partial file.
+
+        Rows are read back chunk_rows at a time, each chunk is sorted into a
+        temporary run file and the runs are merged with heapq.merge, so memory
+        stays bounded however many rows were written. sort_key receives a row
+        (without the Key column) as read back from the CSV, i.e. as strings.
+        """
+        self.close()
+        runs = []
+        try:
+            with open(self.partial_file, 'r', newline='') as f:
+                reader = csv.reader(f)
+                next(reader, None)
+                while True:
+                    chunk = [row[1:] for _, row in zip(range(chunk_rows), reader) if row]
+                    if not chunk:
+                        break
+                    chunk.sort(key=sort_key)
+                    run = tempfile.TemporaryFile('w+', newline='')
+                    csv.writer(run).writerows(chunk)
+                    run.seek(0)
+                    runs.append(run)
+
+            with open(self.output_file, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(self.header)
+                writer.writerows(heapq.merge(*(csv.reader(run) for run in runs), key=sort_key))
+        finally:
+            for run in runs:
+                run.close()
+        os.remove(self.partial_file)
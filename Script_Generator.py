@@ -1,4 +1,108 @@
 import os
+import json
+import argparse
+from File_Utils import write_if_changed
+from Geometry_Reader import read_converged_orientation
+from Format_Coordinates import format_coordinate_block
+from Resource_Autotuner import open_history, suggest_resources, route_method
+
+STATES = ["GS_Opt", "ES_Opt", "GS_Ver", "ES_Ver", "ABS", "EMI"]
+DEFAULT_REMOTE_DIR = "$HOME/Master_Project/test"
+
+# Checkpoints each state copies into $TMPDIR before running.
+STATE_INPUT_CHECKPOINTS = {
+    "GS_Opt": [],
+    "ES_Opt": [],
+    "GS_Ver": ["ES_Opt"],
+    "ES_Ver": ["GS_Opt"],
+    "ABS": ["GS_Opt", "ES_Opt"],
+    "EMI": ["GS_Opt", "ES_Opt"],
+}
+
+SH_TEMPLATE = (
+    "#!/bin/bash\n"
+    "#PBS -l walltime={time_limit}\n"
+    "#PBS -l select=1:ncpus={cores}:mem={memory_gb}gb\n"
+    "#PBS -N {script_name}_Calculation\n\n"
+    'module load "gaussian/g16-c01-avx2"\n'
+    "{checkpoint_copies}"
+    "{pre_run}"
+    "cp {remote_dir}/{molecule_name}/{script_name}.com $TMPDIR\n"
+    "g16 {script_name}.com\n"
+    "cp $TMPDIR/*.log {remote_dir}/{molecule_name}/\n"
+    "{checkpoint_save}"
+)
+
+OPT_LINK_TEMPLATE = (
+    "%Mem={memory_gb}GB\n"
+    "%NProcShared={cores}\n"
+    "{checkpoints}\n"
+    "{route}\n\n"
+    "{title}\n\n"
+    "0 1\n"
+)
+
+# Gaussian input templates per state, compiled into one format string each.
+COM_TEMPLATES = {
+    # Ground State Optimization Calculation
+    "GS_Opt": (
+        OPT_LINK_TEMPLATE.format(memory_gb="{memory_gb}", cores="{cores}",
+                                 checkpoints="%chk={molecule_name}_GS_Opt_Part1.chk",
+                                 route="#p opt pm6", title="Ground State Optimization Calculation Part 1")
+        + "{coordinates}\n\n--Link1--\n"
+        + OPT_LINK_TEMPLATE.format(memory_gb="{memory_gb}", cores="{cores}",
+                                   checkpoints="%oldchk={molecule_name}_GS_Opt_Part1.chk\n%chk={molecule_name}_GS_Opt_Part2.chk\n",
+                                   route="#p B3LYP/6-31G geom=check opt", title="Ground State Optimization Calculation Part 2")
+        + "\n--Link1--\n"
+        + OPT_LINK_TEMPLATE.format(memory_gb="{memory_gb}", cores="{cores}",
+                                   checkpoints="%oldchk={molecule_name}_GS_Opt_Part2.chk\n%chk={molecule_name}_GS_Opt.chk\n",
+                                   route="#p B3LYP/def2TZVP geom=check opt freq=savenormalmodes",
+                                   title="Ground state optimization and frequency calculation")
+    ),
+    # Excited State Optimization Calculation
+    "ES_Opt": (
+        OPT_LINK_TEMPLATE.format(memory_gb="{memory_gb}", cores="{cores}",
+                                 checkpoints="%chk={molecule_name}_ES_Opt_Part1.chk",
+                                 route="#p opt b3lyp/sto-3g TD=(nstates=2, Root=1)",
+                                 title="Excited State Optimization Calculation Part 1")
+        + "{coordinates}\n\n--Link1--\n"
+        + OPT_LINK_TEMPLATE.format(memory_gb="{memory_gb}", cores="{cores}",
+                                   checkpoints="%oldchk={molecule_name}_ES_Opt_Part1.chk\n%chk={molecule_name}_ES_Opt_Part2.chk\n",
+                                   route="#p opt b3lyp/6-31G TD=(nstates=2, Root=1) geom=check",
+                                   title="Excited State Optimization Calculation Part 2")
+        + "\n--Link1--\n"
+        + OPT_LINK_TEMPLATE.format(memory_gb="{memory_gb}", cores="{cores}",
+                                   checkpoints="%oldchk={molecule_name}_ES_Opt_Part2.chk\n%chk={molecule_name}_ES_Opt.chk\n",
+                                   route="#p opt freq=savenormalmodes b3lyp/def2tzvp TD=(nstates=2, Root=1) geom=check",
+                                   title="Excited state optimization and frequency calculation")
+    ),
+    # Ground State Verification Calculation (Corrected)
+    "GS_Ver": OPT_LINK_TEMPLATE.format(memory_gb="{memory_gb}", cores="{cores}",
+                                       checkpoints="%oldchk={molecule_name}_ES_Opt.chk\n%chk={molecule_name}_GS_Ver.chk",
+                                       route="#p b3lyp/def2tzvp geom=check",
+                                       title="Ground State Energy Right After Transition"),
+    # Excited State Verification Calculation
+    "ES_Ver": OPT_LINK_TEMPLATE.format(memory_gb="{memory_gb}", cores="{cores}",
+                                       checkpoints="%oldchk={molecule_name}_GS_Opt.chk\n%chk={molecule_name}_ES_Ver.chk",
+                                       route="#p b3lyp/def2tzvp TD=(nstates=2, Root=1) geom=check",
+                                       title="Excited State Energy Right After Transition"),
+}
+
+FCHT_TEMPLATE = (
+    "%chk={molecule_name}_GS_Opt.chk\n"
+    "%NProcShared={cores}\n"
+    "%mem={memory_gb}GB\n"
+    "#p B3LYP/def2tzvp Freq=(ReadFC, FC, ReadFCHT{emission}) geom=check guess=read NoSymm\n\n"
+    "Franck-Condon Analysis\n\n"
+    "0 1\n\n"
+    "SpecHwHm=250 SpecRes=20 InpDEner={delta_e:.6f}\n\n"
+    "{molecule_name}_ES_Opt.chk\n\n"
+)
+# ABS Calculation
+COM_TEMPLATES["ABS"] = FCHT_TEMPLATE.replace("{emission}", "")
+# EMI Calculation
+COM_TEMPLATES["EMI"] = FCHT_TEMPLATE.replace("{emission}", ", Emission")
+
 
 def format_time_unit(number):
     """Formats a number to be at least two digits."""
@@ -16,6 +120,50 @@ def get_coordinates(label):
     return coordinates
 
 
+def render_sh(molecule_name, calculation_state, time_limit, cores, memory_gb, remote_dir=DEFAULT_REMOTE_DIR, pre_run=""):
+    """
+    Renders the PBS script of one molecule and state. pre_run is shell code run
+    before the .com file is copied to $TMPDIR (e.g. to render it from finished logs).
+    """
+    script_name = f"{molecule_name}_{calculation_state}"
+    checkpoint_copies = "".join(f"cp {remote_dir}/{molecule_name}/{molecule_name}_{state}.chk $TMPDIR\n"
+                                for state in STATE_INPUT_CHECKPOINTS[calculation_state])
+    checkpoint_save = ""
+    if calculation_state in ["GS_Opt", "ES_Opt"]:
+        checkpoint_save = f"cp $TMPDIR/{script_name}.chk {remote_dir}/{molecule_name}/\n"
+    return SH_TEMPLATE.format(time_limit=time_limit, cores=cores, memory_gb=memory_gb, script_name=script_name,
+                              molecule_name=molecule_name, remote_dir=remote_dir,
+                              checkpoint_copies=checkpoint_copies, checkpoint_save=checkpoint_save, pre_run=pre_run)
+
+
+def state_method(calculation_state):
+    """Returns the method of a state's first route line, as Resource_Autotuner records it from the log."""
+    return route_method(next(line for line in COM_TEMPLATES[calculation_state].splitlines() if line.startswith("#")))
+
+
+def render_com(molecule_name, calculation_state, cores, memory_gb, coordinates=None, delta_e=None):
+    """
+    Renders the Gaussian input of one molecule and state. GS_Opt and ES_Opt need
+    the coordinate lines, ABS and EMI the energy gap delta_e.
+    """
+    return COM_TEMPLATES[calculation_state].format(
+        molecule_name=molecule_name, cores=cores, memory_gb=memory_gb,
+        coordinates="\n".join(coordinates or []), delta_e=delta_e)
+
+
+def write_state_scripts(target_dir, script_name, sh_text, com_text):
+    """
+    Writes a state's .sh/.com pair, each in a single write and only if its
+    content changed. Returns the number of files written.
+    """
+    sh_filename = os.path.join(target_dir, f"{script_name}.sh")
+    com_filename = os.path.join(target_dir, f"{script_name}.com")
+    written = write_if_changed(sh_filename, sh_text) + write_if_changed(com_filename, com_text)
+    # Make the .sh script executable
+    os.chmod(sh_filename, 0o755)
+    return written
+
+
 def create_pbs_and_com_scripts():
     """Generates PBS and .com scripts with corrected GS_Ver structure."""
     # Collecting user inputs
@@ -26,8 +174,11 @@ def create_pbs_and_com_scripts():
     cores = int(input("Enter Number of Cores: "))
     memory_gb = int(input("Enter Memory Needed (in GB): "))
     molecule_name = input("Enter Molecule Name: ").strip()
-    calculation_state = input("Enter State (GS_Opt/ES_Opt/GS_Ver/ES_Ver/ABS/EMI): ").strip() 
+    calculation_state = input("Enter State (GS_Opt/ES_Opt/GS_Ver/ES_Ver/ABS/EMI): ").strip()
     script_name = f"{molecule_name}_{calculation_state}"
+    if calculation_state not in STATES:
+        print(f"Unknown state: {calculation_state}")
+        return
 
     # Handle additional inputs for ABS and EMI states
     if calculation_state in ["ABS", "EMI"]:
@@ -48,136 +199,171 @@ def create_pbs_and_com_scripts():
         print(f"Error creating directory {target_dir}: {e}")
         return
 
-    # Define file paths
-    sh_filename = os.path.join(target_dir, f"{script_name}.sh")
-    com_filename = os.path.join(target_dir, f"{script_name}.com")
-
     # Get coordinates only for GS_Opt and ES_Opt
+    coordinates = None
     if calculation_state in ["GS_Opt", "ES_Opt"]:
         coordinates = get_coordinates(calculation_state)
 
-    # Write the PBS script to the .sh file
     try:
-        with open(sh_filename, "w") as sh_file:
-            sh_file.write("#!/bin/bash\n")
-            sh_file.write(f"#PBS -l walltime={time_limit}\n")
-            sh_file.write(f"#PBS -l select=1:ncpus={cores}:mem={memory_gb}gb\n")
-            sh_file.write(f"#PBS -N {script_name}_Calculation\n\n")
-            sh_file.write('module load "gaussian/g16-c01-avx2"\n')
-
-            if calculation_state in ["ABS", "EMI", "ES_Ver"]: 
-                sh_file.write(f"cp $HOME/Master_Project/test/{molecule_name}/{molecule_name}_GS_Opt.chk $TMPDIR\n")
-            if calculation_state in ["ABS", "EMI", "GS_Ver"]: 
-                sh_file.write(f"cp $HOME/Master_Project/test/{molecule_name}/{molecule_name}_ES_Opt.chk $TMPDIR\n") 
-
-            sh_file.write(f"cp $HOME/Master_Project/test/{molecule_name}/{script_name}.com $TMPDIR\n")
-            sh_file.write(f"g16 {script_name}.com\n")
-            sh_file.write(f"cp $TMPDIR/*.log $HOME/Master_Project/test/{molecule_name}/\n")
-            if calculation_state in ["GS_Opt", "ES_Opt"]:
-                sh_file.write(f"cp $TMPDIR/{script_name}.chk $HOME/Master_Project/test/{molecule_name}/\n")
+        write_state_scripts(target_dir, script_name,
+                            render_sh(molecule_name, calculation_state, time_limit, cores, memory_gb),
+                            render_com(molecule_name, calculation_state, cores, memory_gb, coordinates, delta_e))
     except OSError as e:
-        print(f"Error writing to file {sh_filename}: {e}")
+        print(f"Error writing scripts for {script_name}: {e}")
         return
 
-    # Write the Gaussian input script to the .com file
+    sh_filename = os.path.join(target_dir, f"{script_name}.sh")
+    com_filename = os.path.join(target_dir, f"{script_name}.com")
+    print(f"Scripts '{sh_filename}' and '{com_filename}' have been created successfully in {target_dir}.")
+
+
+def read_coordinate_lines(path):
+    """
+    Reads a molecule's coordinate lines from a coordinate block (as written by
+    Format_Coordinates), an .xyz file, or the converged geometry of a Gaussian log.
+    """
+    if path.endswith(".log"):
+        orientation = read_converged_orientation(path)
+        return format_coordinate_block(*orientation).split("\n") if orientation is not None else None
+    with open(path, 'r') as f:
+        lines = [line.rstrip("\n") for line in f]
+    if path.endswith(".xyz"):
+        lines = lines[2:2 + int(lines[0])]
+    return [line for line in lines if line.strip()]
+
+
+def load_manifest(manifest_path):
+    """
+    Reads a batch manifest (see generate_batch) and makes its coordinate paths
+    relative to the manifest. Returns None if it cannot be read.
+    """
     try:
-        with open(com_filename, "w") as com_file:
-            if calculation_state == "GS_Opt":
-                # Ground State Optimization Calculation
-                com_file.write(f"%Mem={memory_gb}GB\n")
-                com_file.write(f"%NProcShared={cores}\n")
-                com_file.write(f"%chk={molecule_name}_GS_Opt_Part1.chk\n")
-                com_file.write("#p opt pm6\n\n")
-                com_file.write("Ground State Optimization Calculation Part 1\n\n")
-                com_file.write("0 1\n")
-                com_file.write("\n".join(coordinates) + "\n\n")
-                com_file.write("--Link1--\n")
-                com_file.write(f"%Mem={memory_gb}GB\n")
-                com_file.write(f"%NProcShared={cores}\n")
-                com_file.write(f"%oldchk={molecule_name}_GS_Opt_Part1.chk\n")
-                com_file.write(f"%chk={molecule_name}_GS_Opt_Part2.chk\n\n")
-                com_file.write("#p B3LYP/6-31G geom=check opt\n\n")
-                com_file.write("Ground State Optimization Calculation Part 2\n\n")
-                com_file.write("0 1\n\n")
-                com_file.write("--Link1--\n")
-                com_file.write(f"%Mem={memory_gb}GB\n")
-                com_file.write(f"%NProcShared={cores}\n")
-                com_file.write(f"%oldchk={molecule_name}_GS_Opt_Part2.chk\n")
-                com_file.write(f"%chk={molecule_name}_GS_Opt.chk\n\n")
-                com_file.write("#p B3LYP/def2TZVP geom=check opt freq=savenormalmodes\n\n")
-                com_file.write("Ground state optimization and frequency calculation\n\n")
-                com_file.write("0 1\n")
-            elif calculation_state == "ES_Opt":
-                # Excited State Optimization Calculation
-                com_file.write(f"%Mem={memory_gb}GB\n")
-                com_file.write(f"%NProcShared={cores}\n")
-                com_file.write(f"%chk={molecule_name}_ES_Opt_Part1.chk\n")
-                com_file.write("#p opt b3lyp/sto-3g TD=(nstates=2, Root=1)\n\n")
-                com_file.write("Excited State Optimization Calculation Part 1\n\n")
-                com_file.write("0 1\n")
-                com_file.write("\n".join(coordinates) + "\n\n")
-                com_file.write("--Link1--\n")
-                com_file.write(f"%Mem={memory_gb}GB\n")
-                com_file.write(f"%NProcShared={cores}\n")
-                com_file.write(f"%oldchk={molecule_name}_ES_Opt_Part1.chk\n")
-                com_file.write(f"%chk={molecule_name}_ES_Opt_Part2.chk\n\n")
-                com_file.write("#p opt b3lyp/6-31G TD=(nstates=2, Root=1) geom=check\n\n")
-                com_file.write("Excited State Optimization Calculation Part 2\n\n")
-                com_file.write("0 1\n\n")
-                com_file.write("--Link1--\n")
-                com_file.write(f"%Mem={memory_gb}GB\n")
-                com_file.write(f"%NProcShared={cores}\n")
-                com_file.write(f"%oldchk={molecule_name}_ES_Opt_Part2.chk\n")
-                com_file.write(f"%chk={molecule_name}_ES_Opt.chk\n\n")
-                com_file.write("#p opt freq=savenormalmodes b3lyp/def2tzvp TD=(nstates=2, Root=1) geom=check\n\n")
-                com_file.write("Excited state optimization and frequency calculation\n\n")
-                com_file.write("0 1\n")
-            elif calculation_state == "GS_Ver":
-                # Ground State Verification Calculation (Corrected)
-                com_file.write(f"%Mem={memory_gb}GB\n")
-                com_file.write(f"%NProcShared={cores}\n")
-                com_file.write(f"%oldchk={molecule_name}_ES_Opt.chk\n")
-                com_file.write(f"%chk={molecule_name}_GS_Ver.chk\n")
-                com_file.write("#p b3lyp/def2tzvp geom=check\n\n")
-                com_file.write("Ground State Energy Right After Transition\n\n")
-                com_file.write("0 1\n")
-            elif calculation_state == "ES_Ver":
-                # Excited State Verification Calculation
-                com_file.write(f"%Mem={memory_gb}GB\n")
-                com_file.write(f"%NProcShared={cores}\n")
-                com_file.write(f"%oldchk={molecule_name}_GS_Opt.chk\n")
-                com_file.write(f"%chk={molecule_name}_ES_Ver.chk\n")
-                com_file.write("#p b3lyp/def2tzvp TD=(nstates=2, Root=1) geom=check\n\n")
-                com_file.write("Excited State Energy Right After Transition\n\n")
-                com_file.write("0 1\n")
-            elif calculation_state == "ABS":
-                # ABS Calculation
-                com_file.write(f"%chk={molecule_name}_GS_Opt.chk\n")
-                com_file.write(f"%NProcShared={cores}\n")
-                com_file.write(f"%mem={memory_gb}GB\n")
-                com_file.write("#p B3LYP/def2tzvp Freq=(ReadFC, FC, ReadFCHT) geom=check guess=read NoSymm\n\n")
-                com_file.write("Franck-Condon Analysis\n\n")
-                com_file.write("0 1\n\n")
-                com_file.write(f"SpecHwHm=250 SpecRes=20 InpDEner={delta_e:.6f}\n\n")
-                com_file.write(f"{molecule_name}_ES_Opt.chk\n\n")
-            elif calculation_state == "EMI":
-                # EMI Calculation
-                com_file.write(f"%chk={molecule_name}_GS_Opt.chk\n")
-                com_file.write(f"%NProcShared={cores}\n")
-                com_file.write(f"%mem={memory_gb}GB\n")
-                com_file.write("#p B3LYP/def2tzvp Freq=(ReadFC, FC, ReadFCHT, Emission) geom=check guess=read NoSymm\n\n")
-                com_file.write("Franck-Condon Analysis\n\n")
-                com_file.write("0 1\n\n")
-                com_file.write(f"SpecHwHm=250 SpecRes=20 InpDEner={delta_e:.6f}\n\n")
-                com_file.write(f"{molecule_name}_ES_Opt.chk\n\n")
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"Error reading manifest {manifest_path}: {e}")
+        return None
 
-    except OSError as e:
-        print(f"Error writing to file {com_filename}: {e}")
+    # Coordinate files are given relative to the manifest.
+    manifest_dir = os.path.dirname(os.path.abspath(manifest_path))
+    for molecule in manifest.get("molecules", []):
+        if "coordinates" in molecule:
+            molecule["coordinates"] = os.path.join(manifest_dir, molecule["coordinates"])
+    if "autotune" in manifest:
+        manifest["autotune_history"] = open_history(os.path.join(manifest_dir, manifest["autotune"]))
+    return manifest
+
+
+def resolve_profile(manifest, molecule, calculation_state, n_atoms=None):
+    """
+    Returns the resource profile of a molecule and state, or None if it names
+    no known profile. With an "autotune" history in the manifest, walltime and
+    memory are replaced by what Resource_Autotuner predicts for n_atoms atoms.
+    """
+    profile_name = (molecule.get("profile") or manifest.get("state_profiles", {}).get(calculation_state)
+                    or manifest.get("defaults", {}).get("profile"))
+    profile = manifest["profiles"].get(profile_name)
+    history = manifest.get("autotune_history")
+    if profile is not None and history is not None and n_atoms:
+        suggestion = suggest_resources(history, calculation_state, n_atoms, profile["cores"],
+                                       state_method(calculation_state))
+        if suggestion is not None:
+            profile = {**profile, "walltime": suggestion["walltime"],
+                       "memory_gb": suggestion["memory_gb"] or profile["memory_gb"]}
+    return profile
+
+
+def molecule_states(manifest, molecule):
+    """Returns the states to run for a molecule (all six by default)."""
+    return molecule.get("states", manifest.get("defaults", {}).get("states", STATES))
+
+
+def root_directories(root=None):
+    """
+    Returns (local root, root as written into job scripts): the given root, or
+    ~/Master_Project/test, which job scripts refer to through $HOME.
+    """
+    if root:
+        return os.path.abspath(root), os.path.abspath(root)
+    return os.path.join(os.path.expanduser("~"), "Master_Project", "test"), DEFAULT_REMOTE_DIR
+
+
+def generate_batch(manifest, root, remote_dir):
+    """
+    Renders every molecule x state of a manifest into root/<molecule>/.
+
+    A manifest is JSON:
+        {"profiles": {"small": {"walltime": "02:00:00", "cores": 8, "memory_gb": 16}, ...},
+         "state_profiles": {"ES_Opt": "large"},        (optional, per-state default)
+         "defaults": {"profile": "small", "states": ["GS_Opt", "ES_Opt"]},  (optional)
+         "autotune": "resource_history.sqlite",          (optional, see Resource_Autotuner)
+         "molecules": [{"name": "Benzene", "coordinates": "Benzene.xyz",
+                        "states": [...], "profile": "small",
+                        "delta_e": {"ABS": 0.12, "EMI": 0.10}}, ...]}
+    Coordinate files are relative to the manifest. States default to all six.
+    Returns (files written, files unchanged, pairs skipped).
+    """
+    written = unchanged = skipped = 0
+
+    for molecule in manifest["molecules"]:
+        molecule_name = molecule["name"]
+        target_dir = os.path.join(root, molecule_name)
+        os.makedirs(target_dir, exist_ok=True)
+        coordinates = read_coordinate_lines(molecule["coordinates"]) if "coordinates" in molecule else None
+        n_atoms = len(coordinates) if coordinates else None
+        for calculation_state in molecule_states(manifest, molecule):
+            script_name = f"{molecule_name}_{calculation_state}"
+            if calculation_state not in STATES:
+                print(f"{script_name}: unknown state, skipped")
+                skipped += 1
+                continue
+            profile = resolve_profile(manifest, molecule, calculation_state, n_atoms)
+            if profile is None:
+                print(f"{script_name}: unknown resource profile, skipped")
+                skipped += 1
+                continue
+
+            delta_e = None
+            if calculation_state in ["GS_Opt", "ES_Opt"]:
+                if not coordinates:
+                    print(f"{script_name}: no coordinates, skipped")
+                    skipped += 1
+                    continue
+            elif calculation_state in ["ABS", "EMI"]:
+                delta_e = molecule.get("delta_e", {}).get(calculation_state)
+                if delta_e is None:
+                    print(f"{script_name}: no delta_e for {calculation_state}, skipped")
+                    skipped += 1
+                    continue
+
+            files = write_state_scripts(
+                target_dir, script_name,
+                render_sh(molecule_name, calculation_state, profile["walltime"], profile["cores"],
+                          profile["memory_gb"], remote_dir),
+                render_com(molecule_name, calculation_state, profile["cores"], profile["memory_gb"],
+                           coordinates, delta_e))
+            written += files
+            unchanged += 2 - files
+    return written, unchanged, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate PBS (.sh) and Gaussian (.com) scripts per molecule and state.")
+    parser.add_argument("--manifest", help="JSON manifest of molecules x states x resource profiles (interactive if omitted)")
+    parser.add_argument("--root", help="Directory holding one folder per molecule (default ~/Master_Project/test)")
+    args = parser.parse_args()
+
+    if args.manifest is None:
+        create_pbs_and_com_scripts()
         return
 
-    # Make the .sh script executable
-    os.chmod(sh_filename, 0o755)
+    manifest = load_manifest(args.manifest)
+    if manifest is None:
+        return
+    root, remote_dir = root_directories(args.root)
+    written, unchanged, skipped = generate_batch(manifest, root, remote_dir)
+    print(f"{written} files written, {unchanged} unchanged, {skipped} molecule/state pairs skipped under {root}")
 
-    print(f"Scripts '{sh_filename}' and '{com_filename}' have been created successfully in {target_dir}.")
 
-create_pbs_and_com_scripts()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Reads the convolved "Final Spectrum" tables of an FCHT sweep
+({X}_Shift_{Y}_<mag>/PW6B95D3_N_FCHT_ABS/EMI.log) onto one common energy grid,
+as (n_magnitudes, n_points) arrays, and analyses the whole sweep at once:
+integrated intensity, band centroid, overlap with the unshifted reference
+spectrum and ABS/EMI mirror-image overlap.
+"""
+import os
+import csv
+import argparse
+import numpy as np
+from Gaussian_Log_Parser import parse_spectrum
+from Extract_Intensity_Borrowing import find_shift_directories
+from Stage_Timer import stage, add_profile_argument, enable_from_args
+
+SPECTRUM_LOGS = {"ABS": "PW6B95D3_N_FCHT_ABS.log", "EMI": "PW6B95D3_N_FCHT_EMI.log"}
+
+
+def common_grid(spectra, resolution=None):
+    """
+    Returns a uniform energy grid spanning every (energies, intensities) spectrum
+    (None entries are skipped), spaced by 'resolution' or else by the finest
+    native spacing (SpecRes). Returns None if there are no spectra.
+    """
+    spectra = [spectrum for spectrum in spectra if spectrum is not None]
+    if not spectra:
+        return None
+    low = min(energies.min() for energies, _ in spectra)
+    high = max(energies.max() for energies, _ in spectra)
+    if resolution is None:
+        resolution = min(np.abs(np.diff(energies)).min() for energies, _ in spectra if len(energies) > 1)
+    n_points = int(round((high - low) / resolution)) + 1
+    return low + resolution * np.arange(n_points)
+
+
+def spectra_on_grid(spectra, grid):
+    """
+    Interpolates each spectrum onto the grid, as one (n_spectra, n_points) array.
+    Intensities are zero outside a spectrum's range and NaN for a None spectrum.
+    """
+    table = np.full((len(spectra), len(grid)), np.nan)
+    for row, spectrum in enumerate(spectra):
+        if spectrum is not None:
+            energies, intensities = spectrum
+            order = np.argsort(energies)
+            table[row] = np.interp(grid, energies[order], intensities[order], left=0.0, right=0.0)
+    return table
+
+
+def load_sweep_spectra(X, Y, base_dir, kinds=("ABS", "EMI"), resolution=None, reference_dir=None):
+    """
+    Parses the spectra of every {X}_Shift_{Y}_<mag> directory and the optional
+    reference directory onto one grid shared by all kinds.
+
+    Returns (magnitudes, grid, {kind: (n_magnitudes, n_points)}, {kind: reference
+    row or None}), or None if no spectrum was found.
+    """
+    directories = find_shift_directories(X, base_dir, Y)
+    magnitudes = np.array([magnitude for _, magnitude, _ in directories])
+    parsed = {}
+    for kind in kinds:
+        parsed[kind] = [parse_spectrum(os.path.join(root, SPECTRUM_LOGS[kind])) for _, _, root in directories]
+        reference_log = os.path.join(reference_dir, SPECTRUM_LOGS[kind]) if reference_dir else None
+        parsed[kind].append(parse_spectrum(reference_log) if reference_log and os.path.exists(reference_log) else None)
+
+    grid = common_grid([spectrum for spectra in parsed.values() for spectrum in spectra], resolution)
+    if grid is None:
+        print(f"No spectra found in {X}_Shift_{Y}_* under {base_dir}")
+        return None
+    tables, references = {}, {}
+    for kind, spectra in parsed.items():
+        table = spectra_on_grid(spectra, grid)
+        tables[kind] = table[:-1]
+        references[kind] = table[-1] if spectra[-1] is not None else None
+    return magnitudes, grid, tables, references
+
+
+def integrated_intensity(grid, spectra):
+    """Trapezoidal area of every row of a (n, n_points) array on a uniform grid."""
+    step = grid[1] - grid[0] if len(grid) > 1 else 0.0
+    return step * (spectra.sum(axis=1) - 0.5 * (spectra[:, 0] + spectra[:, -1]))
+
+
+def band_centroid(grid, spectra):
+    """Intensity-weighted mean energy of every row (NaN for an all-zero row)."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return spectra @ grid / spectra.sum(axis=1)
+
+
+def spectral_overlap(spectra, reference):
+    """
+    Normalized overlap <S|R> / (|S| |R|) of every row with a reference row:
+    1 for identical band shapes, whatever their scale, 0 for disjoint bands.
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return spectra @ reference / (np.linalg.norm(spectra, axis=1) * np.linalg.norm(reference))
+
+
+def mirror_overlap(grid, absorption, emission):
+    """
+    Mirror-image overlap of every ABS/EMI row pair: the emission band is
+    reflected through the midpoint of the two band centroids, E -> c_abs + c_emi - E,
+    and compared with the absorption band by spectral_overlap. The reflection
+    is a linear interpolation on the uniform grid, done for all rows at once.
+    """
+    step = grid[1] - grid[0]
+    centers = band_centroid(grid, absorption) + band_centroid(grid, emission)
+    position = (centers[:, np.newaxis] - grid[np.newaxis] - grid[0]) / step
+    position = np.nan_to_num(position, nan=-1.0)
+    lower = np.floor(position).astype(int)
+    inside = (lower >= 0) & (lower < len(grid) - 1)
+    lower = np.clip(lower, 0, len(grid) - 2)
+    fraction = position - lower
+    reflected = (1 - fraction) * np.take_along_axis(emission, lower, axis=1) \
+        + fraction * np.take_along_axis(emission, lower + 1, axis=1)
+    reflected = np.where(inside, reflected, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.einsum("ij,ij->i", absorption, reflected) / (
+            np.linalg.norm(absorption, axis=1) * np.linalg.norm(reflected, axis=1))
+
+
+def analyze_sweep(grid, tables, references):
+    """Returns {column name: array over magnitudes} for every analysis the available spectra allow."""
+    with stage("spectral_analysis"):
+        columns = {}
+        for kind, spectra in tables.items():
+            columns[f"{kind}_Integral"] = integrated_intensity(grid, spectra)
+            columns[f"{kind}_Centroid"] = band_centroid(grid, spectra)
+            if references.get(kind) is not None:
+                columns[f"{kind}_Overlap"] = spectral_overlap(spectra, references[kind])
+        if "ABS" in tables and "EMI" in tables and len(grid) > 1:
+            columns["Mirror_Overlap"] = mirror_overlap(grid, tables["ABS"], tables["EMI"])
+        return columns
+
+
+def save_analysis_csv(magnitudes, columns, output_file):
+    with open(output_file, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["Magnitude"] + list(columns))
+        for row, magnitude in enumerate(magnitudes.tolist()):
+            writer.writerow([magnitude] + ["" if np.isnan(values[row]) else values[row].item()
+                                           for values in columns.values()])
+    print(f"Data successfully saved to {output_file}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Collect FCHT spectra of a shift sweep onto one grid and analyse them.")
+    parser.add_argument("--mode", type=int, help="Mode number that is being shifted along (prompted if omitted)")
+    parser.add_argument("--kinds", nargs="+", choices=list(SPECTRUM_LOGS), default=list(SPECTRUM_LOGS),
+                        help="Which spectra to read")
+    parser.add_argument("--resolution", type=float, help="Grid spacing in cm^-1 (default: the logs' SpecRes)")
+    parser.add_argument("--reference-dir", default="Unshifted",
+                        help="Directory holding the unshifted reference logs (default Unshifted)")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    enable_from_args(args)
+
+    X = "Unshifted"
+    base_dir = os.getcwd()
+    Y = args.mode if args.mode is not None else int(input("Enter Y (Mode number that is being shifted along): "))
+    loaded = load_sweep_spectra(X, Y, base_dir, args.kinds, args.resolution, os.path.join(base_dir, args.reference_dir))
+    if loaded is None:
+        return
+    magnitudes, grid, tables, references = loaded
+
+    spectra_file = f"{X}_{Y}_spectra.npz"
+    np.savez(spectra_file, energies=grid, magnitudes=magnitudes,
+             **{kind.lower(): table for kind, table in tables.items()},
+             **{f"{kind.lower()}_reference": row for kind, row in references.items() if row is not None})
+    print(f"Spectra ({len(magnitudes)} x {len(grid)}) saved to {spectra_file}")
+    save_analysis_csv(magnitudes, analyze_sweep(grid, tables, references), f"{X}_{Y}_spectral_analysis.csv")
+
+
+if __name__ == "__main__":
+    main()
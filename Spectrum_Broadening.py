@@ -0,0 +1,180 @@
+"""
+Re-broadens the stick transitions of finished FCHT logs locally, so another
+line width or resolution does not need a new Gaussian run (the ABS/EMI decks
+use SpecHwHm=250 SpecRes=20).
+
+The sticks of every log in a sweep are spread onto one energy grid together
+and convolved with a Gaussian, Lorentzian or (pseudo-)Voigt profile by one
+batched FFT per line width. The results are written like Spectrum_Analysis.py
+output and analysed the same way, once per width.
+"""
+import os
+import argparse
+import numpy as np
+from Gaussian_Log_Parser import parse_sticks
+from Extract_Intensity_Borrowing import find_shift_directories
+from Spectrum_Analysis import SPECTRUM_LOGS, analyze_sweep, save_analysis_csv
+from Stage_Timer import stage, add_profile_argument, enable_from_args
+
+LINESHAPES = ["gaussian", "lorentzian", "voigt"]
+
+
+def line_profile(offsets, lineshape, hwhm, lorentzian_hwhm=None):
+    """
+    Area-normalized line profile at energy offsets (cm^-1). For "voigt",
+    'hwhm' is the Gaussian and 'lorentzian_hwhm' (default hwhm) the Lorentzian
+    half width, combined with the Thompson-Cox-Hastings pseudo-Voigt.
+    """
+    if lineshape == "gaussian":
+        sigma = hwhm / np.sqrt(2 * np.log(2))
+        return np.exp(-0.5 * (offsets / sigma) ** 2) / (sigma * np.sqrt(2 * np.pi))
+    if lineshape == "lorentzian":
+        return hwhm / (np.pi * (offsets ** 2 + hwhm ** 2))
+    if lineshape == "voigt":
+        f_g = 2 * hwhm
+        f_l = 2 * (lorentzian_hwhm if lorentzian_hwhm is not None else hwhm)
+        f = (f_g ** 5 + 2.69269 * f_g ** 4 * f_l + 2.42843 * f_g ** 3 * f_l ** 2 + 4.47163 * f_g ** 2 * f_l ** 3
+             + 0.07842 * f_g * f_l ** 4 + f_l ** 5) ** 0.2
+        ratio = f_l / f
+        eta = 1.36603 * ratio - 0.47719 * ratio ** 2 + 0.11116 * ratio ** 3
+        return eta * line_profile(offsets, "lorentzian", f / 2) + (1 - eta) * line_profile(offsets, "gaussian", f / 2)
+    raise ValueError(f"Unknown line shape: {lineshape}")
+
+
+def stick_grid(stick_sets, resolution, margin):
+    """Uniform grid from the lowest to the highest stick energy of all sets, padded by 'margin'."""
+    energies = [sticks[0] for sticks in stick_sets if sticks is not None]
+    if not energies:
+        return None
+    low = min(values.min() for values in energies) - margin
+    high = max(values.max() for values in energies) + margin
+    return low + resolution * np.arange(int(np.ceil((high - low) / resolution)) + 1)
+
+
+def bin_sticks(stick_sets, grid):
+    """
+    Spreads every set of (energies, weights) sticks onto the grid, each stick
+    split linearly between its two nearest grid points, so its weight and
+    mean energy are kept. Returns (n_sets, n_points); a None set gives a NaN row.
+    Sticks outside the grid are dropped.
+    """
+    n_sets, n_points = len(stick_sets), len(grid)
+    step = grid[1] - grid[0]
+    rows, positions, weights = [], [], []
+    for row, sticks in enumerate(stick_sets):
+        if sticks is not None:
+            rows.append(np.full(len(sticks[0]), row))
+            positions.append((sticks[0] - grid[0]) / step)
+            weights.append(sticks[1])
+    binned = np.zeros(n_sets * n_points)
+    if rows:
+        rows, positions, weights = np.concatenate(rows), np.concatenate(positions), np.concatenate(weights)
+        lower = np.floor(positions).astype(int)
+        fraction = positions - lower
+        keep = (lower >= 0) & (lower < n_points - 1)
+        flat = rows[keep] * n_points + lower[keep]
+        binned += np.bincount(flat, weights[keep] * (1 - fraction[keep]), minlength=n_sets * n_points)
+        binned += np.bincount(flat + 1, weights[keep] * fraction[keep], minlength=n_sets * n_points)
+    binned = binned.reshape(n_sets, n_points)
+    binned[[sticks is None for sticks in stick_sets]] = np.nan
+    return binned
+
+
+def broaden(binned, grid, lineshape, widths, lorentzian_hwhm=None):
+    """
+    Convolves binned sticks (n_sets, n_points) with the line profile of every
+    HWHM in 'widths' by FFT. Returns an array of shape (n_widths, n_sets, n_points).
+    """
+    n_points = len(grid)
+    step = grid[1] - grid[0]
+    n_fft = 1 << int(np.ceil(np.log2(3 * n_points - 2)))
+    offsets = (np.arange(2 * n_points - 1) - (n_points - 1)) * step
+    binned_fft = np.fft.rfft(np.nan_to_num(binned), n_fft, axis=1)
+    spectra = np.empty((len(widths), *binned.shape))
+    for index, hwhm in enumerate(widths):
+        kernel_fft = np.fft.rfft(line_profile(offsets, lineshape, hwhm, lorentzian_hwhm), n_fft)
+        convolved = np.fft.irfft(binned_fft * kernel_fft, n_fft, axis=1)
+        spectra[index] = convolved[:, n_points - 1:2 * n_points - 1]
+    spectra[:, np.isnan(binned[:, 0])] = np.nan
+    return spectra
+
+
+def rebroaden_logs(log_files, lineshape="gaussian", widths=(250.0,), resolution=20.0, weight="dipstr",
+                   lorentzian_hwhm=None, grid=None):
+    """
+    Re-broadens the sticks of each log (DipStr or Intensity weighted). Missing
+    logs give NaN rows. Returns (grid, (n_widths, n_logs, n_points) spectra),
+    or None if no log has sticks.
+    """
+    column = 1 if weight == "dipstr" else 2
+    stick_sets = []
+    for log_file in log_files:
+        sticks = parse_sticks(log_file) if log_file and os.path.exists(log_file) else None
+        stick_sets.append((sticks[0], sticks[column]) if sticks is not None else None)
+    if grid is None:
+        grid = stick_grid(stick_sets, resolution, 5 * max(max(widths), lorentzian_hwhm or 0))
+    if grid is None:
+        return None
+    with stage("broaden"):
+        return grid, broaden(bin_sticks(stick_sets, grid), grid, lineshape, widths, lorentzian_hwhm)
+
+
+def width_label(hwhm):
+    return f"{hwhm:g}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-broaden the stick spectra of an FCHT sweep without re-running Gaussian.")
+    parser.add_argument("--mode", type=int, help="Mode number that is being shifted along (prompted if omitted)")
+    parser.add_argument("--kinds", nargs="+", choices=list(SPECTRUM_LOGS), default=list(SPECTRUM_LOGS),
+                        help="Which spectra to re-broaden")
+    parser.add_argument("--lineshape", choices=LINESHAPES, default="gaussian", help="Line profile")
+    parser.add_argument("--hwhm", type=float, nargs="+", default=[250.0],
+                        help="Half widths at half maximum in cm^-1; several values run a width study in one pass")
+    parser.add_argument("--lorentzian-hwhm", type=float,
+                        help="Lorentzian HWHM of the Voigt profile (default: --hwhm), which then sets the Gaussian HWHM")
+    parser.add_argument("--resolution", type=float, default=20.0, help="Grid spacing in cm^-1")
+    parser.add_argument("--weight", choices=["dipstr", "intensity"], default="dipstr",
+                        help="Stick heights: DipStr or the Intensity Gaussian prints")
+    parser.add_argument("--reference-dir", default="Unshifted",
+                        help="Directory holding the unshifted reference logs (default Unshifted)")
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    enable_from_args(args)
+
+    X = "Unshifted"
+    base_dir = os.getcwd()
+    Y = args.mode if args.mode is not None else int(input("Enter Y (Mode number that is being shifted along): "))
+    directories = find_shift_directories(X, base_dir, Y)
+    magnitudes = np.array([magnitude for _, magnitude, _ in directories])
+    reference_dir = os.path.join(base_dir, args.reference_dir)
+
+    # ABS and EMI share one grid (needed for the mirror overlap), so all their logs are broadened together.
+    log_files = [os.path.join(root, SPECTRUM_LOGS[kind]) for kind in args.kinds for _, _, root in directories]
+    log_files += [os.path.join(reference_dir, SPECTRUM_LOGS[kind]) for kind in args.kinds]
+    result = rebroaden_logs(log_files, args.lineshape, args.hwhm, args.resolution, args.weight, args.lorentzian_hwhm)
+    if result is None:
+        print(f"No stick transitions found in {X}_Shift_{Y}_* under {base_dir}")
+        return
+    grid, spectra = result
+    n_sweep = len(directories)
+    n_kinds = len(args.kinds)
+    tables = {kind: spectra[:, i * n_sweep:(i + 1) * n_sweep] for i, kind in enumerate(args.kinds)}
+    references = {kind: spectra[:, n_kinds * n_sweep + i] for i, kind in enumerate(args.kinds)}
+
+    spectra_file = f"{X}_{Y}_spectra_{args.lineshape}.npz"
+    np.savez(spectra_file, energies=grid, magnitudes=magnitudes, hwhm=np.array(args.hwhm),
+             **{kind.lower(): table for kind, table in tables.items()},
+             **{f"{kind.lower()}_reference": row for kind, row in references.items()})
+    print(f"Spectra ({len(args.hwhm)} widths x {n_sweep} x {len(grid)}) saved to {spectra_file}")
+
+    for index, hwhm in enumerate(args.hwhm):
+        width_tables = {kind: table[index] for kind, table in tables.items()}
+        width_references = {kind: row[index] if not np.isnan(row[index, 0]) else None
+                            for kind, row in references.items()}
+        save_analysis_csv(magnitudes, analyze_sweep(grid, width_tables, width_references),
+                          f"{X}_{Y}_spectral_analysis_{args.lineshape}_{width_label(hwhm)}.csv")
+
+
+if __name__ == "__main__":
+    main()
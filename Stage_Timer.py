@@ -0,0 +1,140 @@
+"""
+Opt-in timers around the hot stages of sweeps and extractions: directory walks,
+log reads and parsing, NumPy work, input writes and qsub calls.
+
+Enable it with --profile on the scripts that support it, or for any script with
+the FCHT_PROFILE environment variable (FCHT_PROFILE=1, or FCHT_PROFILE=<file>
+to also save a cProfile of the slowest stage, readable with pstats). At exit a
+per-stage breakdown (count, total, p50/p95, MB read) is printed to stderr.
+While disabled, stage() returns a shared no-op context manager.
+
+Stages timed inside --jobs worker processes are not included in the report.
+"""
+import os
+import sys
+import time
+import atexit
+import cProfile
+import numpy as np
+
+PROFILE_ENV = "FCHT_PROFILE"
+
+_enabled = False
+_dump_file = None
+_durations = {}
+_bytes = {}
+_profilers = {}
+_profiling = []
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def add_bytes(self, nbytes):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    def __init__(self, name, path, nbytes):
+        self.name = name
+        self.path = path
+        self.nbytes = nbytes
+
+    def __enter__(self):
+        if _dump_file is not None:
+            # One profiler per stage; a nested stage pauses the enclosing one.
+            if _profiling:
+                _profiling[-1].disable()
+            profiler = _profilers.setdefault(self.name, cProfile.Profile())
+            _profiling.append(profiler)
+            profiler.enable()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        if _dump_file is not None:
+            _profiling.pop().disable()
+            if _profiling:
+                _profiling[-1].enable()
+        _durations.setdefault(self.name, []).append(elapsed)
+        if self.path is not None:
+            try:
+                self.nbytes += os.path.getsize(self.path)
+            except OSError:
+                pass
+        if self.nbytes:
+            _bytes[self.name] = _bytes.get(self.name, 0) + self.nbytes
+        return False
+
+    def add_bytes(self, nbytes):
+        self.nbytes += nbytes
+
+
+def stage(name, path=None, nbytes=0):
+    """
+    Times a 'with' block under a stage name. 'path' (a file whose size is
+    counted once the block ends), 'nbytes' and add_bytes() on the returned
+    object add to the stage's bytes read.
+    """
+    if not _enabled:
+        return _NULL_STAGE
+    return _Stage(name, path, nbytes)
+
+
+def enable(dump_file=None):
+    """Starts collecting stage timings, reported at exit. With dump_file, the slowest stage is also cProfiled."""
+    global _enabled, _dump_file
+    if not _enabled:
+        atexit.register(report)
+    _enabled = True
+    if dump_file:
+        _dump_file = dump_file
+
+
+def add_profile_argument(parser):
+    parser.add_argument("--profile", nargs="?", const="", metavar="PSTATS_FILE",
+                        help="Print a per-stage timing breakdown at exit; with a file, also save a cProfile of the slowest stage")
+
+
+def enable_from_args(args):
+    if args.profile is not None:
+        enable(args.profile or None)
+
+
+def stage_summary():
+    """Returns {stage: {"count", "total", "p50", "p95", "bytes"}} with times in seconds, slowest first."""
+    summary = {}
+    for name, durations in _durations.items():
+        p50, p95 = np.percentile(durations, [50, 95])
+        summary[name] = {"count": len(durations), "total": sum(durations), "p50": float(p50), "p95": float(p95),
+                         "bytes": _bytes.get(name, 0)}
+    return dict(sorted(summary.items(), key=lambda item: item[1]["total"], reverse=True))
+
+
+def report(stream=None):
+    """Prints the stage breakdown and saves the slowest stage's cProfile if requested."""
+    stream = stream or sys.stderr
+    summary = stage_summary()
+    if not summary:
+        return
+    print(f"\n{'Stage':<22} {'Count':>8} {'Total s':>9} {'p50 ms':>9} {'p95 ms':>9} {'MB read':>9}", file=stream)
+    for name, stats in summary.items():
+        megabytes = f"{stats['bytes'] / (1 << 20):9.1f}" if stats["bytes"] else f"{'':9}"
+        print(f"{name:<22} {stats['count']:>8} {stats['total']:>9.3f} {stats['p50'] * 1e3:>9.3f} "
+              f"{stats['p95'] * 1e3:>9.3f} {megabytes}", file=stream)
+    if _dump_file is not None:
+        slowest = next(iter(summary))
+        _profilers[slowest].dump_stats(_dump_file)
+        print(f"cProfile of slowest stage '{slowest}' saved to {_dump_file}", file=stream)
+
+
+if os.environ.get(PROFILE_ENV):
+    enable(None if os.environ[PROFILE_ENV] == "1" else os.environ[PROFILE_ENV])
@@ -0,0 +1,139 @@
+import os
+import json
+import time
+import hashlib
+
+JOURNAL_NAME = "sweep_journal.jsonl"
+TERMINATION_TAIL_BYTES = 64 << 10
+
+
+def input_hash(*parts):
+    """Returns a SHA-256 over the strings that define a point's generated input."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def load_journal(journal_path):
+    """
+    Replays the append-only journal and returns {label: latest entry}.
+    A torn last line (from a crash mid-write) is ignored.
+    """
+    entries = {}
+    if not os.path.exists(journal_path):
+        return entries
+    with open(journal_path, 'r') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            entries[entry["label"]] = {**entries.get(entry["label"], {}), **entry}
+    return entries
+
+
+def append_journal(journal_path, label, **fields):
+    """Appends one state change for a point and flushes it to disk."""
+    entry = {"label": label, "time": time.time(), **fields}
+    with open(journal_path, 'a') as f:
+        f.write(json.dumps(entry) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    return entry
+
+
+def log_termination(log_file):
+    """
+    Returns "completed" if the last termination line near the end of a Gaussian
+    log is "Normal termination", "failed" for "Error termination", and None if
+    the log is missing or has not terminated yet.
+    """
+    try:
+        with open(log_file, 'rb') as f:
+            size = f.seek(0, os.SEEK_END)
+            f.seek(max(0, size - TERMINATION_TAIL_BYTES))
+            tail = f.read()
+    except FileNotFoundError:
+        return None
+    normal = tail.rfind(b"Normal termination")
+    error = tail.rfind(b"Error termination")
+    if normal == -1 and error == -1:
+        return None
+    return "completed" if normal > error else "failed"
+
+
+def submission_termination(entry, log_file):
+    """
+    log_termination for the latest submission of a point: a log last written
+    before the entry's submission time belongs to an earlier attempt and gives None.
+    """
+    try:
+        if os.path.getmtime(log_file) < entry.get("time", 0):
+            return None
+    except OSError:
+        return None
+    return log_termination(log_file)
+
+
+def retire_log(log_file):
+    """
+    Moves a previous attempt's log to '<log>.previous' before a point is
+    resubmitted, so its termination line cannot be mistaken for the new job's.
+    Returns True if a log was moved.
+    """
+    if not os.path.isfile(log_file):
+        return False
+    os.replace(log_file, log_file + ".previous")
+    return True
+
+
+def point_status(entry, point_hash, log_file):
+    """
+    Classifies a sweep point:
+      "completed" - its log ends with Normal termination and its input is unchanged;
+      "pending"   - it was submitted with the same input and has not finished;
+      "submit"    - it is new, its input changed, or its job failed.
+    """
+    if entry is not None and entry.get("input_hash") != point_hash:
+        return "submit"
+    if entry is not None and entry.get("state") == "submitted":
+        termination = submission_termination(entry, log_file)
+    else:
+        termination = log_termination(log_file)
+    if termination == "completed":
+        return "completed"
+    if termination is None and entry is not None and entry.get("state") == "submitted":
+        return "pending"
+    return "submit"
+
+
+def sweep_plan(journal, points, resubmit_pending=False):
+    """
+    Returns {label: status} for (label, point_hash, log_file) points.
+    With resubmit_pending, pending points (e.g. jobs killed before writing a
+    termination line) are submitted again.
+    """
+    plan = {}
+    for label, point_hash, log_file in points:
+        status = point_status(journal.get(label), point_hash, log_file)
+        plan[label] = "submit" if status == "pending" and resubmit_pending else status
+    return plan
+
+
+def record_completions(journal_path, journal, plan, points):
+    """
+    Journals points newly found complete so the journal reflects their final
+    state. Log paths are stored absolute, like those of submitted points.
+    """
+    for label, point_hash, log_file in points:
+        if plan[label] == "completed" and journal.get(label, {}).get("state") != "completed":
+            journal[label] = append_journal(journal_path, label, state="completed", input_hash=point_hash,
+                                            log=os.path.abspath(log_file))
+
+
+def summarize_plan(plan):
+    """Prints how many points are completed, pending and to be submitted."""
+    counts = {status: list(plan.values()).count(status) for status in ("completed", "pending", "submit")}
+    print(f"Sweep: {counts['completed']} completed, {counts['pending']} pending, {counts['submit']} to submit")
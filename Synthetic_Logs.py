@@ -0,0 +1,177 @@
+"""
+Synthetic Gaussian outputs for benchmarking and trying the scripts without a
+cluster: FCHT logs (optionally with a Final Spectrum table), frequency logs,
+.com templates and the sweep directory trees that Extract_Intensity_Borrowing.py,
+Normal_Coordinates_Data.py and Spectrum_Analysis.py read.
+"""
+import os
+import numpy as np
+
+PREAMBLE_LINE = " SCF Done:  E(RB3LYP) =  -232.248768132     A.U. after   12 cycles\n"
+
+
+def progression_spectrum(origin, huang_rhys, sign=1, spacing=1000.0, hwhm=250.0, resolution=20.0):
+    """
+    Returns (energies, intensities) of a Gaussian-broadened Poisson progression
+    from 'origin' (cm^-1), towards higher energies for sign=1 (absorption) or
+    lower ones for sign=-1 (emission), on a SpecRes-like grid.
+    """
+    quanta = np.arange(12)
+    weights = np.exp(-huang_rhys) * huang_rhys ** quanta / np.cumprod(np.maximum(quanta, 1))
+    peaks = origin + sign * quanta * spacing
+    energies = np.arange(min(origin, peaks[-1]) - 4 * hwhm, max(origin, peaks[-1]) + 4 * hwhm, resolution)
+    sigma = hwhm / np.sqrt(2 * np.log(2))
+    intensities = weights @ np.exp(-0.5 * ((energies[np.newaxis] - peaks[:, np.newaxis]) / sigma) ** 2)
+    return energies, intensities
+
+
+def write_spectrum_table(f, energies, intensities):
+    """Writes a Final Spectrum section in Gaussian's layout."""
+    f.write(" ==================================================\n")
+    f.write("                  Final Spectrum\n")
+    f.write(" ==================================================\n\n")
+    f.write(" Band broadening simulated by mean of Gaussian functions with\n")
+    f.write(" Half-Widths at Half-Maximum of  250.00 cm^(-1)\n\n")
+    f.write(" Legend:\n -------\n 1st col.: Energy (in cm^-1)\n 2nd col.: Intensity at T=0K\n")
+    f.write(" -----------------------------------\n")
+    f.write("     Energy      Intensity at T=0K\n")
+    f.write(" -----------------------------------\n")
+    for energy, intensity in zip(energies, intensities):
+        mantissa, exponent = f"{intensity:.6E}".split("E")
+        f.write(f" {energy:14.4f}    {mantissa}D{exponent}\n")
+    f.write(" -----------------------------------\n\n")
+
+
+def write_fcht_log(log_file, n_modes=30, preamble_mb=1.0, seed=0, spectrum=None):
+    """
+    Writes an FCHT log: preamble_mb of SCF lines, then the Huang-Rhys Factors,
+    Shift Vector and the |0> -> |n^1> / |n^2> transitions with their DipStr,
+    in Gaussian's layout (D exponents in the factor tables), and the Final
+    Spectrum table of an (energies, intensities) 'spectrum'. Returns its size.
+    """
+    rng = np.random.default_rng(seed)
+    factors = rng.uniform(0.0, 1.0, n_modes)
+    shifts = rng.uniform(-1.0, 1.0, n_modes)
+    dipstr = rng.uniform(0.0, 1.0, (n_modes, 2))
+    with open(log_file, 'w') as f:
+        f.write(PREAMBLE_LINE * int(preamble_mb * (1 << 20) / len(PREAMBLE_LINE)))
+        f.write("                        Huang-Rhys Factors\n")
+        f.write(" ==================================================\n")
+        for mode in range(1, n_modes + 1):
+            f.write(f" Mode num.  {mode:3d} - Factor:   {factors[mode - 1]:.6f}D-01\n")
+        f.write("\n                          Shift Vector\n")
+        f.write(" ==================================================\n")
+        f.write("   Mode      Shift\n")
+        for mode in range(1, n_modes + 1):
+            f.write(f"   {mode:3d}    {shifts[mode - 1]:.6f}D+00\n")
+        f.write("\n Information on Transitions\n\n")
+        for mode in range(1, n_modes + 1):
+            f.write(f" Energy =  {38540 + mode:.3f} cm^-1: |0> -> |{mode}^1>\n")
+            f.write(f"   -> Intensity =   0.0100   (DipStr = {dipstr[mode - 1, 0]:.5E})\n")
+            f.write(f" Energy =  {38640 + mode:.3f} cm^-1: |0> -> |{mode}^2>\n")
+            f.write(f"   -> Intensity =   0.0010   (DipStr = {dipstr[mode - 1, 1]:.5E})\n")
+        if spectrum is not None:
+            f.write("\n")
+            write_spectrum_table(f, *spectrum)
+        f.write(" Normal termination of Gaussian 16\n")
+    return os.path.getsize(log_file)
+
+
+def synthetic_geometry(n_atoms, seed=0):
+    """Returns (atomic_numbers, coords) of a random but well-separated molecule."""
+    rng = np.random.default_rng(seed)
+    atomic_numbers = np.where(np.arange(n_atoms) % 2 == 0, 6, 1)
+    coords = np.round(rng.uniform(-1.0, 1.0, (n_atoms, 3)) * n_atoms ** (1 / 3) * 1.5, 6)
+    return atomic_numbers, coords
+
+
+def write_freq_log(log_file, n_atoms=12, seed=0):
+    """
+    Writes a frequency log with a Standard orientation block and the 3N-6 normal
+    modes in Gaussian's three-column "Atom AN X Y Z" layout. Returns its size.
+    """
+    rng = np.random.default_rng(seed)
+    atomic_numbers, coords = synthetic_geometry(n_atoms, seed)
+    n_modes = 3 * n_atoms - 6
+    displacements = np.round(rng.uniform(-1.0, 1.0, (n_modes, n_atoms, 3)), 2)
+    frequencies = np.sort(rng.uniform(100.0, 3200.0, n_modes))
+    with open(log_file, 'w') as f:
+        f.write("                         Standard orientation:\n")
+        f.write(" ---------------------------------------------------------------------\n")
+        f.write(" Center     Atomic      Atomic             Coordinates (Angstroms)\n")
+        f.write(" Number     Number       Type             X           Y           Z\n")
+        f.write(" ---------------------------------------------------------------------\n")
+        for atom, (number, (x, y, z)) in enumerate(zip(atomic_numbers, coords), start=1):
+            f.write(f" {atom:6d} {number:10d} {0:11d}    {x:12.6f}{y:12.6f}{z:12.6f}\n")
+        f.write(" ---------------------------------------------------------------------\n")
+        f.write(" Harmonic frequencies (cm**-1), IR intensities (KM/Mole)\n\n")
+        for start in range(0, n_modes, 3):
+            modes = range(start, min(start + 3, n_modes))
+            f.write("".join(f"{mode + 1:>23d}" for mode in modes) + "\n")
+            f.write("".join(f"{'A':>23s}" for _ in modes) + "\n")
+            f.write(" Frequencies --" + "".join(f"{frequencies[mode]:>23.4f}" for mode in modes) + "\n")
+            f.write(" Red. masses --" + "".join(f"{1.5:>23.4f}" for _ in modes) + "\n")
+            f.write(" Frc consts  --" + "".join(f"{0.3:>23.4f}" for _ in modes) + "\n")
+            f.write(" IR Inten    --" + "".join(f"{0.0:>23.4f}" for _ in modes) + "\n")
+            f.write("  Atom  AN" + "      X      Y      Z  " * len(modes) + "\n")
+            for atom in range(n_atoms):
+                f.write(f"{atom + 1:>6d}{atomic_numbers[atom]:>4d}"
+                        + "".join("  " + " ".join(f"{displacements[mode, atom, k]:6.2f}" for k in range(3))
+                                  for mode in modes) + "\n")
+        f.write("\n - Thermochemistry -\n")
+        f.write(" Normal termination of Gaussian 16\n")
+    return os.path.getsize(log_file)
+
+
+def write_com_template(com_file, n_atoms=12, seed=0):
+    """Writes a Gaussian input with the synthetic geometry in its coordinate block."""
+    atomic_numbers, coords = synthetic_geometry(n_atoms, seed)
+    with open(com_file, 'w') as f:
+        f.write("%mem=16GB\n%NProcShared=8\n%chk=Benzene.chk\n#p opt freq b3lyp/def2tzvp\n\n")
+        f.write("Synthetic geometry\n\n0 1\n")
+        for number, (x, y, z) in zip(atomic_numbers, coords):
+            f.write(f"{'C' if number == 6 else 'H':<2}  {x:10.6f}  {y:10.6f}  {z:10.6f}\n")
+        f.write("\n")
+
+
+def sweep_magnitudes(width, step=0.01):
+    """Returns 'width' magnitudes, half negative and half positive, as +/- pairs."""
+    half = np.arange(1, width // 2 + 1) * step
+    return np.round(np.concatenate([-half[::-1], half]), 2)
+
+
+def build_extraction_tree(base_dir, X="Unshifted", Y=11, width=20, n_modes=30, preamble_mb=1.0, spectra=False):
+    """
+    Creates {X}_Shift_{Y}_<mag> directories with ABS and EMI FCHT logs, as read by
+    Extract_Intensity_Borrowing.py. With spectra, the logs also hold spectra
+    whose Huang-Rhys factor grows with the magnitude, and an undisplaced {X}
+    reference directory is added. Returns (number of logs, total bytes).
+    """
+    n_logs = n_bytes = 0
+    directories = [(magnitude, os.path.join(base_dir, f"{X}_Shift_{Y}_{magnitude:.2f}"))
+                   for magnitude in sweep_magnitudes(width)]
+    if spectra:
+        directories.append((0.0, os.path.join(base_dir, X)))
+    for i, (magnitude, directory) in enumerate(directories):
+        os.makedirs(directory, exist_ok=True)
+        for j, (name, sign) in enumerate([("PW6B95D3_N_FCHT_ABS.log", 1), ("PW6B95D3_N_FCHT_EMI.log", -1)]):
+            spectrum = progression_spectrum(38000.0, 1.0 + 20 * magnitude ** 2, sign) if spectra else None
+            n_bytes += write_fcht_log(os.path.join(directory, name), n_modes, preamble_mb, seed=2 * i + j,
+                                      spectrum=spectrum)
+            n_logs += 1
+    return n_logs, n_bytes
+
+
+def build_shift_tree(base_dir, mode=11, width=20, n_modes=30, preamble_mb=1.0):
+    """
+    Creates Shift_{mode}/Benzene_Shift_{mode}_<mag>.log FCHT logs, as read by
+    Normal_Coordinates_Data.py. Returns (number of logs, total bytes).
+    """
+    shift_dir = os.path.join(base_dir, f"Shift_{mode}")
+    os.makedirs(shift_dir, exist_ok=True)
+    n_bytes = 0
+    magnitudes = sweep_magnitudes(width)
+    for i, magnitude in enumerate(magnitudes):
+        n_bytes += write_fcht_log(os.path.join(shift_dir, f"Benzene_Shift_{mode}_{magnitude:.2f}.log"),
+                                  n_modes, preamble_mb, seed=i)
+    return len(magnitudes), n_bytes
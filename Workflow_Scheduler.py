@@ -0,0 +1,226 @@
+"""
+Submits the whole GS_Opt -> ES_Opt -> Ver -> ABS/EMI chain of each molecule at
+once, linked with PBS 'depend=afterok' so independent branches run concurrently:
+
+    GS_Opt ----> ES_Ver ----> ABS (also needs GS_Opt, ES_Opt)
+    ES_Opt ----> GS_Ver ----> EMI (also needs GS_Opt, ES_Opt)
+
+ABS/EMI need InpDEner, the gap between an optimized and a vertical energy. Unless
+the manifest gives delta_e, their job scripts run this script with --fill-fcht
+first, which reads both energies from the finished logs and renders the .com.
+Try it locally with --qsub "python Fake_Qsub.py" (FAKE_QSUB_RUN=1 runs the jobs).
+"""
+import os
+import sys
+import time
+import shlex
+import argparse
+import subprocess
+from Gaussian_Log_Parser import parse_final_energy
+from File_Utils import write_if_changed
+from Sweep_Journal import load_journal, append_journal, input_hash, point_status
+from Stage_Timer import stage, add_profile_argument, enable_from_args
+from Script_Generator import (STATES, render_sh, render_com, write_state_scripts, load_manifest, resolve_profile,
+                              molecule_states, root_directories, read_coordinate_lines)
+
+WORKFLOW_JOURNAL_NAME = "workflow_journal.jsonl"
+
+# Jobs each state must wait for: its input checkpoints and, for ABS/EMI, the
+# vertical calculation whose energy sets InpDEner.
+STATE_DEPENDENCIES = {
+    "GS_Opt": [],
+    "ES_Opt": [],
+    "GS_Ver": ["ES_Opt"],
+    "ES_Ver": ["GS_Opt"],
+    "ABS": ["GS_Opt", "ES_Opt", "ES_Ver"],
+    "EMI": ["GS_Opt", "ES_Opt", "GS_Ver"],
+}
+
+# (optimized state, vertical state) whose energy gap is the InpDEner of an FCHT state.
+FCHT_ENERGY_STATES = {
+    "ABS": ("GS_Opt", "ES_Ver"),
+    "EMI": ("ES_Opt", "GS_Ver"),
+}
+
+EXCITED_STATES = ["ES_Opt", "ES_Ver"]
+
+
+def state_log(molecule_dir, molecule_name, calculation_state):
+    return os.path.join(molecule_dir, f"{molecule_name}_{calculation_state}.log")
+
+
+def fcht_delta_e(molecule_dir, molecule_name, calculation_state):
+    """
+    Returns |E(optimized) - E(vertical)| for ABS or EMI from the finished logs,
+    the TD-DFT energy for excited states and the SCF energy otherwise.
+    Returns None if either energy is missing.
+    """
+    energies = []
+    for state in FCHT_ENERGY_STATES[calculation_state]:
+        energy = parse_final_energy(state_log(molecule_dir, molecule_name, state), excited=state in EXCITED_STATES)
+        if energy is None:
+            print(f"No {state} energy found for {molecule_name}")
+            return None
+        energies.append(energy)
+    return abs(energies[0] - energies[1])
+
+
+def fill_fcht_input(molecule_dir, molecule_name, calculation_state, cores, memory_gb):
+    """Renders an ABS/EMI .com with InpDEner taken from the finished logs. Returns False if it cannot."""
+    delta_e = fcht_delta_e(molecule_dir, molecule_name, calculation_state)
+    if delta_e is None:
+        return False
+    com_filename = os.path.join(molecule_dir, f"{molecule_name}_{calculation_state}.com")
+    with open(com_filename, 'w') as com_file:
+        com_file.write(render_com(molecule_name, calculation_state, cores, memory_gb, delta_e=delta_e))
+    print(f"{com_filename}: InpDEner={delta_e:.6f}")
+    return True
+
+
+def fill_fcht_command(remote_dir, molecule_name, calculation_state, profile, python):
+    """Shell line that renders an ABS/EMI .com inside its job, failing the job if the energies are missing."""
+    command = [python, os.path.abspath(__file__), "--fill-fcht", calculation_state, "--molecule", molecule_name,
+               "--cores", str(profile["cores"]), "--memory-gb", str(profile["memory_gb"])]
+    # remote_dir may start with $HOME, so it is double-quoted rather than shell-quoted.
+    return f"{shlex.join(command)} --molecule-dir \"{remote_dir}/{molecule_name}\" || exit 1\n"
+
+
+def submit_state(sh_filename, working_dir, dependencies, qsub):
+    """Submits one job, held until every dependency job has finished successfully. Returns its id."""
+    command = shlex.split(qsub)
+    if dependencies:
+        command += ["-W", "depend=afterok:" + ":".join(dependencies)]
+    try:
+        with stage("qsub"):
+            result = subprocess.run(command + [sh_filename], check=True, cwd=working_dir, capture_output=True, text=True)
+    except (subprocess.CalledProcessError, FileNotFoundError) as e:
+        print(f"Failed to submit {sh_filename}: {e}")
+        return None
+    return result.stdout.strip()
+
+
+def submit_chain(manifest, molecule, root, remote_dir, journal_path, journal, qsub="qsub", python="python3"):
+    """
+    Renders and submits every state of one molecule in dependency order.
+
+    States whose log already ended normally (with unchanged inputs) are not
+    resubmitted, and states still queued or running are reused as dependencies,
+    so rerunning the workflow only fills in what is missing or failed. A pending
+    state is resubmitted if one of its dependencies was resubmitted in this pass,
+    since PBS deletes a job whose afterok dependency failed.
+    Returns {state: job id, "completed" or None if it could not be submitted}.
+    """
+    molecule_name = molecule["name"]
+    molecule_dir = os.path.join(root, molecule_name)
+    os.makedirs(molecule_dir, exist_ok=True)
+    requested = [state for state in STATES if state in molecule_states(manifest, molecule)]
+    coordinates = read_coordinate_lines(molecule["coordinates"]) if "coordinates" in molecule else None
+    n_atoms = len(coordinates) if coordinates else None
+    jobs = {}
+    resubmitted = set()
+
+    for calculation_state in requested:
+        script_name = f"{molecule_name}_{calculation_state}"
+        jobs[calculation_state] = None
+        profile = resolve_profile(manifest, molecule, calculation_state, n_atoms)
+        if profile is None:
+            print(f"{script_name}: unknown resource profile, skipped")
+            continue
+
+        missing = [state for state in STATE_DEPENDENCIES[calculation_state]
+                   if jobs.get(state) is None and not os.path.exists(state_log(molecule_dir, molecule_name, state))]
+        if missing:
+            print(f"{script_name}: needs {', '.join(missing)}, not submitted or finished; skipped")
+            continue
+
+        pre_run = ""
+        com_text = None
+        if calculation_state in ["GS_Opt", "ES_Opt"]:
+            if not coordinates:
+                print(f"{script_name}: no coordinates, skipped")
+                continue
+            com_text = render_com(molecule_name, calculation_state, profile["cores"], profile["memory_gb"], coordinates)
+        elif calculation_state in FCHT_ENERGY_STATES:
+            delta_e = molecule.get("delta_e", {}).get(calculation_state)
+            if delta_e is not None:
+                com_text = render_com(molecule_name, calculation_state, profile["cores"], profile["memory_gb"],
+                                      delta_e=delta_e)
+            else:
+                pre_run = fill_fcht_command(remote_dir, molecule_name, calculation_state, profile, python)
+        else:
+            com_text = render_com(molecule_name, calculation_state, profile["cores"], profile["memory_gb"])
+
+        sh_text = render_sh(molecule_name, calculation_state, profile["walltime"], profile["cores"],
+                            profile["memory_gb"], remote_dir, pre_run)
+        point_hash = input_hash(sh_text, com_text or "")
+        log_file = state_log(molecule_dir, molecule_name, calculation_state)
+        status = point_status(journal.get(script_name), point_hash, log_file)
+        if status == "completed":
+            jobs[calculation_state] = "completed"
+            continue
+        if status == "pending" and not resubmitted.intersection(STATE_DEPENDENCIES[calculation_state]):
+            jobs[calculation_state] = journal[script_name].get("job_id")
+            continue
+
+        sh_filename = os.path.join(molecule_dir, f"{script_name}.sh")
+        with stage("write_inputs"):
+            if com_text is None:
+                # The .com is rendered by the job itself once the energies exist.
+                write_if_changed(sh_filename, sh_text)
+                os.chmod(sh_filename, 0o755)
+            else:
+                write_state_scripts(molecule_dir, script_name, sh_text, com_text)
+        dependencies = [jobs[state] for state in STATE_DEPENDENCIES[calculation_state]
+                        if jobs.get(state) not in (None, "completed")]
+        submitted_at = time.time()  # Logs written after this belong to this submission.
+        job_id = submit_state(sh_filename, molecule_dir, dependencies, qsub)
+        if job_id:
+            jobs[calculation_state] = job_id
+            resubmitted.add(calculation_state)
+            journal[script_name] = append_journal(journal_path, script_name, state="submitted", input_hash=point_hash,
+                                                  job_id=job_id, log=os.path.abspath(log_file), time=submitted_at)
+            after = f" after {', '.join(dependencies)}" if dependencies else ""
+            print(f"{script_name}: job {job_id}{after}")
+    return jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Submit each molecule's full state chain with PBS job dependencies.")
+    parser.add_argument("--manifest", help="JSON manifest as used by Script_Generator.py --manifest")
+    parser.add_argument("--root", help="Directory holding one folder per molecule (default ~/Master_Project/test)")
+    parser.add_argument("--qsub", default="qsub", help='qsub command, e.g. "python Fake_Qsub.py" for local testing')
+    parser.add_argument("--python", default="python3", help="Python used inside ABS/EMI jobs to fill in InpDEner")
+    add_profile_argument(parser)
+    # Used inside ABS/EMI jobs:
+    parser.add_argument("--fill-fcht", choices=sorted(FCHT_ENERGY_STATES), help=argparse.SUPPRESS)
+    parser.add_argument("--molecule", help=argparse.SUPPRESS)
+    parser.add_argument("--molecule-dir", help=argparse.SUPPRESS)
+    parser.add_argument("--cores", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--memory-gb", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    enable_from_args(args)
+
+    if args.fill_fcht:
+        filled = fill_fcht_input(args.molecule_dir, args.molecule, args.fill_fcht, args.cores, args.memory_gb)
+        return 0 if filled else 1
+
+    if args.manifest is None:
+        parser.error("--manifest is required")
+    manifest = load_manifest(args.manifest)
+    if manifest is None:
+        return 1
+    root, remote_dir = root_directories(args.root)
+    os.makedirs(root, exist_ok=True)
+    journal_path = os.path.join(root, WORKFLOW_JOURNAL_NAME)
+    journal = load_journal(journal_path)
+
+    submitted = 0
+    for molecule in manifest["molecules"]:
+        jobs = submit_chain(manifest, molecule, root, remote_dir, journal_path, journal, args.qsub, args.python)
+        submitted += sum(1 for job_id in jobs.values() if job_id not in (None, "completed"))
+    print(f"{submitted} jobs queued or running for {len(manifest['molecules'])} molecules (journal: {journal_path})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,32 @@
+import os
+import sys
+import json
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The scripts are flat modules at the repository root.
+sys.path.insert(0, REPO_DIR)
+
+
+class FakeScheduler:
+    """Fake_Qsub.py / Fake_Qstat.py commands sharing one submission log."""
+
+    def __init__(self, log_path):
+        self.log_path = log_path
+        self.qsub = f"{sys.executable} {os.path.join(REPO_DIR, 'Fake_Qsub.py')}"
+        self.qstat = f"{sys.executable} {os.path.join(REPO_DIR, 'Fake_Qstat.py')}"
+
+    def submissions(self):
+        if not os.path.exists(self.log_path):
+            return []
+        with open(self.log_path, 'r') as f:
+            return [json.loads(line) for line in f]
+
+
+@pytest.fixture
+def fake_scheduler(tmp_path, monkeypatch):
+    log_path = str(tmp_path / "fake_qsub_log.jsonl")
+    monkeypatch.setenv("FAKE_QSUB_LOG", log_path)
+    monkeypatch.delenv("FAKE_QSUB_RUN", raising=False)
+    return FakeScheduler(log_path)
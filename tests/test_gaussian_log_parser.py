@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+from Synthetic_Logs import write_fcht_log, PREAMBLE_LINE
+from Gaussian_Log_Parser import parse_fcht_log, read_fcht_tail, all_mode_arrays, HR_HEADER, SHIFT_HEADER
+
+METHODS = ["mmap", "tail", "stream"]
+TAIL_BLOCK = 4 << 20
+
+
+def parse_all(log_file):
+    return {method: parse_fcht_log(str(log_file), method) for method in METHODS}
+
+
+def assert_equivalent(records):
+    assert records["tail"] == records["mmap"]
+    assert records["stream"] == records["mmap"]
+
+
+def fcht_text(tmp_path, n_modes=8):
+    log_file = tmp_path / "source.log"
+    write_fcht_log(log_file, n_modes=n_modes, preamble_mb=0.01)
+    return log_file.read_text()
+
+
+def remove_section(text, header, next_marker):
+    start = text.index(header)
+    start = text.rindex("\n", 0, start) + 1
+    return text[:start] + text[text.index(next_marker, start):]
+
+
+def test_methods_agree_on_full_log(tmp_path):
+    log_file = tmp_path / "full.log"
+    write_fcht_log(log_file, n_modes=30, preamble_mb=0.5)
+    records = parse_all(log_file)
+    assert_equivalent(records)
+    assert len(records["mmap"]["huang_rhys"]) == 30
+    assert len(records["mmap"]["shift"]) == 30
+    assert len(records["mmap"]["dipstr"]) == 30
+
+
+def test_header_straddling_tail_block_boundary(tmp_path):
+    text = fcht_text(tmp_path)
+    header = text.index(HR_HEADER)
+    termination = text.index(" Normal termination")
+    # Pad after the sections so the HR header starts 5 bytes before the last 4 MB block.
+    padding = TAIL_BLOCK + 5 - (len(text) - header)
+    filler = (PREAMBLE_LINE * (padding // len(PREAMBLE_LINE) + 1))[:padding - 1] + "\n"
+    log_file = tmp_path / "straddle.log"
+    log_file.write_text(text[:termination] + filler + text[termination:])
+
+    data = log_file.read_bytes()
+    boundary = len(data) - TAIL_BLOCK
+    start = data.index(HR_HEADER.encode())
+    assert start < boundary < start + len(HR_HEADER)
+    assert read_fcht_tail(str(log_file)) is not None  # Found by the tail reader, not the mmap fallback.
+
+    records = parse_all(log_file)
+    assert_equivalent(records)
+    assert len(records["tail"]["huang_rhys"]) == 8
+
+
+@pytest.mark.parametrize("missing", ["huang_rhys", "shift", "dipstr", "all"])
+def test_missing_sections(tmp_path, missing):
+    text = fcht_text(tmp_path)
+    if missing in ("huang_rhys", "all"):
+        text = remove_section(text, HR_HEADER, SHIFT_HEADER)
+    if missing in ("shift", "all"):
+        text = remove_section(text, SHIFT_HEADER, " Information on Transitions")
+    if missing in ("dipstr", "all"):
+        text = remove_section(text, " Information on Transitions", " Normal termination")
+    log_file = tmp_path / f"missing_{missing}.log"
+    log_file.write_text(text)
+
+    records = parse_all(log_file)
+    assert_equivalent(records)
+    for key, values in records["mmap"].items():
+        assert (len(values) == 0) == (missing in (key, "all"))
+
+
+def test_empty_and_missing_logs(tmp_path):
+    empty = tmp_path / "empty.log"
+    empty.write_text("")
+    assert_equivalent(parse_all(empty))
+    assert all(parse_fcht_log(str(tmp_path / "absent.log"), method) is None for method in METHODS)
+
+
+def test_all_mode_arrays(tmp_path):
+    write_fcht_log(tmp_path / "abs.log", n_modes=8, preamble_mb=0.01, seed=1)
+    write_fcht_log(tmp_path / "emi.log", n_modes=8, preamble_mb=0.01, seed=2)
+    abs_record, emi_record = parse_fcht_log(str(tmp_path / "abs.log")), parse_fcht_log(str(tmp_path / "emi.log"))
+
+    arrays = all_mode_arrays(abs_record, emi_record)
+    for mode in range(1, 9):
+        assert arrays["huang_rhys"][mode - 1] == abs_record["huang_rhys"][mode]
+        assert arrays["shift"][mode - 1] == abs_record["shift"][mode]
+        assert arrays["dipstr_abs"][mode - 1] == abs_record["dipstr"][mode]
+        assert arrays["dipstr_emi"][mode - 1] == emi_record["dipstr"][mode]
+
+    without_emi = all_mode_arrays(abs_record, None, n_modes=10)
+    assert np.isnan(without_emi["dipstr_emi"]).all()
+    assert np.isnan(without_emi["huang_rhys"][8:]).all()
+    assert all(np.isnan(values).all() for values in all_mode_arrays(None, None, 4).values())
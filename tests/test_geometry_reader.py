@@ -0,0 +1,77 @@
+import sys
+import numpy as np
+import pytest
+from Synthetic_Logs import write_com_template
+from Geometry_Reader import read_frames, split_com_template
+import Angle
+from Angle import parse_atom_group
+
+
+def write_xyz(path, frames):
+    with open(path, 'w') as f:
+        for frame in frames:
+            f.write(f"{len(frame)}\ncomment\n")
+            f.writelines(f"C {x:.6f} {y:.6f} {z:.6f}\n" for x, y, z in frame)
+
+
+def test_com_directory_frames(tmp_path):
+    for seed in range(3):
+        write_com_template(tmp_path / f"Benzene_Shift_11_0.0{seed}.com", n_atoms=12, seed=seed)
+    labels, frames = read_frames(str(tmp_path))
+    assert labels == [f"Benzene_Shift_11_0.0{seed}.com" for seed in range(3)]
+    assert frames.shape == (3, 12, 3)
+    with open(tmp_path / labels[0]) as f:
+        head, coordinate_lines, tail = split_com_template(f.readlines())
+    assert head.endswith("0 1\n") and len(coordinate_lines) == 12 and tail == "\n"
+
+
+def test_ragged_com_directory_is_rejected(tmp_path):
+    write_com_template(tmp_path / "a.com", n_atoms=12)
+    write_com_template(tmp_path / "b.com", n_atoms=10)
+    with pytest.raises(ValueError, match="b.com has 10 atoms but a.com has 12"):
+        read_frames(str(tmp_path))
+
+
+def test_ragged_xyz_is_rejected(tmp_path):
+    xyz = tmp_path / "trajectory.xyz"
+    write_xyz(xyz, [np.zeros((12, 3)), np.zeros((12, 3)), np.zeros((11, 3))])
+    with pytest.raises(ValueError, match="frame 3 has 11 atoms but frame 1 has 12"):
+        read_frames(str(xyz))
+
+
+def test_xyz_frames(tmp_path):
+    xyz = tmp_path / "trajectory.xyz"
+    frames = np.arange(72, dtype=float).reshape(2, 12, 3)
+    write_xyz(xyz, frames)
+    labels, read = read_frames(str(xyz))
+    assert labels == ["trajectory.xyz:1", "trajectory.xyz:2"]
+    np.testing.assert_allclose(read, frames)
+
+
+@pytest.mark.parametrize("spec, indices", [("1-6", [0, 1, 2, 3, 4, 5]), ("1,3,5", [0, 2, 4]), ("7-8,12", [6, 7, 11])])
+def test_atom_groups(spec, indices):
+    assert parse_atom_group(spec).tolist() == indices
+
+
+@pytest.mark.parametrize("spec", ["1", "1-2", "3,4", "1,1,2"])
+def test_atom_groups_without_a_plane_are_rejected(spec):
+    with pytest.raises(ValueError, match="a plane needs at least 3"):
+        parse_atom_group(spec)
+
+
+@pytest.mark.parametrize("spec", ["0", "0-5", "1,0,3"])
+def test_atom_groups_from_atom_zero_are_rejected(spec):
+    with pytest.raises(ValueError, match="atoms are numbered from 1"):
+        parse_atom_group(spec)
+
+
+def test_atom_group_beyond_the_molecule_is_reported(tmp_path, monkeypatch, capsys):
+    xyz = tmp_path / "trajectory.xyz"
+    write_xyz(xyz, np.random.default_rng(0).normal(size=(2, 12, 3)))
+    monkeypatch.setattr(sys, "argv", ["Angle.py", str(xyz), "--ring2", "7-13"])
+    Angle.main()
+    assert "Atom group '7-13' refers to atom 13, but the geometries have 12 atoms." in capsys.readouterr().out
+
+    monkeypatch.setattr(sys, "argv", ["Angle.py", str(xyz), "--ring1", "0-5"])
+    Angle.main()
+    assert "atoms are numbered from 1" in capsys.readouterr().out
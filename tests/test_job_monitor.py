@@ -0,0 +1,124 @@
+import os
+import csv
+import json
+import time
+import asyncio
+import threading
+import subprocess
+from Synthetic_Logs import write_fcht_log
+from Gaussian_Log_Parser import parse_fcht_log
+from Job_Monitor import monitor
+from Sweep_Journal import append_journal
+
+LABEL = "Unshifted_Shift_11_0.05"
+
+
+def submit_point(tmp_path, fake_scheduler, stale_log):
+    """Submits a point whose directory still holds a terminated log from an earlier attempt."""
+    point_dir = tmp_path / LABEL
+    point_dir.mkdir()
+    log = point_dir / "PW6B95D3_N_ES_Opt.log"
+    log.write_text(stale_log)
+    earlier = time.time() - 100
+    os.utime(log, (earlier, earlier))
+    (point_dir / "PW6B95D3_N_ES_Opt.sh").write_text("true\n")
+    result = subprocess.run(fake_scheduler.qsub.split() + ["PW6B95D3_N_ES_Opt.sh"], cwd=point_dir,
+                            check=True, capture_output=True, text=True)
+    journal_path = str(tmp_path / "sweep_journal.jsonl")
+    append_journal(journal_path, LABEL, state="submitted", input_hash="hash", job_id=result.stdout.strip(), log=str(log))
+    return point_dir, journal_path
+
+
+def run_monitor(journal_path, summary_path, fake_scheduler):
+    asyncio.run(monitor(journal_path, summary_path, interval=0.05, qstat=fake_scheduler.qstat))
+
+
+def journaled_states(journal_path):
+    with open(journal_path, 'r') as f:
+        return [json.loads(line)["state"] for line in f]
+
+
+def read_summary(summary_path):
+    with open(summary_path, newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def write_fcht_logs(point_dir):
+    write_fcht_log(point_dir / "PW6B95D3_N_FCHT_ABS.log", n_modes=12, preamble_mb=0.01, seed=1)
+    write_fcht_log(point_dir / "PW6B95D3_N_FCHT_EMI.log", n_modes=12, preamble_mb=0.01, seed=2)
+
+
+def finish_point(point_dir):
+    """The new attempt finishes: its FCHT logs are written before the optimisation log terminates."""
+    write_fcht_logs(point_dir)
+    (point_dir / "PW6B95D3_N_ES_Opt.log").write_text(" Normal termination of Gaussian 16\n")
+
+
+def assert_harvested(point_dir, summary_path):
+    [row] = read_summary(summary_path)
+    abs_record = parse_fcht_log(str(point_dir / "PW6B95D3_N_FCHT_ABS.log"))
+    emi_record = parse_fcht_log(str(point_dir / "PW6B95D3_N_FCHT_EMI.log"))
+    assert (row["Mode"], row["Magnitude"], row["State"]) == ("11", "0.05", "completed")
+    assert float(row["Huang-Rhys"]) == abs_record["huang_rhys"][11]
+    assert float(row["Shift"]) == abs_record["shift"][11]
+    assert float(row["DipStr"]) == abs_record["dipstr"][11]
+    assert float(row["DipStr EMI"]) == emi_record["dipstr"][11]
+
+
+def test_stale_log_of_running_job_is_not_harvested(tmp_path, fake_scheduler, monkeypatch):
+    monkeypatch.setenv("FAKE_QSTAT_RUNTIME", "3600")
+    point_dir, journal_path = submit_point(tmp_path, fake_scheduler, " Error termination via Lnk1e\n")
+    summary_path = str(tmp_path / "monitor_summary.csv")
+
+    # The monitor polls the stale log many times before the running job finishes.
+    timer = threading.Timer(1.0, finish_point, args=(point_dir,))
+    timer.start()
+    try:
+        run_monitor(journal_path, summary_path, fake_scheduler)
+    finally:
+        timer.cancel()
+
+    assert journaled_states(journal_path) == ["submitted", "completed"]
+    assert_harvested(point_dir, summary_path)
+
+
+def test_staged_point_waits_for_its_fcht_logs(tmp_path, fake_scheduler, monkeypatch):
+    monkeypatch.setenv("FAKE_QSTAT_RUNTIME", "0")
+    point_dir, journal_path = submit_point(tmp_path, fake_scheduler, " Error termination via Lnk1e\n")
+    (point_dir / "PW6B95D3_N_ES_Opt.log").write_text(" Normal termination of Gaussian 16\n")
+    summary_path = str(tmp_path / "monitor_summary.csv")
+
+    # The job has left the queue with its optimisation done; the FCHT logs only appear later.
+    timer = threading.Timer(1.0, write_fcht_logs, args=(point_dir,))
+    timer.start()
+    try:
+        run_monitor(journal_path, summary_path, fake_scheduler)
+    finally:
+        timer.cancel()
+
+    assert journaled_states(journal_path) == ["submitted", "completed"]
+    assert_harvested(point_dir, summary_path)
+
+
+def test_staged_point_with_a_failed_fcht_log_has_failed(tmp_path, fake_scheduler, monkeypatch):
+    monkeypatch.setenv("FAKE_QSTAT_RUNTIME", "0")
+    point_dir, journal_path = submit_point(tmp_path, fake_scheduler, " Error termination via Lnk1e\n")
+    write_fcht_logs(point_dir)
+    (point_dir / "PW6B95D3_N_FCHT_EMI.log").write_text(" Error termination via Lnk1e\n")
+    (point_dir / "PW6B95D3_N_ES_Opt.log").write_text(" Normal termination of Gaussian 16\n")
+    summary_path = str(tmp_path / "monitor_summary.csv")
+
+    run_monitor(journal_path, summary_path, fake_scheduler)
+
+    assert journaled_states(journal_path) == ["submitted", "failed"]
+
+
+def test_finished_job_with_only_a_stale_log_has_failed(tmp_path, fake_scheduler, monkeypatch):
+    monkeypatch.setenv("FAKE_QSTAT_RUNTIME", "0")
+    _, journal_path = submit_point(tmp_path, fake_scheduler, " Normal termination of Gaussian 16\n")
+    summary_path = str(tmp_path / "monitor_summary.csv")
+
+    run_monitor(journal_path, summary_path, fake_scheduler)
+
+    assert journaled_states(journal_path) == ["submitted", "failed"]
+    assert read_summary(summary_path)[0]["State"] == "failed"
@@ -0,0 +1,97 @@
+import sys
+import numpy as np
+import pytest
+import Normal_Coordinates_Data
+from Synthetic_Logs import build_shift_tree
+from Result_Writer import StreamingCsvWriter
+from Normal_Coordinates_Data import (compute_asymmetry, compute_asymmetry_array, pair_indices, pair_asymmetry,
+                                     pair_asymmetry_arrays)
+
+
+def pairs(magnitudes, tolerance=1e-4):
+    magnitudes = np.sort(np.asarray(magnitudes, dtype=float))
+    pos_idx, neg_idx = pair_indices(magnitudes, tolerance)
+    return list(zip(magnitudes[pos_idx].tolist(), magnitudes[neg_idx].tolist()))
+
+
+def test_rounded_magnitudes_within_tolerance_pair():
+    assert pairs([-0.03, 0.030001]) == [(0.030001, -0.03)]
+    assert pairs([-0.030001, 0.03]) == [(0.03, -0.030001)]
+
+
+@pytest.mark.parametrize("positive", [0.0302, 0.02989, 0.03011])
+def test_near_misses_outside_tolerance_do_not_pair(positive):
+    assert pairs([-0.03, positive]) == []
+
+
+def test_unmatched_signs_are_dropped():
+    assert pairs([-0.05, -0.03, 0.03, 0.07]) == [(0.03, -0.03)]
+    assert pairs([0.01, 0.02]) == []
+    assert pairs([-0.02, -0.01]) == []
+    assert pairs([]) == []
+
+
+def test_zero_pairs_with_itself():
+    assert pairs([-0.01, 0.0, 0.01]) == [(0.0, 0.0), (0.01, -0.01)]
+
+
+def test_tolerance_is_capped_below_half_the_spacing():
+    magnitudes = [-0.0002, -0.0001, 0.0, 0.0001, 0.0002]
+    assert pairs(magnitudes, tolerance=0.01) == [(0.0, 0.0), (0.0001, -0.0001), (0.0002, -0.0002)]
+
+
+def test_duplicate_partners_keep_the_first_pair():
+    assert pairs([-0.03, 0.03, 0.03]) == [(0.03, -0.03)]
+
+
+def test_zero_denominator_gives_zero_asymmetry():
+    assert compute_asymmetry(0.0, 0.0) == 0.0
+    assert compute_asymmetry_array(np.array([0.0, 0.0, 2.0]), np.array([0.0, -0.0, -1.0])).tolist() == [0.0, 0.0, 1 / 3]
+    assert pair_asymmetry({-0.05: (0.0, 0.0), 0.05: (0.0, 0.0)}) == [(0.05, 0.0, 0.0, "Symmetric")]
+
+
+def test_array_pairing_matches_scalar_asymmetry():
+    rng = np.random.default_rng(0)
+    magnitudes = np.round(np.linspace(-0.5, 0.5, 21), 6)
+    magnitudes[magnitudes > 0] += 1e-6  # Filenames rounded differently on each side.
+    hr, shift = rng.normal(size=(2, 21, 4))
+    hr[3] = hr[-4] = 0.0
+    order = rng.permutation(21)
+    pair_mags, hr_asym, shift_asym = pair_asymmetry_arrays(magnitudes[order], hr[order], shift[order])
+
+    assert len(pair_mags) == 11
+    for row, mag in enumerate(pair_mags):
+        pos = np.flatnonzero(np.isclose(magnitudes, mag, atol=1e-5))[0]
+        neg = np.flatnonzero(np.isclose(magnitudes, -mag, atol=1e-5))[0]
+        for mode in range(4):
+            assert hr_asym[row, mode] == pytest.approx(compute_asymmetry(hr[pos, mode], hr[neg, mode]))
+            assert shift_asym[row, mode] == pytest.approx(compute_asymmetry(shift[pos, mode], shift[neg, mode]))
+
+
+def run_main(monkeypatch, directory, *args):
+    monkeypatch.chdir(directory)
+    monkeypatch.setattr(sys, "argv", ["Normal_Coordinates_Data.py", "--mode", "11", "--no-cache", *args])
+    Normal_Coordinates_Data.main()
+    with open(directory / "Shift_11_asymmetry_all_modes.csv") as f:
+        return f.read()
+
+
+def test_all_modes_reuses_parsed_logs_and_resumed_stream(tmp_path, monkeypatch, capsys):
+    for name in ("plain", "resumed"):
+        build_shift_tree(str(tmp_path / name), width=8, n_modes=14, preamble_mb=0.01)
+    parses = []
+    parse = Normal_Coordinates_Data.cached_parse_fcht_log
+    monkeypatch.setattr(Normal_Coordinates_Data, "cached_parse_fcht_log", lambda *a: parses.append(a[0]) or parse(*a))
+    expected = run_main(monkeypatch, tmp_path / "plain", "--all-modes")
+    assert len(parses) == len(set(parses)) == 8
+
+    # A crashed --stream run left three logs in its partial file; they are parsed once more for all modes.
+    resumed = tmp_path / "resumed"
+    data = Normal_Coordinates_Data.collect_shift_data(11, str(resumed))
+    with StreamingCsvWriter(str(resumed / "Shift_11_parsed_logs.csv"), ["Magnitude", "Huang-Rhys", "Shift"]) as writer:
+        for mag in sorted(data)[:3]:
+            writer.write(f"Benzene_Shift_11_{mag:.2f}.log", (mag, *data[mag]))
+    parses.clear()
+    assert run_main(monkeypatch, resumed, "--all-modes", "--stream") == expected
+    assert "3 rows already written" in capsys.readouterr().out
+    assert len(parses) == len(set(parses)) == 8
@@ -0,0 +1,60 @@
+import pytest
+from Resource_Autotuner import (MIN_METHOD_RUNS, open_history, parse_run_usage, record_runs, model_runs,
+                                suggest_resources)
+
+
+def write_run(path, route, n_atoms, cpu_hours, mem="%mem=16GB", cpus=8):
+    """Writes a finished Gaussian log with the lines Resource_Autotuner reads."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    cpu_s = cpu_hours * 3600
+    elapsed_s = cpu_s / cpus
+    path.write_text(
+        f" {mem}\n %NProcShared={cpus}\n {route}\n NAtoms=   {n_atoms} NQM=   {n_atoms}\n"
+        f"   {10 * n_atoms} basis functions,   {20 * n_atoms} primitive gaussians\n"
+        f" Job cpu time:       0 days  {int(cpu_s // 3600)} hours  {int(cpu_s % 3600 // 60)} minutes"
+        f" {cpu_s % 60:.1f} seconds.\n"
+        f" Elapsed time:       0 days  {int(elapsed_s // 3600)} hours  {int(elapsed_s % 3600 // 60)} minutes"
+        f" {elapsed_s % 60:.1f} seconds.\n"
+        " Normal termination of Gaussian 16\n")
+    return str(path)
+
+
+@pytest.mark.parametrize("mem, memory_gb", [
+    ("%mem=500KB", 500 / 1024 ** 2), ("%mem=512MB", 0.5), ("%Mem=16GB", 16.0), ("%mem=1TB", 1024.0),
+    ("%mem=1024KW", 8.0 / 1024), ("%mem=128mw", 1.0), ("%mem=2GW", 16.0), ("%mem=1TW", 8192.0),
+    ("%mem=134217728", 1.0),
+])
+def test_memory_units(tmp_path, mem, memory_gb):
+    log = write_run(tmp_path / "Mol_GS_Ver.log", "#p b3lyp/def2tzvp", 12, 1.0, mem=mem)
+    assert parse_run_usage(log)["memory_gb"] == pytest.approx(memory_gb)
+
+
+@pytest.fixture
+def history(tmp_path):
+    history = open_history(str(tmp_path / "history.sqlite"))
+    yield history
+    history.close()
+
+
+def test_method_with_enough_runs_is_fitted_on_its_own(tmp_path, history):
+    logs = [write_run(tmp_path / f"big_{n}" / "Mol_ES_Opt.log", "#p opt b3lyp/def2tzvp TD", n, n ** 3 / 100)
+            for n in (10, 20, 40)]
+    logs += [write_run(tmp_path / f"small_{n}" / "Mol_ES_Opt.log", "#p opt b3lyp/sto-3g TD", n, n ** 3 / 10000)
+             for n in (10, 20, 40)]
+    record_runs(history, logs)
+
+    assert len(model_runs(history, "ES_Opt", "B3LYP/DEF2TZVP")["paths"]) == 3
+    big = suggest_resources(history, "ES_Opt", 80, method="B3LYP/DEF2TZVP")
+    small = suggest_resources(history, "ES_Opt", 80, method="B3LYP/STO-3G")
+    assert big["walltime"] > small["walltime"]
+
+
+def test_method_with_few_runs_falls_back_to_the_state(tmp_path, history):
+    logs = [write_run(tmp_path / f"run_{n}" / "Mol_ABS.log", "#p B3LYP/def2tzvp Freq", n, 1.0) for n in (10, 20, 40)]
+    logs.append(write_run(tmp_path / "new" / "Mol_ABS.log", "#p PBE0/def2svp Freq", 10, 1.0))
+    record_runs(history, logs)
+
+    assert MIN_METHOD_RUNS > 1
+    assert len(model_runs(history, "ABS", "PBE0/DEF2SVP")["paths"]) == 4
+    assert model_runs(history, "GS_Opt", "PBE0/DEF2SVP") is None
+    assert suggest_resources(history, "ABS", 20, method="PBE0/DEF2SVP") == suggest_resources(history, "ABS", 20)
@@ -0,0 +1,54 @@
+import os
+import pytest
+from Synthetic_Logs import build_extraction_tree
+from Result_Writer import StreamingCsvWriter
+from Extract_Intensity_Borrowing import CSV_HEADER, find_shift_directories, iter_directory_rows, stream_directories
+
+X, Y = "Unshifted", 11
+
+
+@pytest.fixture
+def sweep(tmp_path):
+    base_dir = str(tmp_path / "sweep")
+    build_extraction_tree(base_dir, X, Y, width=8, n_modes=14, preamble_mb=0.01)
+    return base_dir
+
+
+def crashed_partial(base_dir, output_file, cut):
+    """Writes every row to the partial file, then cuts it at (line, byte offset) as a crash mid-write would."""
+    with StreamingCsvWriter(output_file, CSV_HEADER, batch_size=1) as writer:
+        for root, row in iter_directory_rows(find_shift_directories(X, base_dir, Y), Y):
+            writer.write(root, row)
+    with open(writer.partial_file, 'rb') as f:
+        lines = f.read().splitlines(keepends=True)
+    line, offset = cut
+    with open(writer.partial_file, 'wb') as f:
+        f.writelines(lines[:line])
+        f.write(lines[line][:offset])
+    return writer.partial_file
+
+
+def read_bytes(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("cut", [(0, 7), (1, 0), (4, 10), (4, 1), (8, -1)],
+                         ids=["mid-header", "after-header", "mid-row", "row-start", "before-last-newline"])
+def test_rerun_after_torn_partial_matches_clean_run(sweep, tmp_path, cut):
+    clean_file = str(tmp_path / "clean.csv")
+    stream_directories(X, Y, sweep, clean_file)
+
+    output_file = str(tmp_path / "resumed.csv")
+    partial_file = crashed_partial(sweep, output_file, cut)
+    stream_directories(X, Y, sweep, output_file)
+
+    assert read_bytes(output_file) == read_bytes(clean_file)
+    assert not os.path.exists(partial_file)
+
+
+def test_resume_skips_rows_already_written(sweep, tmp_path):
+    output_file = str(tmp_path / "resumed.csv")
+    crashed_partial(sweep, output_file, (4, 10))
+    with StreamingCsvWriter(output_file, CSV_HEADER) as writer:
+        assert len(writer.done_keys) == 3
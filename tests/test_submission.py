@@ -0,0 +1,103 @@
+import os
+from Array_Submission import submit_array, subjob_id, ARRAY_SCRIPT_NAME
+from Sweep_Journal import load_journal
+from Workflow_Scheduler import submit_chain, WORKFLOW_JOURNAL_NAME
+
+POINT_SCRIPT = 'echo "$MODE $LABEL" > point_output.txt\n'
+XYZ = "2\nH2\nH 0.0 0.0 0.0\nH 0.0 0.0 0.74\n"
+
+
+def make_points(tmp_path, n_points):
+    entries = []
+    for index in range(n_points):
+        point_dir = tmp_path / f"point_{index}"
+        point_dir.mkdir()
+        (point_dir / "point.sh").write_text(POINT_SCRIPT)
+        entries.append((str(point_dir), "point.sh", f"MODE=11,LABEL=11_{index}"))
+    return entries
+
+
+def test_array_submission_runs_every_point(tmp_path, fake_scheduler, monkeypatch):
+    monkeypatch.setenv("FAKE_QSUB_RUN", "1")
+    entries = make_points(tmp_path, 3)
+    job_id = submit_array(entries, tmp_path, "Shift_11", os.path.join(entries[0][0], "point.sh"), fake_scheduler.qsub)
+
+    assert job_id == "1000[].fake"
+    assert subjob_id(job_id, 2) == "1000[2].fake"
+    [submission] = fake_scheduler.submissions()
+    assert submission["array_indices"] == [1, 2, 3]
+    for index, (point_dir, _, _) in enumerate(entries):
+        with open(os.path.join(point_dir, "point_output.txt")) as f:
+            assert f.read().split() == ["11", f"11_{index}"]
+
+
+def test_single_point_is_submitted_as_plain_job(tmp_path, fake_scheduler):
+    entries = make_points(tmp_path, 1)
+    job_id = submit_array(entries, tmp_path, "Shift_11", os.path.join(entries[0][0], "point.sh"), fake_scheduler.qsub)
+
+    assert job_id == "1000.fake"
+    assert subjob_id(job_id, 1) == job_id
+    [submission] = fake_scheduler.submissions()
+    assert submission["array_indices"] is None
+    assert submission["script"] == os.path.join(entries[0][0], "point.sh")
+    assert submission["variables"] == "MODE=11,LABEL=11_0"
+    assert not (tmp_path / ARRAY_SCRIPT_NAME).exists()
+
+
+def workflow(tmp_path):
+    (tmp_path / "H2.xyz").write_text(XYZ)
+    manifest = {
+        "profiles": {"small": {"walltime": "01:00:00", "cores": 2, "memory_gb": 4}},
+        "defaults": {"profile": "small"},
+        "molecules": [{"name": "H2", "coordinates": str(tmp_path / "H2.xyz"), "delta_e": {"ABS": 0.1, "EMI": 0.1}}],
+    }
+    root = tmp_path / "root"
+    root.mkdir()
+    return manifest, str(root), str(root / WORKFLOW_JOURNAL_NAME)
+
+
+def test_workflow_chains_states_with_afterok(tmp_path, fake_scheduler):
+    manifest, root, journal_path = workflow(tmp_path)
+    jobs = submit_chain(manifest, manifest["molecules"][0], root, root, journal_path, {}, fake_scheduler.qsub)
+
+    assert jobs == {"GS_Opt": "1000.fake", "ES_Opt": "1001.fake", "GS_Ver": "1002.fake", "ES_Ver": "1003.fake",
+                    "ABS": "1004.fake", "EMI": "1005.fake"}
+    attributes = {os.path.basename(entry["script"]): entry["attributes"] for entry in fake_scheduler.submissions()}
+    assert attributes["H2_GS_Opt.sh"] == []
+    assert attributes["H2_GS_Ver.sh"] == ["depend=afterok:1001.fake"]
+    assert attributes["H2_ES_Ver.sh"] == ["depend=afterok:1000.fake"]
+    assert attributes["H2_ABS.sh"] == ["depend=afterok:1000.fake:1001.fake:1003.fake"]
+    assert attributes["H2_EMI.sh"] == ["depend=afterok:1000.fake:1001.fake:1002.fake"]
+
+
+def test_workflow_rerun_resubmits_failed_states_and_their_dependents(tmp_path, fake_scheduler):
+    manifest, root, journal_path = workflow(tmp_path)
+    molecule = manifest["molecules"][0]
+    submit_chain(manifest, molecule, root, root, journal_path, {}, fake_scheduler.qsub)
+    for state in ["GS_Opt", "ES_Opt", "ES_Ver", "ABS"]:
+        (tmp_path / "root" / "H2" / f"H2_{state}.log").write_text(" Normal termination of Gaussian 16\n")
+    (tmp_path / "root" / "H2" / "H2_GS_Ver.log").write_text(" Error termination via Lnk1e\n")
+
+    jobs = submit_chain(manifest, molecule, root, root, journal_path, load_journal(journal_path), fake_scheduler.qsub)
+
+    # EMI (1005) depended on the failed GS_Ver, so PBS has deleted it: it follows the new GS_Ver.
+    assert jobs == {"GS_Opt": "completed", "ES_Opt": "completed", "GS_Ver": "1006.fake", "ES_Ver": "completed",
+                    "ABS": "completed", "EMI": "1007.fake"}
+    resubmitted = fake_scheduler.submissions()[6:]
+    assert [os.path.basename(entry["script"]) for entry in resubmitted] == ["H2_GS_Ver.sh", "H2_EMI.sh"]
+    assert resubmitted[0]["attributes"] == []
+    assert resubmitted[1]["attributes"] == ["depend=afterok:1006.fake"]
+
+
+def test_workflow_rerun_reuses_pending_states_with_unchanged_dependencies(tmp_path, fake_scheduler):
+    manifest, root, journal_path = workflow(tmp_path)
+    molecule = manifest["molecules"][0]
+    submit_chain(manifest, molecule, root, root, journal_path, {}, fake_scheduler.qsub)
+    for state in ["GS_Opt", "ES_Opt", "GS_Ver"]:
+        (tmp_path / "root" / "H2" / f"H2_{state}.log").write_text(" Normal termination of Gaussian 16\n")
+
+    jobs = submit_chain(manifest, molecule, root, root, journal_path, load_journal(journal_path), fake_scheduler.qsub)
+
+    assert jobs == {"GS_Opt": "completed", "ES_Opt": "completed", "GS_Ver": "completed", "ES_Ver": "1003.fake",
+                    "ABS": "1004.fake", "EMI": "1005.fake"}
+    assert len(fake_scheduler.submissions()) == 6
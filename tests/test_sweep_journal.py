@@ -0,0 +1,19 @@
+import os
+from Sweep_Journal import load_journal, record_completions, sweep_plan
+
+
+def test_completed_entries_store_absolute_log_paths(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("Shift_11")
+    log_file = os.path.join("Shift_11", "Benzene_Shift_11_0.05.log")
+    with open(log_file, 'w') as f:
+        f.write(" Normal termination of Gaussian 16\n")
+    journal_path = str(tmp_path / "sweep_journal.jsonl")
+    points = [("11_0.05", "hash", log_file)]
+    journal = {}
+
+    record_completions(journal_path, journal, sweep_plan(journal, points), points)
+
+    entry = load_journal(journal_path)["11_0.05"]
+    assert entry["state"] == "completed"
+    assert entry["log"] == str(tmp_path / log_file)
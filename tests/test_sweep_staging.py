@@ -0,0 +1,22 @@
+import os
+from Intensity_Borrowing_Automation import stage_sweep_directory
+from Sweep_Journal import log_termination
+
+COM = "%chk=PW6B95D3_N_ES_Opt.chk\n#p opt\n\nTitle\n\n0 1\nC  0.000000  0.000000  0.000000\n\n"
+
+
+def test_restaging_moves_previous_log_aside(tmp_path):
+    src = tmp_path / "Unshifted"
+    src.mkdir()
+    (src / "PW6B95D3_N_ES_Opt.com").write_text(COM)
+    (src / "PW6B95D3_N_ES_Opt.sh").write_text("cd Unshifted\n")
+    target = tmp_path / "Unshifted_Shift_11_0.05"
+    stage_sweep_directory(str(src), str(target), "PW6B95D3_N_ES_Opt.com", ["C  0.100000  0.000000  0.000000"])
+    log = target / "PW6B95D3_N_ES_Opt.log"
+    log.write_text(" Error termination via Lnk1e\n")
+
+    stage_sweep_directory(str(src), str(target), "PW6B95D3_N_ES_Opt.com", ["C  0.100000  0.000000  0.000000"])
+
+    assert log_termination(str(log)) is None
+    assert (target / "PW6B95D3_N_ES_Opt.log.previous").read_text() == " Error termination via Lnk1e\n"
+    assert os.path.isfile(target / "PW6B95D3_N_ES_Opt.com")